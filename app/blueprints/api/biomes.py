@@ -1,6 +1,12 @@
 from flask import Blueprint, request, jsonify, current_app, abort
+import operator
 from app.models import Biome, Lifeform
+from app.blueprints.api.lifeforms import LIFEFORM_FIELDS
 from app.extensions import db
+from app.services.http_cache import CATALOG_MAX_AGE, cache_for, conditional
+from app.services.response_cache import cached_json
+from app.services.pagination import COUNT_MODES, count_rows, keyset_page, parse_fields, parse_per_page
+from app.services.query_budget import query_budget
 
 biomes_bp = Blueprint('biomes_api', __name__)
 
@@ -9,29 +15,110 @@ def serialize_biome(b: Biome):
     # don't include huge nested objects twice; they are JSON already
     return d
 
+# ?fields= may pick any of these; id and name (the sort key) are always included
+BIOME_FIELDS = ('id', 'name', 'base_type', 'rarity', 'biodiversity', 'productivity',
+                'climate', 'soil', 'vegetation', 'fauna', 'special_features',
+                'humidity', 'temperature_min', 'temperature_max')
+MAX_PER_PAGE = 200
+# lifeform columns embedded in the biome detail response
+LIFEFORM_SUMMARY_FIELDS = ('id', 'name', 'trophic_level', 'domain')
+
+
+def biome_filters(args):
+    """WHERE clauses for the list/search query string.
+
+    Numeric ranges use plain or generated (humidity, temperature_*) columns
+    with B-tree indexes; nested list attributes use JSONB containment (@>),
+    served by the jsonb_path_ops GIN indexes. Repeated list parameters
+    (?mineral=a&mineral=b) must all match.
+    """
+    filters = []
+    base_type = args.get('base_type')
+    if base_type:
+        filters.append(Biome.base_type == base_type)
+
+    ranges = [
+        ('min_rarity', Biome.rarity, operator.ge),
+        ('max_rarity', Biome.rarity, operator.le),
+        ('humidity_min', Biome.humidity, operator.ge),
+        ('humidity_max', Biome.humidity, operator.le),
+        # temperature: biomes whose range overlaps [temp_min, temp_max]
+        ('temp_min', Biome.temperature_max, operator.ge),
+        ('temp_max', Biome.temperature_min, operator.le),
+    ]
+    for name, column, op in ranges:
+        value = args.get(name, type=float)
+        if value is not None:
+            filters.append(op(column, value))
+
+    minerals = args.getlist('mineral')
+    if minerals:
+        filters.append(Biome.soil.contains({'mineral_composition': minerals}))
+    feeding = args.getlist('feeding')
+    if feeding:
+        filters.append(Biome.fauna.contains({'feeding_strategies': feeding}))
+    features = args.getlist('feature')
+    if features:
+        filters.append(Biome.special_features.contains(features))
+    return filters
+
+
 @biomes_bp.route('/', methods=['GET'])
+@biomes_bp.route('/search', methods=['GET'])
 def list_biomes():
-    # pagination
+    """
+    Keyset-paginated biome list ordered by (name, id).
+
+    ?cursor=<next_cursor from the previous page>  &per_page=20 (max 200)
+    ?fields=id,name,rarity  only serialise these columns (skip the JSONB ones)
+    ?count=none|exact|estimated  include "total"; estimated asks the planner
+    ?page=N  the old OFFSET pagination, kept for existing callers
+
+    Filters (all optional, combined with AND): base_type, min_rarity,
+    max_rarity, humidity_min, humidity_max, temp_min, temp_max,
+    mineral (soil mineral_composition contains), feeding (fauna
+    feeding_strategies contains), feature (special_features contains).
+    """
+    try:
+        per_page = parse_per_page(request.args.get('per_page'), 20, MAX_PER_PAGE)
+        fields = parse_fields(request.args.get('fields'), BIOME_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e) or 'invalid pagination parameters'}), 400
+
+    filters = biome_filters(request.args)
+
+    if 'page' in request.args:
+        return _list_biomes_offset(filters, per_page)
+
+    count_mode = request.args.get('count', 'none')
+    if count_mode not in COUNT_MODES:
+        return jsonify({'error': f"count must be one of {', '.join(COUNT_MODES)}"}), 400
+
+    q = db.select(*[getattr(Biome, f) for f in fields]).where(*filters)
+    try:
+        rows, next_cursor = keyset_page(q, [Biome.name, Biome.id], request.args.get('cursor'), per_page)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    data = {
+        'per_page': per_page,
+        'next_cursor': next_cursor,
+        'items': [dict(row._mapping) for row in rows],
+    }
+    if count_mode != 'none':
+        data['total'] = count_rows(db.select(Biome.id).where(*filters), count_mode)
+        data['total_is_estimate'] = count_mode == 'estimated'
+    return jsonify(data)
+
+
+def _list_biomes_offset(filters, per_page):
     try:
         page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 20))
     except ValueError:
         return jsonify({'error': 'invalid pagination parameters'}), 400
 
-    # filters
-    base_type = request.args.get('base_type')
-    min_rarity = request.args.get('min_rarity', type=float)
-    max_rarity = request.args.get('max_rarity', type=float)
-
-    q = Biome.query
-    if base_type:
-        q = q.filter_by(base_type=base_type)
-    if min_rarity is not None:
-        q = q.filter(Biome.rarity >= min_rarity)
-    if max_rarity is not None:
-        q = q.filter(Biome.rarity <= max_rarity)
-
-    pag = q.order_by(Biome.name).paginate(page=page, per_page=per_page, error_out=False)
+    pag = Biome.query.filter(*filters).order_by(Biome.name, Biome.id).paginate(
+        page=page, per_page=per_page, error_out=False)
     items = [serialize_biome(b) for b in pag.items]
 
     return jsonify({
@@ -42,17 +129,55 @@ def list_biomes():
         'items': items
     })
 
+def biome_lifeforms_page(biome_id, fields, cursor=None, limit=20):
+    """One keyset page of a biome's lifeforms ordered by (name, id).
+
+    Served from ix_lifeforms_biome_name_id. Returns (items, next_cursor).
+    """
+    q = db.select(*[getattr(Lifeform, f) for f in fields]).where(Lifeform.biome_id == biome_id)
+    rows, next_cursor = keyset_page(q, [Lifeform.name, Lifeform.id], cursor, limit)
+    return [dict(row._mapping) for row in rows], next_cursor
+
+
 @biomes_bp.route('/<biome_id>', methods=['GET'])
+@query_budget(4)  # cache generation check, biome, its lifeform page
+@conditional
 def get_biome(biome_id):
-    b = Biome.query.get(biome_id)
-    if not b:
+    def build():
+        b = db.session.get(Biome, biome_id)
+        if not b:
+            return None
+        # attach the first page of lifeform summaries; the rest via /<id>/lifeforms
+        data = b.to_dict()
+        data['lifeforms'], data['lifeforms_next_cursor'] = biome_lifeforms_page(
+            b.id, LIFEFORM_SUMMARY_FIELDS, limit=MAX_PER_PAGE)
+        return data
+
+    response = cached_json('biomes', biome_id, build)
+    if response is None:
         return jsonify({'error': 'biome not found'}), 404
+    return cache_for(response, CATALOG_MAX_AGE)
 
-    # attach lifeforms (summaries)
-    life_q = Lifeform.query.filter_by(biome_id=b.id).limit(200).all()
-    life_summaries = [{'id': l.id, 'name': l.name, 'trophic_level': l.trophic_level, 'domain': l.domain} for l in life_q]
 
-    data = b.to_dict()
-    data['lifeforms'] = life_summaries
+@biomes_bp.route('/<biome_id>/lifeforms', methods=['GET'])
+def get_biome_lifeforms(biome_id):
+    """
+    A biome's lifeforms ordered by (name, id).
 
-    return jsonify(data)
+    ?cursor=  ?per_page=20 (max 200)  ?fields=id,name,... (any lifeform field)
+    """
+    try:
+        per_page = parse_per_page(request.args.get('per_page'), 20, MAX_PER_PAGE)
+        fields = parse_fields(request.args.get('fields'), LIFEFORM_FIELDS)
+        items, next_cursor = biome_lifeforms_page(biome_id, fields, request.args.get('cursor'), per_page)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if not items and not request.args.get('cursor') and db.session.get(Biome, biome_id) is None:
+        return jsonify({'error': 'biome not found'}), 404
+
+    return jsonify({
+        'per_page': per_page,
+        'next_cursor': next_cursor,
+        'items': items,
+    })
@@ -1,12 +1,125 @@
 from flask import Blueprint, jsonify, request
 from app.models import Lifeform
+from app.extensions import db
+from app.services.http_cache import CATALOG_MAX_AGE, cache_for, conditional
+from app.services.response_cache import cached_json
+from app.services.pagination import keyset_page, parse_fields, parse_per_page
 
 lifeforms_bp = Blueprint('lifeforms_api', __name__)
 
+# ?fields= may pick any of these; id and name (the sort key) are always included
+LIFEFORM_FIELDS = ('id', 'biome_id', 'name', 'domain', 'trophic_level', 'reproduction_type',
+                   'lifespan_years', 'adult_size_kg', 'complexity',
+                   'anatomy', 'physiology', 'genetics', 'ecology', 'special_abilities')
+MAX_PER_PAGE = 200
+# most ids one batch request may ask for
+MAX_BATCH = 500
+
+
+def lifeform_filters(args):
+    """WHERE clauses for /search; list attributes use JSONB containment (GIN indexed)."""
+    filters = []
+    for name in ('biome_id', 'domain', 'trophic_level'):
+        value = args.get(name)
+        if value:
+            filters.append(getattr(Lifeform, name) == value)
+
+    biome_type = args.get('biome_type')
+    if biome_type:
+        filters.append(Lifeform.ecology.contains({'biome_type': biome_type}))
+    abilities = args.getlist('ability')
+    if abilities:
+        filters.append(Lifeform.special_abilities.contains(abilities))
+    return filters
+
+
+@lifeforms_bp.route('/search', methods=['GET'])
+def search_lifeforms():
+    """
+    Keyset-paginated lifeform search ordered by (name, id).
+
+    Filters: biome_id, domain, trophic_level, biome_type (ecology),
+    ability (special_abilities contains; repeatable, all must match).
+    ?cursor=  ?per_page=20 (max 200)  ?fields=id,name,...
+    """
+    try:
+        per_page = parse_per_page(request.args.get('per_page'), 20, MAX_PER_PAGE)
+        fields = parse_fields(request.args.get('fields'), LIFEFORM_FIELDS)
+        q = db.select(*[getattr(Lifeform, f) for f in fields]).where(*lifeform_filters(request.args))
+        rows, next_cursor = keyset_page(q, [Lifeform.name, Lifeform.id], request.args.get('cursor'), per_page)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'per_page': per_page,
+        'next_cursor': next_cursor,
+        'items': [dict(row._mapping) for row in rows],
+    })
+
+
+def fetch_lifeforms(ids, fields):
+    """Rows for `ids` in one `WHERE id IN (...)` query, in the order asked.
+
+    Returns (items, missing): duplicates are collapsed and ids that do not
+    exist are listed in `missing` instead of failing the whole batch.
+    """
+    ids = list(dict.fromkeys(str(i) for i in ids))
+    if len(ids) > MAX_BATCH:
+        raise ValueError(f"at most {MAX_BATCH} ids per request")
+
+    rows = db.session.execute(
+        db.select(*[getattr(Lifeform, f) for f in fields]).where(Lifeform.id.in_(ids))
+    ).all() if ids else []
+    by_id = {row.id: dict(row._mapping) for row in rows}
+    return [by_id[i] for i in ids if i in by_id], [i for i in ids if i not in by_id]
+
+
+def _batch_response(ids, fields):
+    try:
+        fields = parse_fields(fields, LIFEFORM_FIELDS)
+        items, missing = fetch_lifeforms(ids, fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'items': items, 'missing': missing})
+
+
+@lifeforms_bp.route('/', methods=['GET'])
+def list_lifeforms():
+    """
+    ?ids=a,b,c  many lifeforms in one request (max 500), in the order given.
+    ?fields=id,name,...  only serialise these columns.
+    Returns {"items": [...], "missing": [ids not found]}.
+    """
+    ids = [i.strip() for i in request.args.get('ids', '').split(',') if i.strip()]
+    if not ids:
+        return jsonify({'error': 'ids is required'}), 400
+    return _batch_response(ids, request.args.get('fields'))
+
+
+@lifeforms_bp.route('/batch', methods=['POST'])
+def batch_lifeforms():
+    """
+    POST {"ids": [...], "fields": "id,name,..." or [...]}: the same as
+    GET /?ids= for id lists too long for a query string.
+    """
+    body = request.get_json(silent=True) or {}
+    ids = body.get('ids')
+    if not isinstance(ids, list) or not ids:
+        return jsonify({'error': 'ids must be a non-empty list'}), 400
+    fields = body.get('fields')
+    if isinstance(fields, list):
+        fields = ','.join(str(f) for f in fields)
+    return _batch_response(ids, fields)
+
+
 @lifeforms_bp.route('/<life_id>', methods=['GET'])
+@conditional
 def get_lifeform(life_id):
-    lf = Lifeform.query.get(life_id)
-    if not lf:
-        return jsonify({'error': 'lifeform not found'}), 404
+    def build():
+        lf = db.session.get(Lifeform, life_id)
+        return lf.to_dict() if lf else None
 
-    return jsonify(lf.to_dict())
+    response = cached_json('lifeforms', life_id, build)
+    if response is None:
+        return jsonify({'error': 'lifeform not found'}), 404
+    return cache_for(response, CATALOG_MAX_AGE)
@@ -1,29 +1,262 @@
-from flask import Blueprint, jsonify
-from app.models import Galaxy
+from flask import Blueprint, Response, jsonify, request, abort
+from sqlalchemy import func, literal_column, or_
+from app.extensions import db
+from app.models import Galaxy, Universe
+from app.services import columnar, response_cache
+from app.services.http_cache import IMMUTABLE_MAX_AGE, cache_for, conditional
+from app.services.pagination import keyset_page, parse_fields, parse_per_page
+from app.services.spatial import BITS, cell_shift, grid_index, morton_ranges
+from app.services.system_generator import generate_star_systems_for_galaxy, prefetch_neighbours
+from app.services.world_generator import galaxies_complete, materialize_galaxies
+import math
 
 api_bp = Blueprint("api", __name__, url_prefix="/api")
 
+# Level of detail: below DETAIL_ZOOM a viewport is answered with one
+# aggregate per quadtree cell of roughly CLUSTER_PX screen pixels
+DETAIL_ZOOM = 0.25
+CLUSTER_PX = 24
+# most individual galaxies returned for one viewport
+MAX_POINTS = 5000
+# picking grid shipped with viewport payloads (GRID_CELLS x GRID_CELLS)
+GRID_CELLS = 16
+# largest search radius /galaxies/nearest accepts, in world units
+MAX_PICK_RADIUS = 5000
+
+# /universes/<id>/galaxies page size (default, max) and selectable fields
+GALAXY_PAGE = 100
+MAX_GALAXY_PAGE = 1000
+UNIVERSE_GALAXY_FIELDS = ("id", "ordinal", "name", "type", "num_stars", "x", "y")
+
+# (name, columnar type) of each payload's fields; JSON uses the same names
+GALAXY_COLUMNS = [("id", "u32"), ("name", "str"), ("cluster", "cat"), ("x", "i32"), ("y", "i32")]
+CLUSTER_COLUMNS = [("cell", "u32"), ("count", "u32"), ("x", "i32"), ("y", "i32")]
+SYSTEM_COLUMNS = [("id", "u32"), ("name", "str"), ("star_type", "cat"), ("x", "i32"), ("y", "i32")]
+
+
+def _parse_bbox(value):
+    try:
+        x0, y0, x1, y1 = (float(v) for v in value.split(","))
+    except ValueError:
+        abort(400, "bbox must be x0,y0,x1,y1")
+    # float() also takes nan and inf, which cannot be mapped to the grid
+    if not all(math.isfinite(c) for c in (x0, y0, x1, y1)):
+        abort(400, "bbox must be finite numbers")
+    return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
+
+
+def _lod_level(zoom):
+    """Quadtree level whose cells are about CLUSTER_PX on screen at `zoom`."""
+    level = int(math.log2(max(zoom, 1e-6) * (1 << BITS) / CLUSTER_PX))
+    return max(1, min(BITS - 1, level))
+
+
+def _viewport(universe_id, bbox, zoom):
+    """Galaxies (or per-cell aggregates when zoomed out) inside `bbox`.
+
+    Returns (kind, rows, meta): "galaxies" rows are GALAXY_COLUMNS tuples,
+    "clusters" rows are CLUSTER_COLUMNS tuples.
+    """
+    x0, y0, x1, y1 = bbox
+    where = [
+        Galaxy.universe_id == universe_id,
+        or_(*[Galaxy.morton.between(lo, hi) for lo, hi in morton_ranges(x0, y0, x1, y1)]),
+        Galaxy.x.between(x0, x1),
+        Galaxy.y.between(y0, y1),
+    ]
+
+    if zoom < DETAIL_ZOOM:
+        level = _lod_level(zoom)
+        cell = Galaxy.morton.op(">>")(literal_column(str(cell_shift(level))))
+        rows = db.session.execute(
+            db.select(cell, func.count(), func.avg(Galaxy.x), func.avg(Galaxy.y))
+            .where(*where)
+            .group_by(cell)
+        ).all()
+        rows = [(c, n, round(float(x)), round(float(y))) for c, n, x, y in rows]
+        return "clusters", rows, {"level": level}
+
+    rows = db.session.execute(
+        db.select(Galaxy.id, Galaxy.name, Galaxy.type, Galaxy.x, Galaxy.y)
+        .where(*where)
+        .order_by(Galaxy.morton)
+        .limit(MAX_POINTS + 1)
+    ).all()
+    truncated = len(rows) > MAX_POINTS
+
+    cell = max(x1 - x0, y1 - y0, 1) / GRID_CELLS
+    rows, starts = grid_index(rows[:MAX_POINTS], lambda r: (r[3], r[4]), x0, y0, cell, GRID_CELLS, GRID_CELLS)
+    grid = {"x0": x0, "y0": y0, "cell": cell, "cols": GRID_CELLS, "rows": GRID_CELLS, "starts": starts}
+    return "galaxies", rows, {"level": None, "truncated": truncated, "grid": grid}
+
+
+def _records(spec, rows):
+    return [dict(zip((name for name, _ in spec), row)) for row in rows]
+
+
+def _columnar(spec, rows, **meta):
+    columns = list(zip(*rows)) if rows else [()] * len(spec)
+    body = columnar.encode([(name, type_, col) for (name, type_), col in zip(spec, columns)], **meta)
+    return Response(body, mimetype=columnar.MIMETYPE)
+
+
+@api_bp.after_request
+def _vary_on_accept(response):
+    # the same URL answers JSON or columnar depending on Accept
+    response.vary.add("Accept")
+    return response
+
+
+def _seed_derived(response, final=True):
+    """Mark a response immutable once the data behind it is fully generated."""
+    if final:
+        cache_for(response, IMMUTABLE_MAX_AGE, immutable=True)
+    return response
+
+
 @api_bp.route("/galaxies")
+@conditional
 def api_galaxies():
-    galaxies = Galaxy.query.limit(2000).all()  # reduce load for testing
+    """
+    ?universe=<id>  scope to one universe (materialises lazy universes on first touch)
+    ?bbox=x0,y0,x1,y1&zoom=<z>  only what is inside the viewport (needs
+        ?universe); returns
+        {"level", "galaxies", "clusters", "truncated"} where zoomed-out
+        views come back as per-cell "clusters" instead of galaxies.
+    Without bbox the legacy flat list (first 2000 galaxies) is returned.
+
+    Clients that send `Accept: application/vnd.gallactization.columnar` get
+    the same rows as one columnar table (app.services.columnar) with
+    "kind", "level" and "truncated" in its header.
+
+    Scoped to a fully generated universe the answer never changes and is
+    served as immutable; unscoped lists grow with every new universe.
+    """
+    q = db.select(Galaxy.id, Galaxy.name, Galaxy.type, Galaxy.x, Galaxy.y)
+
+    final = False
+    universe_id = request.args.get("universe", type=int)
+    if universe_id is not None:
+        universe = Universe.query.get_or_404(universe_id)
+        materialize_galaxies(universe)
+        final = galaxies_complete(universe)
+        q = q.where(Galaxy.universe_id == universe_id).order_by(Galaxy.ordinal)
+
+    binary = columnar.wants_columnar(request)
+
+    bbox = request.args.get("bbox")
+    if bbox:
+        if universe_id is None:
+            # the spatial index leads with universe_id; unscoped it would be a full scan
+            abort(400, "bbox needs universe=<id>")
+        zoom = request.args.get("zoom", default=1.0, type=float)
+        if not math.isfinite(zoom):
+            abort(400, "zoom must be a finite number")
+        kind, rows, meta = _viewport(universe_id, _parse_bbox(bbox), zoom)
+        spec = GALAXY_COLUMNS if kind == "galaxies" else CLUSTER_COLUMNS
+        if binary:
+            return _seed_derived(_columnar(spec, rows, kind=kind, **meta), final)
+        return _seed_derived(jsonify({
+            "galaxies": [], "clusters": [], "truncated": False,
+            **meta,
+            kind: _records(spec, rows),
+        }), final)
+
+    rows = db.session.execute(q.limit(2000)).all()  # reduce load for testing
+    if binary:
+        return _seed_derived(_columnar(GALAXY_COLUMNS, rows, kind="galaxies"), final)
+    return _seed_derived(jsonify(_records(GALAXY_COLUMNS, rows)), final)
+
+
+@api_bp.route("/universes/<int:universe_id>/galaxies")
+@conditional
+def api_universe_galaxies(universe_id):
+    """
+    One universe's galaxies in ordinal order, keyset paginated along the
+    (universe_id, ordinal) unique index, so every page is an index range
+    scan however many universes share the table.
+
+    ?cursor=<next_cursor>  ?per_page=100 (max 1000)  ?fields=id,name,...
+    """
+    universe = Universe.query.get_or_404(universe_id)
+    materialize_galaxies(universe)
+
+    try:
+        per_page = parse_per_page(request.args.get("per_page"), GALAXY_PAGE, MAX_GALAXY_PAGE)
+        fields = parse_fields(request.args.get("fields"), UNIVERSE_GALAXY_FIELDS, required=("id", "ordinal"))
+        q = db.select(*[getattr(Galaxy, f) for f in fields]).where(Galaxy.universe_id == universe_id)
+        rows, next_cursor = keyset_page(q, [Galaxy.ordinal], request.args.get("cursor"), per_page)
+    except ValueError as e:
+        abort(400, str(e))
+
+    return _seed_derived(jsonify({
+        "universe_id": universe_id,
+        "per_page": per_page,
+        "next_cursor": next_cursor,
+        "items": [dict(row._mapping) for row in rows],
+    }), galaxies_complete(universe))
+
+
+@api_bp.route("/galaxies/nearest")
+def api_galaxies_nearest():
+    """
+    ?x=&y=&r=&universe=<id>[&k=1]  the k galaxies nearest to (x, y) within
+    radius r, nearest first. Served from ix_galaxies_universe_morton: the
+    search square becomes a few Morton key ranges, so the cost depends on the
+    galaxies near the point, not on the size of the universe.
+    """
+    x = request.args.get("x", type=float)
+    y = request.args.get("y", type=float)
+    if x is None or y is None:
+        abort(400, "x and y are required")
+    if not (math.isfinite(x) and math.isfinite(y)):
+        abort(400, "x and y must be finite numbers")
+    universe_id = request.args.get("universe", type=int)
+    if universe_id is None:
+        abort(400, "universe is required")
+    r = request.args.get("r", default=50.0, type=float)
+    if math.isnan(r):
+        abort(400, "r must be a number")
+    r = min(max(r, 0.0), MAX_PICK_RADIUS)
+    k = min(max(request.args.get("k", default=1, type=int), 1), 100)
+
+    where = [
+        or_(*[Galaxy.morton.between(lo, hi) for lo, hi in morton_ranges(x - r, y - r, x + r, y + r)]),
+        Galaxy.x.between(x - r, x + r),
+        Galaxy.y.between(y - r, y + r),
+        Galaxy.universe_id == universe_id,
+    ]
 
-    data = []
-    for g in galaxies:
+    dist2 = (Galaxy.x - x) * (Galaxy.x - x) + (Galaxy.y - y) * (Galaxy.y - y)
+    rows = db.session.execute(
+        db.select(Galaxy.id, Galaxy.name, Galaxy.type, Galaxy.x, Galaxy.y, dist2)
+        .where(*where, dist2 <= r * r)
+        .order_by(dist2, Galaxy.id)
+        .limit(k)
+    ).all()
+    return jsonify([
+        {**dict(zip((name for name, _ in GALAXY_COLUMNS), row[:5])), "distance": round(float(row[5]) ** 0.5, 2)}
+        for row in rows
+    ])
 
-        # Convert ID to int (always safe)
-        gid = int(g.id)
 
-        # Generate deterministic coordinates from ID only
-        x = ((gid * 7919) % 50000) - 25000
-        y = ((gid * 15401) % 50000) - 25000
+@api_bp.route("/galaxies/<int:gid>/systems")
+@conditional
+def api_galaxy_systems(gid):
+    """Star systems of a galaxy (derived on first request), as JSON or columnar.
 
-        data.append({
-            "id": g.id,
-            "name": g.name,
-            "cluster": g.type,
-            "x": x,
-            "y": y
-        })
+    Derived from the galaxy seed in one go, so immutable once returned.
+    """
+    galaxy = Galaxy.query.get_or_404(gid)
+    systems = generate_star_systems_for_galaxy(galaxy)
+    prefetch_neighbours(galaxy)
+    rows = [(s.id, s.name, s.star_type, s.position_x, s.position_y) for s in systems]
+    if columnar.wants_columnar(request):
+        return _seed_derived(_columnar(SYSTEM_COLUMNS, rows, kind="systems", galaxy_id=gid))
+    return _seed_derived(jsonify(_records(SYSTEM_COLUMNS, rows)))
 
-    return jsonify(data)
 
+@api_bp.route("/cache/stats")
+def api_cache_stats():
+    """Hit/miss counters of the serialized-response cache (this process)."""
+    return jsonify(response_cache.cache.stats())
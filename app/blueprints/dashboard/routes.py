@@ -14,6 +14,7 @@ def index():
         .order_by(Universe.created_at.desc())
         .all()
     )
+    universes = [u for u in universes if not u.deleting]
 
     return render_template(
         'dashboard.html',
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, session, redirect, url_for
+from flask import Blueprint, render_template, request, session, redirect, url_for
 from ...models.galaxy import Galaxy
 galaxy_bp = Blueprint('galaxy', __name__)
 
@@ -6,7 +6,12 @@ galaxy_bp = Blueprint('galaxy', __name__)
 def list_galaxies():
     if not session.get('user_id'):
         return redirect(url_for('auth.login'))
-    galaxies = Galaxy.query.limit(200).all()
+    query = Galaxy.query
+    universe_id = request.args.get('universe', type=int)
+    if universe_id is not None:
+        # served by the (universe_id, ordinal) unique index
+        query = query.filter_by(universe_id=universe_id).order_by(Galaxy.ordinal)
+    galaxies = query.limit(200).all()
     return render_template('galaxies.html', galaxies=galaxies)
 
 @galaxy_bp.route('/view/<int:gid>')
@@ -1,12 +1,20 @@
-from flask import Blueprint, jsonify, redirect, url_for, render_template
+from flask import Blueprint, Response, current_app, jsonify, redirect, url_for, render_template
 from flask_login import current_user, login_required
+import json
+import queue
 
+from app.extensions import db
 from app.models import JobQueue
+from app.services.job_events import broker, FINISHED_STATUSES
 from app.services.job_queue import (
     enqueue_generate_universe_job,
     get_job_status
 )
 
+# Idle SSE streams send a keep-alive comment this often, and re-read the job
+# row as a safety net in case a notification was missed
+STREAM_KEEPALIVE = 15
+
 game_bp = Blueprint("game", __name__, url_prefix="/game")
 
 
@@ -57,6 +65,56 @@ def job_status(job_id):
     return jsonify(status)
 
 
+# --------------------------------------------------------
+# 3b) Job Status stream (Server-Sent Events)
+# --------------------------------------------------------
+def _sse(event):
+    return f"data: {json.dumps(event)}\n\n"
+
+
+@game_bp.get("/job-stream/<int:job_id>")
+@login_required
+def job_stream(job_id):
+    """
+    Pushes job changes as they happen instead of being polled.
+    Each event is a JSON delta {id, status?, progress?, message?}; the stream
+    ends once the job is finished. /job-status stays as the polling fallback.
+    """
+    # subscribe before reading the row so no change can slip in between
+    q = broker.subscribe(current_app._get_current_object(), job_id)
+    status = get_job_status(job_id)
+    # don't hold a pooled connection for the lifetime of the stream
+    db.session.remove()
+    if not status:
+        broker.unsubscribe(job_id, q)
+        return jsonify({"error": "Job not found"}), 404
+
+    app = current_app._get_current_object()
+
+    def stream(last):
+        yield _sse(last)
+        while last.get("status") not in FINISHED_STATUSES:
+            try:
+                event = q.get(timeout=STREAM_KEEPALIVE)
+            except queue.Empty:
+                with app.app_context():
+                    current = get_job_status(job_id)
+                    db.session.remove()
+                if current and current != last:
+                    last = current
+                    yield _sse(current)
+                else:
+                    yield ": keep-alive\n\n"
+                continue
+            last = {**last, **event}
+            yield _sse(event)
+
+    response = Response(stream(status), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    response.call_on_close(lambda: broker.unsubscribe(job_id, q))
+    return response
+
+
 
 # --------------------------------------------------------
 # 4) Start Game SESSION  (load/save game)
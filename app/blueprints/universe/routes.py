@@ -4,6 +4,7 @@ from app.models.universe import Universe
 from app.models.save_game import SaveGame
 from app.models.galaxy import Galaxy
 from app.extensions import db
+from app.services.job_queue import enqueue_universe_gc_job
 
 universe_bp = Blueprint("universe", __name__, url_prefix="/universe")
 
@@ -16,7 +17,8 @@ def index():
         .order_by(Universe.created_at.desc())
         .all()
     )
-    return render_template("universe/list.html", universes=universes)
+    universes = [u for u in universes if not u.deleting]
+    return render_template("universe/index.html", universes=universes)
 
 
 @universe_bp.get("/<int:universe_id>/choose")
@@ -29,3 +31,15 @@ def choose_universe(universe_id):
         .all()
     )
     return render_template("universe/saves.html", universe=universe, saves=saves)
+
+
+@universe_bp.post("/<int:universe_id>/delete")
+@login_required
+def delete_universe(universe_id):
+    """Hide the universe right away and delete its data in a background job."""
+    universe = Universe.query.filter_by(id=universe_id, user_id=current_user.id).first_or_404()
+    universe.meta = {**(universe.meta or {}), "deleting": True}
+    db.session.commit()
+
+    job_id = enqueue_universe_gc_job(current_user.id, universe_id)
+    return redirect(url_for("game.job_status_page", job_id=job_id))
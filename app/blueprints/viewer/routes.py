@@ -1,22 +1,69 @@
-from flask import Blueprint, render_template
+from flask import Blueprint, Response, redirect, render_template, jsonify, request, send_file, abort, url_for
+from flask_login import current_user
 from app.models.galaxy import Galaxy
-from app.services.system_generator import generate_star_systems_for_galaxy
+from app.models.universe import Universe
+from app.services import columnar
+from app.services.http_cache import IMMUTABLE_MAX_AGE, cache_for
+from app.services.loaders import systems_with_planets
+from app.services.query_budget import query_budget
+from app.services.system_generator import generate_star_systems_for_galaxy, prefetch_neighbours
+from app.services.tiles import MAX_TILE_ZOOM, render_tile, tile_exists, tile_path, tiles_cache_key
+from app.services.world_generator import galaxies_complete, materialize_galaxies
 from app.models.system import StarSystem
 
 viewer_bp = Blueprint("viewer", __name__, url_prefix="/viewer")
 
 @viewer_bp.route("/galaxy-map")
 def galaxy_map():
-    return render_template("galaxy_map/index.html")
+    # the map draws one universe; default to the player's newest one
+    if "universe" not in request.args and current_user.is_authenticated:
+        universes = (Universe.query.filter_by(user_id=current_user.id)
+                     .order_by(Universe.created_at.desc()).all())
+        newest = next((u for u in universes if not u.deleting), None)
+        if newest is not None:
+            return redirect(url_for("viewer.galaxy_map", universe=newest.id))
+    return render_template("galaxy_map/index.html", universe_id=request.args.get("universe", type=int))
 @viewer_bp.route("/galaxy/<int:gid>")
 @viewer_bp.route("/galaxy/<int:gid>")
+@query_budget(16)  # 3 on a revisit; the first visit also writes the systems
 def galaxy_detail(gid):
     galaxy = Galaxy.query.get_or_404(gid)
 
-    # Auto-generate star systems if missing
-    #systems = generate_star_systems_for_galaxy(galaxy, n=10)
-    systems = StarSystem.query.filter_by(galaxy_id=gid).all()
+    # Derive star systems from the galaxy seed on first visit
+    systems = generate_star_systems_for_galaxy(galaxy, options=systems_with_planets(galaxy.universe_id))
+    # ...and in the background for the galaxies around it, likely the next ones opened
+    prefetch_neighbours(galaxy)
 
     return render_template("galaxy_map/galaxy_detail.html",
                            galaxy=galaxy,
                            systems=systems)
+
+
+@viewer_bp.route("/tiles/<int:universe_id>.json")
+def tile_info(universe_id):
+    """Tile set description; the version goes into tile URLs as ?v= for caching."""
+    universe = Universe.query.get_or_404(universe_id)
+    materialize_galaxies(universe)
+    return jsonify({"version": tiles_cache_key(universe), "max_zoom": MAX_TILE_ZOOM})
+
+
+@viewer_bp.route("/tiles/<int:universe_id>/<int:z>/<int:x>/<int:y>.bin")
+def galaxy_tile(universe_id, z, x, y):
+    if not tile_exists(z, x, y):
+        abort(404)
+    universe = Universe.query.get_or_404(universe_id)
+    materialize_galaxies(universe)
+
+    if not galaxies_complete(universe):
+        # still being generated: the tile is partial, so neither cache nor store it
+        response = Response(render_tile(universe.id, z, x, y), mimetype=columnar.MIMETYPE)
+        response.headers["Cache-Control"] = "no-store"
+        return response
+
+    response = send_file(tile_path(universe, z, x, y), mimetype=columnar.MIMETYPE)
+    if request.args.get("v") == tiles_cache_key(universe):
+        # versioned URL: the bytes behind it never change
+        cache_for(response, IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        response.headers["Cache-Control"] = "no-cache"
+    return response
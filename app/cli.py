@@ -0,0 +1,53 @@
+import os
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app.services.response_cache import cache as response_cache
+from app.services.seeder import seed_biomes, seed_lifeforms
+
+seed_cli = AppGroup("seed", help="Stream generated biomes / lifeforms into the DB.")
+
+
+def _checkpoint_path(name, path):
+    if path:
+        return path
+    os.makedirs(current_app.instance_path, exist_ok=True)
+    return os.path.join(current_app.instance_path, f"seed_{name}.checkpoint.json")
+
+
+@seed_cli.command("biomes")
+@click.option("--count", default=100, show_default=True, help="Total biomes to generate.")
+@click.option("--chunk-size", default=5000, show_default=True, help="Rows per COPY / commit.")
+@click.option("--seed", type=int, default=None, help="Generator seed (kept in the checkpoint).")
+@click.option("--checkpoint", default=None, help="Checkpoint file (default: instance/seed_biomes.checkpoint.json).")
+@click.option("--restart", is_flag=True, help="Ignore an existing checkpoint.")
+def seed_biomes_command(count, chunk_size, seed, checkpoint, restart):
+    """Generate and COPY biomes, resuming from the last checkpoint."""
+    path = _checkpoint_path("biomes", checkpoint)
+    if restart and os.path.exists(path):
+        os.remove(path)
+    try:
+        n = seed_biomes(count, chunk_size=chunk_size, seed=seed, checkpoint=path, log=click.echo)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    response_cache.clear()  # COPY bypasses the ORM invalidation hooks
+    click.echo(f"Seeded {n} biomes")
+
+
+@seed_cli.command("lifeforms")
+@click.option("--chunk-size", default=1000, show_default=True, help="Biomes per COPY / commit.")
+@click.option("--seed", type=int, default=None, help="Generator seed (kept in the checkpoint).")
+@click.option("--checkpoint", default=None, help="Checkpoint file (default: instance/seed_lifeforms.checkpoint.json).")
+@click.option("--restart", is_flag=True, help="Ignore an existing checkpoint.")
+def seed_lifeforms_command(chunk_size, seed, checkpoint, restart):
+    """Generate and COPY lifeforms for every biome, resuming from the last checkpoint."""
+    path = _checkpoint_path("lifeforms", checkpoint)
+    if restart and os.path.exists(path):
+        os.remove(path)
+    try:
+        n = seed_lifeforms(chunk_size=chunk_size, seed=seed, checkpoint=path, log=click.echo)
+    except (ValueError, RuntimeError) as e:
+        raise click.ClickException(str(e))
+    response_cache.clear()  # COPY bypasses the ORM invalidation hooks
+    click.echo(f"Seeded {n} lifeforms")
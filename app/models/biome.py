@@ -3,6 +3,15 @@ from sqlalchemy.dialects.postgresql import JSONB
 
 class Biome(db.Model):
     __tablename__ = 'biomes'
+    __table_args__ = (
+        # keyset pagination of the biome list: ORDER BY name, id
+        db.Index('ix_biomes_name_id', 'name', 'id'),
+        # /api/biomes/search: containment (@>) filters on the nested JSONB
+        db.Index('ix_biomes_soil_gin', 'soil', postgresql_using='gin', postgresql_ops={'soil': 'jsonb_path_ops'}),
+        db.Index('ix_biomes_fauna_gin', 'fauna', postgresql_using='gin', postgresql_ops={'fauna': 'jsonb_path_ops'}),
+        db.Index('ix_biomes_special_features_gin', 'special_features', postgresql_using='gin',
+                 postgresql_ops={'special_features': 'jsonb_path_ops'}),
+    )
     id = db.Column(db.String(64), primary_key=True)
     name = db.Column(db.String(200), nullable=False, index=True)
     base_type = db.Column(db.String(100), nullable=False, index=True)
@@ -16,6 +25,11 @@ class Biome(db.Model):
     fauna = db.Column(JSONB, nullable=False, default=dict)
     special_features = db.Column(JSONB, nullable=False, default=list)
 
+    # hot numeric climate fields, extracted from the JSONB so range filters can use a B-tree
+    humidity = db.Column(db.Float, db.Computed("(climate->>'humidity_level')::double precision"), index=True)
+    temperature_min = db.Column(db.Float, db.Computed("(climate->'temperature_range'->>0)::double precision"), index=True)
+    temperature_max = db.Column(db.Float, db.Computed("(climate->'temperature_range'->>1)::double precision"), index=True)
+
     # relationship: one biome -> many lifeforms
     #lifeforms = db.relationship('Lifeform', backref='biome', cascade='all, delete-orphan', lazy='dynamic')
     planet_links = db.relationship("PlanetBiome", back_populates="biome", lazy=True)
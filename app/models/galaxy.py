@@ -3,14 +3,23 @@ from datetime import datetime
 
 class Galaxy(db.Model):
     __tablename__ = "galaxies"
+    __table_args__ = (
+        db.UniqueConstraint("universe_id", "ordinal", name="uq_galaxies_universe_ordinal"),
+        # viewport queries: morton key ranges per universe, x/y read from the index
+        db.Index("ix_galaxies_universe_morton", "universe_id", "morton", postgresql_include=["x", "y"]),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     universe_id = db.Column(db.Integer, db.ForeignKey("universes.id"), nullable=False)
 
+    ordinal = db.Column(db.Integer)  # position in the universe, the procgen path key
     name = db.Column(db.String(120))
     seed = db.Column(db.BigInteger, nullable=False)
     num_stars = db.Column(db.BigInteger)
     type = db.Column(db.String(50))
+    x = db.Column(db.Integer)  # map position in world units
+    y = db.Column(db.Integer)
+    morton = db.Column(db.BigInteger)  # Z-order key of (x, y), see app.services.spatial
     meta = db.Column(db.JSON, default={})
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
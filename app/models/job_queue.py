@@ -14,6 +14,14 @@ class JobQueue(db.Model):
 
     meta = db.Column(JSONB, default={})
 
+    # Lease held by the worker running the job; renewed by heartbeats. A
+    # running job whose lease has expired belonged to a dead worker and is
+    # re-queued (see requeue_expired_jobs).
+    worker_id = db.Column(db.String(120))
+    heartbeat_at = db.Column(db.DateTime)
+    lease_expires_at = db.Column(db.DateTime)
+    attempts = db.Column(db.Integer, default=0)
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
@@ -3,11 +3,22 @@ from sqlalchemy.dialects.postgresql import JSONB
 
 class Lifeform(db.Model):
     __tablename__ = 'lifeforms'
+    __table_args__ = (
+        # keyset pagination of lifeform lists: ORDER BY name, id
+        db.Index('ix_lifeforms_name_id', 'name', 'id'),
+        # a biome's lifeforms, keyset paginated: WHERE biome_id = ? ORDER BY name, id
+        db.Index('ix_lifeforms_biome_name_id', 'biome_id', 'name', 'id'),
+        # /api/lifeforms/search: containment (@>) filters on the JSONB
+        db.Index('ix_lifeforms_ecology_gin', 'ecology', postgresql_using='gin',
+                 postgresql_ops={'ecology': 'jsonb_path_ops'}),
+        db.Index('ix_lifeforms_special_abilities_gin', 'special_abilities', postgresql_using='gin',
+                 postgresql_ops={'special_abilities': 'jsonb_path_ops'}),
+    )
     id = db.Column(db.String(64), primary_key=True)
     biome_id = db.Column(db.String(64), db.ForeignKey('biomes.id', ondelete='CASCADE'), nullable=False, index=True)
     name = db.Column(db.String(200), nullable=False, index=True)
     domain = db.Column(db.String(50))
-    trophic_level = db.Column(db.String(50))
+    trophic_level = db.Column(db.String(50), index=True)
     reproduction_type = db.Column(db.String(50))
     lifespan_years = db.Column(db.Float)
     adult_size_kg = db.Column(db.Float)
@@ -3,6 +3,11 @@ from datetime import datetime
 
 class Planet(db.Model):
     __tablename__ = "planets"
+    __table_args__ = (
+        # a system's planets (selectinload from StarSystem.planets), in orbit order
+        db.Index("ix_planets_system_position", "system_id", "position"),
+        db.Index("ix_planets_universe_id", "universe_id", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
@@ -13,6 +18,7 @@ class Planet(db.Model):
 
     system = db.relationship("StarSystem", back_populates="planets")
     system_id = db.Column(db.Integer, db.ForeignKey("star_systems.id"))
+    universe_id = db.Column(db.Integer, db.ForeignKey("universes.id"))  # denormalised from the system
 
     # FIXED — NO backref, NO duplicate attribute
     biomes = db.relationship("PlanetBiome", back_populates="planet", lazy=True)
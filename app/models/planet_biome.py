@@ -5,11 +5,18 @@ from datetime import datetime
 
 class PlanetBiome(db.Model):
     __tablename__ = "planet_biomes"
+    __table_args__ = (
+        db.Index("ix_planet_biomes_planet_id", "planet_id"),
+        # which planets carry a biome
+        db.Index("ix_planet_biomes_biome_id", "biome_id"),
+        db.Index("ix_planet_biomes_universe_id", "universe_id", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
     planet_id = db.Column(db.Integer, db.ForeignKey("planets.id"))
     biome_id = db.Column(db.String(64), db.ForeignKey("biomes.id"))
+    universe_id = db.Column(db.Integer, db.ForeignKey("universes.id"))  # denormalised from the planet
 
     meta = db.Column(db.JSON, default={})
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
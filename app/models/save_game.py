@@ -3,6 +3,11 @@ from datetime import datetime
 
 class SaveGame(db.Model):
     __tablename__ = "save_games"
+    __table_args__ = (
+        # a player's saves in one universe, newest first
+        db.Index("ix_save_games_universe_user_created", "universe_id", "user_id", "created_at"),
+        db.Index("ix_save_games_user_id", "user_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
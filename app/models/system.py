@@ -3,9 +3,15 @@ from datetime import datetime
 
 class StarSystem(db.Model):
     __tablename__ = "star_systems"
+    __table_args__ = (
+        db.UniqueConstraint("galaxy_id", "ordinal", name="uq_star_systems_galaxy_ordinal"),
+        db.Index("ix_star_systems_universe_id", "universe_id", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     galaxy_id = db.Column(db.Integer, db.ForeignKey("galaxies.id"))
+    universe_id = db.Column(db.Integer, db.ForeignKey("universes.id"))  # denormalised from the galaxy
+    ordinal = db.Column(db.Integer)  # position in the galaxy, the procgen path key
     name = db.Column(db.String(120), nullable=False)
     star_type = db.Column(db.String(50))
     position_x = db.Column(db.Integer)
@@ -14,4 +20,4 @@ class StarSystem(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     galaxy = db.relationship("Galaxy", back_populates="systems")
-    planets = db.relationship("Planet", back_populates="system", lazy=True)
+    planets = db.relationship("Planet", back_populates="system", lazy=True, order_by="Planet.position")
@@ -5,7 +5,8 @@ class Universe(db.Model):
     __tablename__ = "universes"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    # NULL while the universe sits in the warm pool (app.services.universe_pool)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
 
     name = db.Column(db.String(120))
     seed = db.Column(db.BigInteger, nullable=False)  # <-- FIX ADDED HERE
@@ -13,5 +14,17 @@ class Universe(db.Model):
 
     meta = db.Column(db.JSON, default={})
 
+    __table_args__ = (
+        # dashboard / universe list: a user's universes, newest first
+        db.Index("ix_universes_user_created", user_id, created_at.desc()),
+        # the warm pool: unowned universes waiting to be claimed
+        db.Index("ix_universes_pool", id, postgresql_where=user_id.is_(None)),
+    )
+
     galaxies = db.relationship("Galaxy", back_populates="universe", lazy=True)
     saves = db.relationship("SaveGame", back_populates="universe", lazy=True)
+
+    @property
+    def deleting(self):
+        """Deletion has been queued (app.services.universe_gc); hide it from lists."""
+        return bool((self.meta or {}).get("deleting"))
@@ -0,0 +1,88 @@
+from sqlalchemy import text, select, func
+from app.extensions import db
+import csv
+import io
+import json
+
+
+def reserve_ids(table, count: int):
+    """Reserve `count` primary keys for `table` in a single round trip.
+
+    On PostgreSQL the ids are drawn from the table's serial sequence, so they
+    never collide with rows inserted concurrently through the ORM. Other
+    dialects (the local SQLite dev DBs) fall back to max(id) + n, which is only
+    safe for a single writer.
+    """
+    if count <= 0:
+        return []
+
+    if db.engine.dialect.name == "postgresql":
+        rows = db.session.execute(
+            text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :n)"),
+            {"table": table.name, "n": count},
+        )
+        return [r[0] for r in rows]
+
+    start = db.session.execute(select(func.coalesce(func.max(table.c.id), 0))).scalar() + 1
+    return list(range(start, start + count))
+
+
+def bulk_insert(table, rows, batch_size: int = 500):
+    """Insert plain dict rows with executemany, `batch_size` rows per statement."""
+    for i in range(0, len(rows), batch_size):
+        db.session.execute(table.insert(), rows[i:i + batch_size])
+
+
+def _csv_value(v):
+    if v is None:
+        return "\\N"
+    if isinstance(v, (dict, list, tuple)):
+        return json.dumps(v)
+    return v
+
+
+def copy_rows(table, columns, rows):
+    """Stream tuples into `table` with PostgreSQL COPY, skipping duplicate keys.
+
+    Rows are COPYed into a temp staging table and moved over with
+    INSERT ... ON CONFLICT DO NOTHING, so re-running a chunk after a crash is
+    harmless. dict/list values are written as JSON. Returns the number of
+    rows actually inserted. Other dialects fall back to bulk_insert.
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+
+    if db.engine.dialect.name != "postgresql":
+        bulk_insert(table, [dict(zip(columns, r)) for r in rows], len(rows))
+        return len(rows)
+
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    for r in rows:
+        writer.writerow([_csv_value(v) for v in r])
+    buf.seek(0)
+
+    stage = f"_stage_{table.name}"
+    cols = ", ".join(columns)
+    copy_sql = f"COPY {stage} ({cols}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+
+    conn = db.session.connection()
+    conn.exec_driver_sql(
+        f"CREATE TEMP TABLE IF NOT EXISTS {stage} (LIKE {table.name} INCLUDING DEFAULTS)"
+    )
+    cursor = conn.connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            cursor.copy_expert(copy_sql, buf)
+        else:  # psycopg 3
+            with cursor.copy(copy_sql) as copy:
+                copy.write(buf.getvalue())
+    finally:
+        cursor.close()
+
+    result = conn.exec_driver_sql(
+        f"INSERT INTO {table.name} ({cols}) SELECT {cols} FROM {stage} ON CONFLICT DO NOTHING"
+    )
+    conn.exec_driver_sql(f"TRUNCATE {stage}")
+    return result.rowcount
@@ -0,0 +1,119 @@
+"""
+Columnar binary encoding for map payloads (galaxies, systems, tiles).
+
+A payload is one table stored column by column so the browser can view each
+numeric column as a TypedArray over the response buffer without parsing:
+
+    b"GXC1"  header_len:u32  header:utf-8 JSON  pad
+    column blocks, in header order, each starting at a multiple of its
+    element size (8 for f64, 4 otherwise); the payload ends padded to 4
+
+    header = {"n": rows, "columns": [{"name", "type"[, "categories"]}, ...], **meta}
+
+Numeric types are little-endian u8/u16/u32/i32/f32/f64. "str" columns are
+u32 offsets[n+1] followed by the utf-8 bytes of every value. "cat" columns
+are u8 codes into the column's "categories" list, for low-cardinality
+strings such as the galaxy type. A TypedArray can only start at a multiple
+of its element size, hence the alignment. The browser's decoder lives in
+static/galaxy_map/columnar.js; decode() below reads the same layout.
+"""
+from array import array
+import json
+import struct
+import sys
+
+MAGIC = b"GXC1"
+MIMETYPE = "application/vnd.gallactization.columnar"
+
+TYPECODES = {"u8": "B", "u16": "H", "u32": "I", "i32": "i", "f32": "f", "f64": "d"}
+
+
+def _pad(buf: bytearray, align: int = 4):
+    buf.extend(b"\0" * (-len(buf) % align))
+
+
+def _align(type_) -> int:
+    return 8 if type_ == "f64" else 4
+
+
+def _numeric(type_, values) -> bytes:
+    a = array(TYPECODES[type_], values)
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a.tobytes()
+
+
+def _strings(values) -> bytes:
+    encoded = [(v or "").encode("utf-8") for v in values]
+    offsets = [0]
+    for s in encoded:
+        offsets.append(offsets[-1] + len(s))
+    return _numeric("u32", offsets) + b"".join(encoded)
+
+
+def encode(columns, **meta) -> bytes:
+    """Encode [(name, type, values), ...] (all the same length) into one payload.
+
+    Extra keyword arguments go into the header as-is.
+    """
+    n = len(columns[0][2]) if columns else 0
+    descriptors, blocks = [], []
+    for name, type_, values in columns:
+        values = list(values)
+        if len(values) != n:
+            raise ValueError(f"column {name!r} has {len(values)} values, expected {n}")
+        desc = {"name": name, "type": type_}
+        if type_ == "str":
+            blocks.append(_strings(values))
+        elif type_ == "cat":
+            categories = sorted({v or "" for v in values})
+            if len(categories) > 256:
+                raise ValueError(f"column {name!r} has too many categories for u8 codes")
+            codes = {c: i for i, c in enumerate(categories)}
+            desc["categories"] = categories
+            blocks.append(bytes(codes[v or ""] for v in values))
+        else:
+            blocks.append(_numeric(type_, values))
+        descriptors.append(desc)
+
+    header = json.dumps({"n": n, "columns": descriptors, **meta}, separators=(",", ":")).encode("utf-8")
+    buf = bytearray(MAGIC + struct.pack("<I", len(header)) + header)
+    for desc, block in zip(descriptors, blocks):
+        _pad(buf, _align(desc["type"]))
+        buf += block
+    _pad(buf)
+    return bytes(buf)
+
+
+def decode(payload: bytes):
+    """Inverse of encode(): (header, {name: list of values})."""
+    if payload[:4] != MAGIC:
+        raise ValueError("not a columnar payload")
+    (header_len,) = struct.unpack_from("<I", payload, 4)
+    header = json.loads(payload[8:8 + header_len])
+    n = header["n"]
+    offset = 8 + header_len
+    columns = {}
+    for desc in header["columns"]:
+        type_ = desc["type"]
+        offset += -offset % _align(type_)
+        if type_ == "str":
+            offsets = struct.unpack_from(f"<{n + 1}I", payload, offset)
+            start = offset + 4 * (n + 1)
+            columns[desc["name"]] = [payload[start + a:start + b].decode("utf-8")
+                                     for a, b in zip(offsets, offsets[1:])]
+            offset = start + offsets[-1]
+        elif type_ == "cat":
+            columns[desc["name"]] = [desc["categories"][c] for c in payload[offset:offset + n]]
+            offset += n
+        else:
+            code = TYPECODES[type_]
+            columns[desc["name"]] = list(struct.unpack_from(f"<{n}{code}", payload, offset))
+            offset += struct.calcsize(code) * n
+    return header, columns
+
+
+def wants_columnar(request) -> bool:
+    """True when the client's Accept header prefers the columnar format over JSON."""
+    best = request.accept_mimetypes.best_match(["application/json", MIMETYPE])
+    return best == MIMETYPE
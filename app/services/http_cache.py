@@ -0,0 +1,146 @@
+"""
+HTTP caching for generated content: ETags, 304s and response compression.
+
+Views wrapped in @conditional get an ETag computed from the response body
+and answer `If-None-Match` with 304 Not Modified. A view marks how long its
+answer stays valid with cache_for(); seed-derived content (a finished
+universe's galaxies, a galaxy's systems) never changes and is `immutable`.
+
+For responses with a max-age the ETag is also remembered per URL (and
+Accept header) in this process, so a conditional request for it within
+that max-age is answered 304 before the view runs, without touching the
+database. app.services.response_cache forgets them (forget_etags) whenever
+a catalog row it caches is written, so that shortcut never outlives the
+data it stands for.
+
+init_http_cache also gzips (or, when the optional `brotli` package is
+installed, brotli-compresses) large JSON and columnar responses.
+"""
+from collections import OrderedDict
+from functools import wraps
+import gzip
+import threading
+import time
+
+from flask import Response, make_response, request
+
+from app.services import columnar
+
+try:
+    import brotli
+except ImportError:  # optional, gzip only
+    brotli = None
+
+IMMUTABLE_MAX_AGE = 31536000  # one year, the conventional "forever"
+# biomes and lifeforms only change when the catalog is reseeded
+CATALOG_MAX_AGE = 86400
+
+MAX_REMEMBERED_ETAGS = 10000
+
+COMPRESSIBLE_MIMETYPES = ("application/json", columnar.MIMETYPE)
+MIN_COMPRESS_SIZE = 1024
+
+
+class _ETagMemo:
+    """Bounded LRU of key -> (etag, expires_at, headers)."""
+
+    def __init__(self, size):
+        self._entries = OrderedDict()
+        self._size = size
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._size:
+                self._entries.popitem(last=False)
+
+    def forget(self, prefix=""):
+        with self._lock:
+            for key in [k for k in self._entries if k[0].startswith(prefix)]:
+                del self._entries[key]
+
+
+_etags = _ETagMemo(MAX_REMEMBERED_ETAGS)
+
+
+def forget_etags(prefix=""):
+    """Drop remembered ETags for URLs starting with `prefix` (all by default)."""
+    _etags.forget(prefix)
+
+
+def cache_for(response, max_age: int, immutable: bool = False):
+    """Let clients (and @conditional) reuse `response` for `max_age` seconds."""
+    # send_file() marks responses no-cache, which would force a revalidation anyway
+    response.cache_control.no_cache = None
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    if immutable:
+        response.cache_control.immutable = True
+    return response
+
+
+def _memo_key():
+    return request.full_path, request.headers.get("Accept", "")
+
+
+def conditional(view):
+    """ETag + 304 handling for a GET view (apply below the route decorator)."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = _memo_key()
+        remembered = _etags.get(key)
+        if remembered and request.if_none_match.contains_weak(remembered[0]):
+            return Response(status=304, headers=remembered[2])
+
+        response = make_response(view(*args, **kwargs))
+        if response.status_code != 200 or response.direct_passthrough or response.is_streamed:
+            return response
+
+        # weak: the same content is sent gzipped, brotli'd or as-is
+        response.add_etag(weak=True)
+        max_age = response.cache_control.max_age
+        if max_age:
+            headers = {"ETag": response.headers["ETag"], "Cache-Control": response.headers["Cache-Control"]}
+            _etags.put(key, (response.get_etag()[0], time.time() + max_age, headers))
+        else:
+            response.cache_control.no_cache = True
+        return response.make_conditional(request)
+    return wrapper
+
+
+def _compress(response):
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or "Content-Encoding" in response.headers):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    if len(body) < MIN_COMPRESS_SIZE:
+        return response
+
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        response.set_data(brotli.compress(body, quality=5))
+        response.headers["Content-Encoding"] = "br"
+    elif accepted["gzip"]:
+        response.set_data(gzip.compress(body, compresslevel=6))
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+def init_http_cache(app):
+    app.after_request(_compress)
@@ -0,0 +1,75 @@
+"""
+In-process fan-out of job progress events for the /game/job-stream SSE endpoint.
+
+Workers publish every job write with pg_notify on JOB_PROGRESS_CHANNEL (see
+job_queue._write_job). Each web process runs a single background thread that
+LISTENs on that channel and hands the events to the queues of the SSE clients
+watching that job, so a page watching generation costs no queries while it
+waits. Without Postgres, notify_job_progress publishes straight to the broker,
+which only reaches clients served by the same process.
+"""
+from collections import defaultdict
+import json
+import queue
+import threading
+import time
+
+from app.extensions import db
+from app.services.job_queue import JobListener, JOB_PROGRESS_CHANNEL
+
+# statuses after which a job never changes again
+FINISHED_STATUSES = ("done", "completed", "failed", "error")
+
+
+class JobEventBroker:
+    def __init__(self):
+        self._subscribers = defaultdict(set)  # job_id -> {queue.Queue}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def subscribe(self, app, job_id: int) -> queue.Queue:
+        """Register a client queue for `job_id`; starts the listener on first use."""
+        q = queue.Queue()
+        with self._lock:
+            self._subscribers[job_id].add(q)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen, args=(app,),
+                                                name="job-events", daemon=True)
+                self._thread.start()
+        return q
+
+    def unsubscribe(self, job_id: int, q: queue.Queue):
+        with self._lock:
+            subs = self._subscribers.get(job_id)
+            if subs is not None:
+                subs.discard(q)
+                if not subs:
+                    del self._subscribers[job_id]
+
+    def publish(self, event: dict):
+        with self._lock:
+            subs = list(self._subscribers.get(event.get("id"), ()))
+        for q in subs:
+            q.put_nowait(event)
+
+    def _listen(self, app):
+        with app.app_context():
+            if db.engine.dialect.name != "postgresql":
+                return  # nothing to LISTEN to; publish() is called directly
+            listener = None
+            while True:
+                try:
+                    if listener is None:
+                        listener = JobListener(JOB_PROGRESS_CHANNEL)
+                    for payload in listener.wait(30):
+                        self.publish(json.loads(payload))
+                except Exception as e:
+                    print(f"💥 Job event listener error: {e}")
+                    if listener is not None:
+                        listener.close()
+                        listener = None
+                    time.sleep(2)
+
+
+# one broker (and at most one LISTEN connection) per web process
+broker = JobEventBroker()
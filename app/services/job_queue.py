@@ -1,45 +1,282 @@
 from app.extensions import db
 from app.models import JobQueue
-from datetime import datetime
+from datetime import datetime, timedelta
+from sqlalchemy import text, update, or_, func, cast
+from sqlalchemy.dialects.postgresql import JSONB
+import json
+import select
+import time
+
+# pg_notify channel workers LISTEN on; the payload is the job id
+JOB_CHANNEL = "job_queue"
+
+# pg_notify channel for job progress/status changes; the payload is a JSON
+# {"id", "status"?, "progress"?, "message"?} delta (see app.services.job_events)
+JOB_PROGRESS_CHANNEL = "job_progress"
+
+# user_id of the jobs the app queues for itself (pool refills, scheduled GC)
+SYSTEM_USER_ID = 0
+
+def notify_job(job_id: int):
+    """Wake LISTENing workers. Delivered by Postgres when the transaction commits."""
+    if db.engine.dialect.name == "postgresql":
+        db.session.execute(text("SELECT pg_notify(:channel, :payload)"),
+                           {"channel": JOB_CHANNEL, "payload": str(job_id)})
 
 def enqueue_generate_universe_job(user_id: int) -> int:
-    """Adds a universe generation job to the DB queue."""
+    """Adds a universe generation job to the DB queue.
+
+    When the warm pool (app.services.universe_pool) has a ready universe it
+    is handed to the user straight away and the job is recorded as done;
+    the notification then wakes an idle worker to top the pool back up.
+    """
+    from app.services.universe_pool import claim_pooled_universe
+
+    universe = claim_pooled_universe(user_id)
+    if universe is not None:
+        job = JobQueue(
+            job_type="universe_generation",
+            user_id=user_id,
+            status="done",
+            progress=1.0,
+            meta={"message": "Universe ready", "universe_id": universe.id},
+            created_at=datetime.utcnow(),
+        )
+    else:
+        job = JobQueue(
+            job_type="universe_generation",
+            user_id=user_id,
+            status="queued",
+            progress=0.0,
+            meta={"message": "Waiting to start"},
+            created_at=datetime.utcnow(),
+        )
+    db.session.add(job)
+    db.session.flush()
+    notify_job(job.id)
+    db.session.commit()
+    return job.id
+
+def enqueue_universe_gc_job(user_id: int, universe_id: int = None) -> int:
+    """Queue a "universe_gc" job: delete `universe_id` (if given) and collect orphans."""
     job = JobQueue(
-        job_type="universe_generation",
+        job_type="universe_gc",
         user_id=user_id,
         status="queued",
         progress=0.0,
-        meta={"message": "Waiting to start"},
+        meta={"message": "Waiting to start", "universe_id": universe_id},
         created_at=datetime.utcnow(),
     )
     db.session.add(job)
+    db.session.flush()
+    notify_job(job.id)
     db.session.commit()
     return job.id
 
-def update_job_progress(job_id: int, progress: float, message: str = None):
-    """Sets job progress (0.0–1.0)"""
-    job = JobQueue.query.get(job_id)
+def claim_next_job(job_types=None, worker_id: str = None, lease_seconds: int = 300):
+    """Atomically claim the oldest queued job and mark it running.
+
+    SELECT ... FOR UPDATE SKIP LOCKED means concurrent workers never see the
+    same row: each one skips jobs another worker is in the middle of claiming.
+    The claimer takes a lease of `lease_seconds` that heartbeat_jobs renews.
+    Returns the claimed JobQueue or None.
+    """
+    q = (
+        db.select(JobQueue)
+        .where(JobQueue.status == "queued")
+        .order_by(JobQueue.id.asc())
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    if job_types:
+        q = q.where(JobQueue.job_type.in_(job_types))
+
+    job = db.session.execute(q).scalar_one_or_none()
     if not job:
-        return
-    job.progress = progress
-    if message:
-        meta = job.meta
-        meta["message"] = message
-        job.meta = meta
+        db.session.rollback()  # release the snapshot
+        return None
+
+    now = datetime.utcnow()
+    job.status = "running"
+    job.worker_id = worker_id
+    job.heartbeat_at = now
+    job.lease_expires_at = now + timedelta(seconds=lease_seconds)
+    job.attempts = (job.attempts or 0) + 1
     db.session.commit()
+    return job
 
-def update_job_status(job_id: int, status: str, message: str = None):
-    """Update job status: queued → running → completed/failed"""
-    job = JobQueue.query.get(job_id)
-    if not job:
+def heartbeat_jobs(job_ids, worker_id: str, lease_seconds: int = 300):
+    """Renew the lease on the jobs this worker is still running (one UPDATE)."""
+    if not job_ids:
         return
-    job.status = status
+    now = datetime.utcnow()
+    db.session.execute(
+        update(JobQueue)
+        .where(JobQueue.id.in_(job_ids), JobQueue.worker_id == worker_id, JobQueue.status == "running")
+        .values(heartbeat_at=now, lease_expires_at=now + timedelta(seconds=lease_seconds))
+    )
+    db.session.commit()
+
+def requeue_expired_jobs(max_attempts: int = 3) -> int:
+    """Put running jobs whose lease expired (dead worker) back in the queue.
+
+    Jobs that have already been tried `max_attempts` times get status
+    "error", like a job whose handler raised, written through _write_job so
+    SSE subscribers see it. Returns the number of jobs re-queued.
+    """
+    now = datetime.utcnow()
+    expired = [JobQueue.status == "running", JobQueue.lease_expires_at < now]
+    given_up = db.session.execute(
+        db.select(JobQueue.id).where(*expired, JobQueue.attempts >= max_attempts)
+    ).scalars().all()
+    for job_id in given_up:
+        _write_job(job_id, f"Worker stopped responding after {max_attempts} attempts",
+                   status="error", worker_id=None)
+    result = db.session.execute(
+        update(JobQueue)
+        .where(*expired, or_(JobQueue.attempts < max_attempts, JobQueue.attempts.is_(None)))
+        .values(status="queued", worker_id=None, lease_expires_at=None)
+    )
+    if result.rowcount:
+        notify_job(0)
+    db.session.commit()
+    return result.rowcount
+
+class JobListener:
+    """Dedicated LISTEN connection so idle workers sleep until a job is enqueued.
+
+    wait() returns as soon as a notification arrives or after `timeout`
+    seconds, whichever is first; callers should still re-check the queue on
+    timeout in case a notification was missed. Outside Postgres it just sleeps.
+    """
+
+    def __init__(self, channel: str = JOB_CHANNEL):
+        self.conn = None
+        if db.engine.dialect.name != "postgresql":
+            return
+        # detached from the pool: it must never be handed to a request with LISTEN active
+        self._raw = db.engine.raw_connection()
+        self.conn = self._raw.driver_connection
+        self._raw.detach()
+        self.conn.autocommit = True
+        cur = self.conn.cursor()
+        cur.execute(f"LISTEN {channel}")
+        cur.close()
+
+    def wait(self, timeout: float):
+        if self.conn is None:
+            time.sleep(timeout)
+            return []
+
+        if hasattr(self.conn, "poll"):  # psycopg2
+            if select.select([self.conn], [], [], timeout) != ([], [], []):
+                self.conn.poll()
+            payloads = [n.payload for n in self.conn.notifies]
+            self.conn.notifies.clear()
+            return payloads
+
+        # psycopg 3
+        return [n.payload for n in self.conn.notifies(timeout=timeout, stop_after=1)]
+
+    def close(self):
+        if self.conn is not None:
+            self._raw.close()
+
+def notify_job_progress(job_id: int, message: str = None, **values):
+    """Publish a job change to SSE subscribers, delivered when the transaction commits."""
+    event = {"id": job_id, **{k: v for k, v in values.items() if k in ("status", "progress")}}
     if message:
-        meta = job.meta
-        meta["message"] = message
-        job.meta = meta
+        event["message"] = message
+    if db.engine.dialect.name == "postgresql":
+        db.session.execute(text("SELECT pg_notify(:channel, :payload)"),
+                           {"channel": JOB_PROGRESS_CHANNEL, "payload": json.dumps(event)})
+    else:
+        # no LISTEN/NOTIFY: only subscribers in this process can be reached
+        from app.services.job_events import broker
+        broker.publish(event)
+
+def _write_job(job_id: int, message: str = None, **values):
+    """Single UPDATE of a job row, merging `message` into meta without loading it.
+
+    The change is also published on JOB_PROGRESS_CHANNEL for /game/job-stream.
+    """
+    notify_job_progress(job_id, message, **values)
+    if message:
+        values["meta"] = func.coalesce(JobQueue.meta, cast({}, JSONB)).op("||")(
+            func.jsonb_build_object("message", message)
+        )
+    values["updated_at"] = datetime.utcnow()
+    db.session.execute(
+        update(JobQueue).where(JobQueue.id == job_id).values(**values),
+        execution_options={"synchronize_session": False},
+    )
     db.session.commit()
 
+def link_job_universe(job_id: int, universe_id: int):
+    """Record in meta "universe_id" which universe a job builds (the caller commits).
+
+    universe_gc leaves a universe alone while a queued or running job is
+    linked to it.
+    """
+    db.session.execute(
+        update(JobQueue).where(JobQueue.id == job_id).values(
+            meta=func.coalesce(JobQueue.meta, cast({}, JSONB)).op("||")(
+                func.jsonb_build_object("universe_id", universe_id))),
+        execution_options={"synchronize_session": False},
+    )
+
+def update_job_progress(job_id: int, progress: float, message: str = None):
+    """Sets job progress (0.0–1.0)"""
+    _write_job(job_id, message, progress=progress)
+
+def update_job_status(job_id: int, status: str, message: str = None, progress: float = None):
+    """Update job status: queued → running → done/error"""
+    if progress is not None:
+        _write_job(job_id, message, status=status, progress=progress)
+    else:
+        _write_job(job_id, message, status=status)
+
+class ProgressReporter:
+    """Coalesces progress updates for one job and writes them sparingly.
+
+    report() only records the latest value; a write happens when at least
+    `min_interval` seconds have passed or progress moved by `min_delta`
+    since the last write. flush(), or leaving the `with` block, forces the
+    final pending update out. Each write is one UPDATE (see _write_job).
+    """
+
+    def __init__(self, job_id: int, min_interval: float = 0.5, min_delta: float = 0.05):
+        self.job_id = job_id
+        self.min_interval = min_interval
+        self.min_delta = min_delta
+        self.pending = None
+        self.last_progress = None
+        self.last_write = 0.0
+
+    def report(self, progress: float, message: str = None, force: bool = False):
+        self.pending = (progress, message)
+        if (force
+                or self.last_progress is None
+                or time.monotonic() - self.last_write >= self.min_interval
+                or abs(progress - self.last_progress) >= self.min_delta):
+            self.flush()
+
+    def flush(self):
+        if self.pending is None:
+            return
+        progress, message = self.pending
+        update_job_progress(self.job_id, progress, message)
+        self.pending = None
+        self.last_progress = progress
+        self.last_write = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
 def get_job_status(job_id: int):
     job = JobQueue.query.get(job_id)
     if not job:
@@ -48,5 +285,6 @@ def get_job_status(job_id: int):
         "id": job_id,
         "status": job.status,
         "progress": job.progress,
-        "meta": job.meta.get("message", "")
+        "meta": (job.meta or {}).get("message", ""),
+        "message": (job.meta or {}).get("message", ""),
     }
@@ -0,0 +1,29 @@
+"""
+Eager-loading presets for the object graphs that views walk.
+
+Every relationship in the models is lazy (one SELECT on first access), which
+is right for code that touches a single object but turns a template loop
+over systems -> planets into one query per system (N+1). A view that walks a
+graph passes the matching preset to .options() instead, so each level is
+fetched once for all parents:
+
+    selectinload  collections: one `WHERE fk IN (...)` query per level,
+                  without repeating the parent columns on every child row
+    joinedload    many-to-one hops (e.g. PlanetBiome.biome): folded into
+                  the query that loads the rows pointing at them
+
+Keep presets as narrow as the view: loading a level nobody renders is
+just a slower query. Presets over the generated-world tables take the
+universe id and add it to each level's criteria, so partitioned tables
+(see app.services.partitions) prune to the universe's partition.
+"""
+from sqlalchemy.orm import selectinload
+
+from app.models import Planet, StarSystem
+
+
+def systems_with_planets(universe_id):
+    """Galaxy detail page: every system with its planets (in orbit order)."""
+    return (
+        selectinload(StarSystem.planets.and_(Planet.universe_id == universe_id)),
+    )
@@ -0,0 +1,80 @@
+"""
+Optional per-universe partitioning of the generated-world tables.
+
+scripts/partition_world_tables.py turns galaxies, star_systems, planets and
+planet_biomes into PostgreSQL tables LIST-partitioned on universe_id, with
+one partition per universe (<table>_u<id>) plus a <table>_default catch-all.
+A query filtered on universe_id then only touches that universe's
+partitions, and deleting a universe is a DETACH + DROP of four tables
+instead of a row-by-row delete. Databases that were never converted keep
+plain tables and every function here is a no-op.
+
+New universes get their partitions from create_universe_partitions() right
+after the universe row is committed, before any world row is written. Each
+partition is created standalone with a CHECK on universe_id and then
+attached, so ATTACH neither scans it nor blocks readers of the parent.
+"""
+from sqlalchemy import text
+
+from app.extensions import db
+
+# parents before children: the order partitions are created in (and dropped in reverse)
+WORLD_TABLES = ("galaxies", "star_systems", "planets", "planet_biomes")
+
+_partitioned = {}  # engine url -> bool
+
+
+def partitioning_enabled() -> bool:
+    """True when the world tables are partitioned (checked once per process)."""
+    key = str(db.engine.url)
+    if key not in _partitioned:
+        _partitioned[key] = db.engine.dialect.name == "postgresql" and bool(db.session.execute(text(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('galaxies')"
+        )).scalar())
+    return _partitioned[key]
+
+
+def partition_name(table: str, universe_id: int) -> str:
+    return f"{table}_u{int(universe_id)}"
+
+
+def create_universe_partitions(universe_id: int, commit: bool = True) -> bool:
+    """Create and attach the universe's partitions if the tables are partitioned."""
+    if not partitioning_enabled():
+        return False
+    conn = db.session.connection()
+    for table in WORLD_TABLES:
+        part = partition_name(table, universe_id)
+        exists = conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": part}).scalar()
+        if exists:
+            continue
+        uid = int(universe_id)
+        conn.exec_driver_sql(
+            f"CREATE TABLE {part} (LIKE {table} INCLUDING DEFAULTS, "
+            f"CONSTRAINT {part}_universe CHECK (universe_id IS NOT NULL AND universe_id = {uid}))"
+        )
+        conn.exec_driver_sql(f"ALTER TABLE {table} ATTACH PARTITION {part} FOR VALUES IN ({uid})")
+        # attached; the CHECK only existed to let ATTACH skip its validation scan
+        conn.exec_driver_sql(f"ALTER TABLE {part} DROP CONSTRAINT {part}_universe")
+    if commit:
+        db.session.commit()
+    return True
+
+
+def drop_universe_partitions(universe_id: int, commit: bool = True) -> bool:
+    """Detach and drop the universe's partitions, children first.
+
+    Returns False (nothing done) when the tables are not partitioned; the
+    caller then has to delete the rows instead.
+    """
+    if not partitioning_enabled():
+        return False
+    conn = db.session.connection()
+    for table in reversed(WORLD_TABLES):
+        part = partition_name(table, universe_id)
+        if conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": part}).scalar():
+            conn.exec_driver_sql(f"ALTER TABLE {table} DETACH PARTITION {part}")
+            conn.exec_driver_sql(f"DROP TABLE {part}")
+    if commit:
+        db.session.commit()
+    return True
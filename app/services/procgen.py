@@ -0,0 +1,190 @@
+"""
+Deterministic, seed-addressable world generation.
+
+Every node of a universe is derived from its parent's seed and its position
+under that parent, so any galaxy, system, planet or planet-biome link can be
+rebuilt from (universe.seed, path) alone:
+
+    universe.seed
+      └─ galaxy n      seed = derive_seed(universe.seed, "galaxy", n)   (Galaxy.seed)
+          └─ system s  seed = derive_seed(galaxy.seed, "system", s)
+              └─ planet p  seed = derive_seed(system_seed, "planet", p)
+
+derive_seed is a keyed hash of the path, i.e. a counter-based generator: the
+value at any path can be computed without drawing the values before it. Each
+node then gets its own random.Random stream seeded from its derived seed.
+
+No DB or Flask imports here — the functions return plain row dicts shaped like
+the model columns, ready for HierarchyWriter.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import multiprocessing
+import os
+import random
+import threading
+
+from app.services.spatial import morton
+
+GALAXY_TYPES = ["spiral", "elliptical", "irregular"]
+
+
+def derive_seed(seed: int, *path) -> int:
+    """Hash (seed, path...) into a non-negative 63-bit seed (fits BigInteger)."""
+    key = "/".join(str(p) for p in (seed,) + path)
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") >> 1
+
+
+def path_rng(seed: int, *path) -> random.Random:
+    return random.Random(derive_seed(seed, *path))
+
+
+def _span(rng, cfg, key, default):
+    lo, hi = cfg.get(key, default)
+    return rng.randint(lo, hi)
+
+
+def _name(rng, cfg, key, fallback, n):
+    prefixes = cfg.get("names", {}).get(key)
+    if not prefixes or not cfg.get("randomize_names", True):
+        return f"{fallback} {n}"
+    return f"{rng.choice(prefixes)}-{n}"
+
+
+def galaxy_position(galaxy_seed: int, cfg: dict):
+    """Map position of a galaxy; its own stream so the other fields stay put."""
+    rng = path_rng(galaxy_seed, "position")
+    extent = cfg.get("extent", 25000)
+    return rng.randint(-extent, extent), rng.randint(-extent, extent)
+
+
+def galaxy_spec(universe_seed: int, ordinal: int, cfg: dict) -> dict:
+    seed = derive_seed(universe_seed, "galaxy", ordinal)
+    rng = random.Random(seed)
+    x, y = galaxy_position(seed, cfg)
+    return {
+        "ordinal": ordinal,
+        "name": _name(rng, cfg, "galaxy_prefixes", "Galaxy", ordinal),
+        "seed": seed,
+        "num_stars": rng.randint(10_000, 200_000),
+        "type": rng.choice(GALAXY_TYPES),
+        "x": x,
+        "y": y,
+        "morton": morton(x, y),
+        "meta": {"origin": "procgen"},
+    }
+
+
+def system_spec(galaxy_seed: int, galaxy_ordinal: int, ordinal: int, cfg: dict) -> dict:
+    seed = derive_seed(galaxy_seed, "system", ordinal)
+    rng = random.Random(seed)
+    star_types = cfg.get("names", {}).get("star_types") or ["G"]
+    return {
+        "ordinal": ordinal,
+        "name": f"System {galaxy_ordinal}-{ordinal}",
+        "star_type": rng.choice(star_types),
+        "position_x": rng.randint(-2000, 2000),
+        "position_y": rng.randint(-2000, 2000),
+        "meta": {"seed": seed},
+    }
+
+
+def planet_spec(system_seed: int, position: int, cfg: dict) -> dict:
+    seed = derive_seed(system_seed, "planet", position)
+    rng = random.Random(seed)
+    return {
+        "name": _name(rng, cfg, "planet_prefixes", "Planet", position),
+        "size": rng.randint(1, 10),
+        "position": position,
+        "meta": {"seed": seed},
+    }
+
+
+def planet_biome_ids(planet_seed: int, cfg: dict, biome_pool) -> list:
+    """Pick catalogue biomes for a planet; stable as long as the pool is."""
+    if not biome_pool:
+        return []
+    rng = path_rng(planet_seed, "biomes")
+    count = min(len(biome_pool), _span(rng, cfg, "biomes_per_planet", [1, 4]))
+    return rng.sample(biome_pool, count)
+
+
+def system_trees(galaxy_seed: int, galaxy_ordinal: int, cfg: dict, biome_pool) -> list:
+    """All systems of a galaxy, with planets and biome links nested below."""
+    count = _span(path_rng(galaxy_seed, "systems"), cfg, "systems_per_galaxy", [5, 15])
+    systems = []
+    for s in range(1, count + 1):
+        row = system_spec(galaxy_seed, galaxy_ordinal, s, cfg)
+        system_seed = row["meta"]["seed"]
+        planets = []
+        for p in range(1, _span(path_rng(system_seed, "planets"), cfg, "planets_per_system", [3, 12]) + 1):
+            planet = planet_spec(system_seed, p, cfg)
+            planets.append({
+                "row": planet,
+                "biomes": [
+                    {"biome_id": biome_id, "meta": {}}
+                    for biome_id in planet_biome_ids(planet["meta"]["seed"], cfg, biome_pool)
+                ],
+            })
+        systems.append({"row": row, "planets": planets})
+    return systems
+
+
+def galaxy_tree(universe_seed: int, ordinal: int, cfg: dict, biome_pool) -> dict:
+    row = galaxy_spec(universe_seed, ordinal, cfg)
+    return {"row": row, "systems": system_trees(row["seed"], ordinal, cfg, biome_pool)}
+
+
+# One process pool per worker process (per size), shared by every job it runs
+# concurrently, so N job threads never start N pools of derivation processes.
+# Its processes come from forkserver (spawn where that is missing): forking a
+# multithreaded worker could copy a lock held by another thread.
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _start_method():
+    return "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def _shared_pool(workers):
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context(_start_method()))
+        return pool
+
+
+def _derive_galaxies(universe_seed, cfg, biome_pool, ordinals):
+    return [galaxy_tree(universe_seed, n, cfg, biome_pool) for n in ordinals]
+
+
+def derive_galaxy_trees(universe_seed: int, cfg: dict, biome_pool, workers: int = 1):
+    """Yield every galaxy tree of a universe in ordinal order.
+
+    With workers > 1 (0 = one per core) the galaxies are sharded across the
+    shared process pool of that size, a few shards per process. Each tree
+    depends only on (universe_seed, ordinal), so the output is identical for
+    any worker count; results stream back in order as they complete.
+    """
+    ordinals = range(1, cfg.get("galaxies", 5) + 1)
+    workers = workers or os.cpu_count() or 1
+
+    if workers <= 1 or len(ordinals) <= 1:
+        for n in ordinals:
+            yield galaxy_tree(universe_seed, n, cfg, biome_pool)
+        return
+
+    # the biome pool is pickled once per shard, not once per galaxy
+    shard = max(1, len(ordinals) // (workers * 4))
+    pool = _shared_pool(workers)
+    futures = [pool.submit(_derive_galaxies, universe_seed, cfg, biome_pool, ordinals[i:i + shard])
+               for i in range(0, len(ordinals), shard)]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,65 @@
+"""
+Per-request SQL query counting, to catch N+1 loading before it ships.
+
+Every statement sent to the database while a request is active is counted in
+flask.g. When the request finishes, a count above its budget (the view's
+@query_budget(n), else app.config["QUERY_BUDGET"]) raises
+QueryBudgetExceeded under app.testing, so any test that hits the view fails,
+and logs a warning under app.debug. Both modes also return the count as an
+X-Query-Count header. In production nothing is checked.
+
+Statements run outside the request's thread (the system prefetch pool) or
+after the response is returned (streamed bodies) are not counted.
+"""
+import logging
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from app.extensions import db
+
+DEFAULT_QUERY_BUDGET = 20
+
+log = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+def query_budget(n: int):
+    """Give a view its own query budget (apply below the route decorator)."""
+    def decorator(view):
+        view.query_budget = n
+        return view
+    return decorator
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.query_count = g.get("query_count", 0) + 1
+
+
+def _check_budget(response):
+    app = current_app
+    if not (app.debug or app.testing):
+        return response
+
+    count = g.get("query_count", 0)
+    response.headers["X-Query-Count"] = str(count)
+
+    view = app.view_functions.get(request.endpoint)
+    budget = getattr(view, "query_budget", None) or app.config["QUERY_BUDGET"]
+    if count > budget:
+        message = f"{request.method} {request.path} ran {count} queries (budget {budget})"
+        if app.testing:
+            raise QueryBudgetExceeded(message)
+        log.warning(message)
+    return response
+
+
+def init_query_budget(app):
+    app.config.setdefault("QUERY_BUDGET", DEFAULT_QUERY_BUDGET)
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", _count_query)
+    app.after_request(_check_budget)
@@ -0,0 +1,280 @@
+"""
+Cache of serialized API responses for catalog rows (biomes, lifeforms).
+
+The detail endpoints store their JSON body here under
+"v<CACHE_VERSION>:<table>:<id>", so a hot biome shown on many players'
+planets is served from memory instead of being queried, turned into a dict
+and re-encoded on every request. Bump CACHE_VERSION whenever a cached
+payload's shape changes.
+
+Backends:
+    in-process LRU  the default, bounded by RESPONSE_CACHE_MAX_BYTES of
+                    payload per web process
+    Redis           when RESPONSE_CACHE_URL is set (redis://...) and the
+                    optional `redis` package is installed; shared by every
+                    process, eviction is left to Redis' maxmemory policy
+
+Entries are dropped when the ORM updates or deletes the row (and, for
+lifeforms, the cached biome that lists them), both at flush and again
+after commit, so a request racing the commit cannot re-cache the old row.
+Bulk writes that bypass the ORM (COPY seeding, Query.update) must call
+clear() themselves. Both also drop the ETags app.services.http_cache
+remembers, so a conditional request is not answered 304 for the old body.
+hits/misses/evictions are exposed by stats().
+
+Those invalidations only reach the process that made the write. To reach
+the other web processes every committed write and every clear() also
+advance the response_cache_generation sequence; before a request each
+process reads it at most every GENERATION_CHECK_INTERVAL seconds and,
+when it has moved, forgets its remembered ETags and empties its LRU (a
+shared Redis cache is already up to date). Entries also expire after
+RESPONSE_CACHE_TTL seconds whatever happens, so a change made behind the
+app's back (e.g. psql) is picked up eventually.
+"""
+from collections import OrderedDict
+import threading
+import time
+
+from flask import Response, current_app
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session, object_session
+
+from app.extensions import db
+from app.models import Biome, Lifeform
+from app.services.http_cache import forget_etags
+
+try:
+    import redis
+except ImportError:  # optional, in-process cache only
+    redis = None
+
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+DEFAULT_TTL = 300
+GENERATION_CHECK_INTERVAL = 1.0
+
+# bumped on every write that invalidates cached bodies (created by
+# db.create_all, or by migrations/011_response_cache_generation.sql)
+GENERATION_SEQUENCE = db.Sequence("response_cache_generation", metadata=db.metadata)
+
+_DIRTY_KEY = "response_cache_dirty"
+
+
+class LRUBackend:
+    shared = False
+
+    def __init__(self, max_bytes, ttl=DEFAULT_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                self.size -= len(entry[1])
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old[1])
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self.size -= len(old[1])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        return {"backend": "memory", "entries": len(self._entries), "bytes": self.size,
+                "max_bytes": self.max_bytes, "ttl": self.ttl, "evictions": self.evictions}
+
+
+class RedisBackend:
+    PREFIX = "gallactization:response:"
+    shared = True
+
+    def __init__(self, url, ttl=DEFAULT_TTL):
+        self._redis = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def get(self, key):
+        return self._redis.get(self.PREFIX + key)
+
+    def set(self, key, value):
+        self._redis.set(self.PREFIX + key, value, ex=self.ttl)
+
+    def delete(self, *keys):
+        if keys:
+            self._redis.delete(*(self.PREFIX + k for k in keys))
+
+    def clear(self):
+        for key in self._redis.scan_iter(self.PREFIX + "*", count=1000):
+            self._redis.delete(key)
+
+    def stats(self):
+        return {"backend": "redis", "ttl": self.ttl}
+
+
+class ResponseCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.generation = None  # last response_cache_generation seen
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(table, id_):
+        return f"v{CACHE_VERSION}:{table}:{id_}"
+
+    def get(self, table, id_):
+        value = self.backend.get(self.key(table, id_))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, table, id_, body: bytes):
+        self.backend.set(self.key(table, id_), body)
+
+    def invalidate(self, keys):
+        self.backend.delete(*keys)
+
+    def clear(self):
+        """Empty the cache here and, through the generation, in every other process."""
+        self.backend.clear()
+        forget_etags()
+        bump_generation()
+
+    def sync_generation(self):
+        """Drop what this process holds if another one invalidated since the last check."""
+        if db.engine.dialect.name != "postgresql":
+            return
+        now = time.monotonic()
+        if now - self._checked_at < GENERATION_CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        generation = db.session.execute(text(
+            "SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM response_cache_generation")).scalar()
+        with self._lock:
+            changed = self.generation is not None and generation != self.generation
+            self.generation = generation
+        if changed:
+            forget_etags()
+            if not self.backend.shared:
+                self.backend.clear()
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {"hits": hits, "misses": misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else None,
+                **self.backend.stats()}
+
+
+cache = ResponseCache(LRUBackend(DEFAULT_MAX_BYTES))
+
+
+def bump_generation():
+    """Tell the other processes' caches to drop everything (own connection, committed at once)."""
+    if db.engine.dialect.name != "postgresql":
+        return
+    with db.engine.begin() as conn:
+        conn.execute(text("SELECT nextval('response_cache_generation')"))
+
+
+def cached_json(table, id_, build):
+    """JSON response for row `id_` of `table`, from the cache or from build().
+
+    build() returns the payload dict, or None when the row does not exist
+    (which is not cached, the caller answers 404).
+    """
+    body = cache.get(table, id_)
+    if body is None:
+        data = build()
+        if data is None:
+            return None
+        body = current_app.json.dumps(data).encode("utf-8")
+        cache.set(table, id_, body)
+    return Response(body, mimetype="application/json")
+
+
+def _keys_for(target):
+    if isinstance(target, Lifeform):
+        # the biome detail payload lists its lifeforms (a moved lifeform changes both biomes)
+        biome_ids = {target.biome_id, *inspect(target).attrs.biome_id.history.deleted}
+        return {ResponseCache.key("lifeforms", target.id), *(ResponseCache.key("biomes", b) for b in biome_ids)}
+    return {ResponseCache.key(target.__tablename__, target.id)}
+
+
+def _row_changed(mapper, connection, target):
+    keys = _keys_for(target)
+    cache.invalidate(keys)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_DIRTY_KEY, set()).update(keys)
+
+
+def _after_commit(session):
+    keys = session.info.pop(_DIRTY_KEY, None)
+    if keys:
+        cache.invalidate(keys)
+        # @conditional would otherwise keep answering 304 for the old body
+        forget_etags()
+        bump_generation()
+
+
+def _after_rollback(session):
+    session.info.pop(_DIRTY_KEY, None)
+
+
+for _model in (Biome, Lifeform):
+    event.listen(_model, "after_update", _row_changed)
+    event.listen(_model, "after_delete", _row_changed)
+# a new lifeform changes its biome's lifeform list
+event.listen(Lifeform, "after_insert", _row_changed)
+event.listen(Session, "after_commit", _after_commit)
+event.listen(Session, "after_rollback", _after_rollback)
+
+
+def init_response_cache(app):
+    """Pick the backend from RESPONSE_CACHE_URL / RESPONSE_CACHE_MAX_BYTES / RESPONSE_CACHE_TTL."""
+    url = app.config.get("RESPONSE_CACHE_URL")
+    ttl = app.config.get("RESPONSE_CACHE_TTL", DEFAULT_TTL)
+    if url and redis is not None:
+        cache.backend = RedisBackend(url, ttl)
+    else:
+        if url:
+            app.logger.warning("RESPONSE_CACHE_URL is set but redis is not installed; using the in-process cache")
+        cache.backend = LRUBackend(app.config.get("RESPONSE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES), ttl)
+    # before @conditional looks at its remembered ETags
+    app.before_request(cache.sync_generation)
@@ -0,0 +1,152 @@
+"""
+Streaming biome / lifeform seeding.
+
+Rows are produced by generators one chunk at a time and written with
+bulk_writer.copy_rows, so neither the biome set nor the lifeform set is ever
+held in memory or in the session identity map. After every committed chunk a
+small JSON checkpoint is written; a re-run with the same checkpoint resumes
+where the last one stopped. Chunks are derived from (seed, chunk/biome key),
+so a chunk redone after a crash produces the same ids and ON CONFLICT makes
+it a no-op. Resuming needs the checkpoint's seed: a different --seed is an
+error rather than silently ignored.
+"""
+import json
+import os
+import random
+
+from sqlalchemy import text
+
+from app.extensions import db
+from app.models import Biome, Lifeform
+from app.services.bulk_writer import copy_rows
+from app.services.lifeform_generator import SyntheticLifeGenerator
+from app.services.procgen import derive_seed
+from app.services.synthetic_biome_data import SyntheticBiomeGenerator
+
+BIOME_COLUMNS = [
+    "id", "name", "base_type", "rarity", "biodiversity", "productivity",
+    "climate", "soil", "vegetation", "fauna", "special_features",
+]
+LIFEFORM_COLUMNS = [
+    "id", "biome_id", "name", "domain", "trophic_level",
+    "anatomy", "physiology", "genetics", "ecology", "special_abilities",
+]
+
+
+def load_checkpoint(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_checkpoint(path, state):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)  # atomic: a crash never leaves a torn checkpoint
+
+
+def _resume_seed(state, seed):
+    """The checkpoint's seed; ValueError if the caller asked for a different one."""
+    if seed is not None and seed != state["seed"]:
+        raise ValueError(f"the checkpoint was written with seed {state['seed']}, not {seed}; "
+                         "resume with that seed or start over with --restart")
+    return state["seed"]
+
+
+def biome_chunks(seed, count, chunk_size, start_chunk=0):
+    """Yield (chunk_no, rows) for biomes; chunk k is always the same rows for a seed."""
+    gen = SyntheticBiomeGenerator(seed)
+    chunks = (count + chunk_size - 1) // chunk_size
+    for k in range(start_chunk, chunks):
+        n = min(chunk_size, count - k * chunk_size)
+        batch = gen.spawn(k).generate_batch(n)
+        yield k, [tuple(row[c] for c in BIOME_COLUMNS) for row in batch.rows()]
+
+
+def lifeform_id(seed, biome_id, n):
+    """Id of the n-th lifeform of a biome: 63 hash bits, 16 hex chars.
+
+    At millions of rows a random 40-bit id is expected to collide, and
+    ON CONFLICT would drop the loser without a word.
+    """
+    return f"life_{derive_seed(seed, 'lifeform', biome_id, n):016x}"
+
+
+def lifeform_rows(seed, biomes):
+    """Yield lifeform tuples for (id, base_type, biodiversity) biome rows."""
+    for biome_id, base_type, biodiversity in biomes:
+        gen = SyntheticLifeGenerator(rng=random.Random(derive_seed(seed, "lifeforms", biome_id)))
+        for n in range(int(2 + (biodiversity or 0) * 8)):
+            lf = gen.generate(biome_type=base_type)
+            yield (
+                lifeform_id(seed, biome_id, n), biome_id, lf["name"], lf["domain"], lf["trophic"],
+                {}, {}, {}, {"biome_type": base_type}, lf["special_abilities"],
+            )
+
+
+def seed_biomes(count, chunk_size=5000, seed=None, checkpoint=None, log=print):
+    """COPY `count` generated biomes in chunks. Returns rows inserted this run."""
+    state = load_checkpoint(checkpoint) if checkpoint else None
+    if not state or state.get("count") != count or state.get("chunk_size") != chunk_size:
+        state = {"seed": seed if seed is not None else random.getrandbits(63),
+                 "count": count, "chunk_size": chunk_size, "next_chunk": 0, "inserted": 0}
+    else:
+        _resume_seed(state, seed)
+        if state["next_chunk"]:
+            log(f"Resuming biomes at chunk {state['next_chunk']}")
+
+    inserted = 0
+    for k, rows in biome_chunks(state["seed"], count, chunk_size, state["next_chunk"]):
+        n = copy_rows(Biome.__table__, BIOME_COLUMNS, rows)
+        db.session.commit()
+        inserted += n
+        state.update(next_chunk=k + 1, inserted=state["inserted"] + n)
+        if checkpoint:
+            save_checkpoint(checkpoint, state)
+        log(f"Biomes: {min((k + 1) * chunk_size, count)}/{count}")
+    return inserted
+
+
+def seed_lifeforms(chunk_size=1000, seed=None, checkpoint=None, log=print):
+    """COPY lifeforms for every biome, walking biomes by keyset in `chunk_size` pages."""
+    state = load_checkpoint(checkpoint) if checkpoint else None
+    if not state:
+        state = {"seed": seed if seed is not None else random.getrandbits(63), "last_biome_id": ""}
+    else:
+        _resume_seed(state, seed)
+        if state["last_biome_id"]:
+            log(f"Resuming lifeforms after biome {state['last_biome_id']}")
+
+    inserted = 0
+    while True:
+        biomes = db.session.execute(
+            db.select(Biome.id, Biome.base_type, Biome.biodiversity)
+            .where(Biome.id > state["last_biome_id"])
+            .order_by(Biome.id)
+            .limit(chunk_size)
+        ).all()
+        if not biomes:
+            break
+
+        rows = list(lifeform_rows(state["seed"], biomes))
+        n = copy_rows(Lifeform.__table__, LIFEFORM_COLUMNS, rows)
+        if n < len(rows):
+            # skipped rows must be this chunk's own, written before a crash; anything else is an id collision
+            # (only PostgreSQL skips rows: copy_rows' ON CONFLICT)
+            present = db.session.execute(text(
+                "SELECT count(*) FROM lifeforms l JOIN unnest(CAST(:ids AS varchar[]), CAST(:biomes AS varchar[]))"
+                " AS r(id, biome_id) ON l.id = r.id AND l.biome_id = r.biome_id"
+            ), {"ids": [r[0] for r in rows], "biomes": [r[1] for r in rows]}).scalar()
+            if present < len(rows):
+                db.session.rollback()
+                raise RuntimeError(f"{len(rows) - present} lifeform ids collided with existing rows")
+        db.session.commit()
+        inserted += n
+        state["last_biome_id"] = biomes[-1][0]
+        if checkpoint:
+            save_checkpoint(checkpoint, state)
+        log(f"Lifeforms: {inserted} rows (through biome {state['last_biome_id']})")
+    return inserted
@@ -0,0 +1,121 @@
+"""
+Morton (Z-order) keys for galaxy coordinates.
+
+Galaxy x/y are world coordinates in [-WORLD_HALF, WORLD_HALF). Shifting them
+to a 16-bit grid and interleaving the bits gives a 32-bit key whose prefixes
+are quadtree cells: every galaxy in the level-L cell containing a point shares
+the key's top 2*L bits. A B-tree on (universe_id, morton) therefore answers
+viewport queries as a handful of key ranges, and `morton >> cell_shift(L)`
+groups galaxies by level-L cell for level-of-detail aggregation.
+
+Pure functions, no DB imports (procgen uses them in worker processes).
+"""
+BITS = 16
+WORLD_HALF = 1 << (BITS - 1)  # 32768
+GRID_MAX = (1 << BITS) - 1
+
+
+def _spread(v: int) -> int:
+    """Spread the low 16 bits of v out to the even bit positions."""
+    v &= 0xFFFF
+    v = (v | (v << 8)) & 0x00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F
+    v = (v | (v << 2)) & 0x33333333
+    v = (v | (v << 1)) & 0x55555555
+    return v
+
+
+def to_grid(c: float) -> int:
+    """World coordinate -> grid cell on the 16-bit grid, clamped to the world."""
+    return min(GRID_MAX, max(0, int(c) + WORLD_HALF))
+
+
+def morton(x: float, y: float) -> int:
+    """Z-order key of a world position: x in the even bits, y in the odd bits."""
+    return _spread(to_grid(x)) | (_spread(to_grid(y)) << 1)
+
+
+def cell_shift(level: int) -> int:
+    """Right shift that truncates a key to its level-`level` quadtree cell."""
+    return 2 * (BITS - level)
+
+
+def cell_size(level: int) -> int:
+    """Edge length of a level-`level` cell in world units."""
+    return 1 << (BITS - level)
+
+
+def cell_range(level: int, cx: int, cy: int):
+    """Key range (lo, hi) of the level-`level` cell at cell coordinates (cx, cy)."""
+    size = cell_size(level)
+    lo = _spread(cx * size) | (_spread(cy * size) << 1)
+    return lo, lo + size * size - 1
+
+
+def morton_ranges(x0, y0, x1, y1, extra_depth: int = 2):
+    """Cover a world-space bbox with sorted, merged (lo, hi) key ranges.
+
+    Descends the quadtree from the root, emitting cells that are fully inside
+    the bbox and splitting the ones on its border, down to `extra_depth`
+    levels below the first level whose cells are smaller than the bbox.
+    Border cells at that depth are emitted whole, so the ranges over-cover
+    slightly; callers still filter on x/y. The number of ranges is bounded
+    by the depth, not by the size of the bbox or the number of galaxies.
+    """
+    gx0, gy0, gx1, gy1 = to_grid(min(x0, x1)), to_grid(min(y0, y1)), to_grid(max(x0, x1)), to_grid(max(y0, y1))
+    span = max(gx1 - gx0, gy1 - gy0) + 1
+    depth = min(BITS, BITS - span.bit_length() + 1 + extra_depth)
+
+    ranges = []
+
+    def visit(cx, cy, level):
+        size = cell_size(level)
+        ax, ay = cx * size, cy * size
+        bx, by = ax + size - 1, ay + size - 1
+        if bx < gx0 or ax > gx1 or by < gy0 or ay > gy1:
+            return
+        inside = ax >= gx0 and bx <= gx1 and ay >= gy0 and by <= gy1
+        if inside or level >= depth:
+            ranges.append(cell_range(level, cx, cy))
+            return
+        # children in Z order, so `ranges` comes out sorted
+        for dy in (0, 1):
+            for dx in (0, 1):
+                visit(cx * 2 + dx, cy * 2 + dy, level + 1)
+
+    visit(0, 0, 0)
+
+    merged = []
+    for lo, hi in ranges:
+        if merged and lo == merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], hi)
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def grid_index(items, xy, x0, y0, cell, cols, rows):
+    """Bucket `items` into a cols x rows grid of `cell`-sized cells from (x0, y0).
+
+    Returns (ordered, starts): the items sorted by cell (row-major), and
+    cols*rows+1 offsets so that cell c holds ordered[starts[c]:starts[c+1]].
+    Shipped with map payloads so the client can pick the galaxy under the
+    cursor by scanning a few cells instead of every point. `xy(item)`
+    returns the item's world position; points outside the grid are clamped
+    into the border cells.
+    """
+    def cell_of(item):
+        x, y = xy(item)
+        cx = min(cols - 1, max(0, int((x - x0) // cell)))
+        cy = min(rows - 1, max(0, int((y - y0) // cell)))
+        return cy * cols + cx
+
+    keyed = [(cell_of(item), item) for item in items]
+    keyed.sort(key=lambda k: k[0])
+
+    starts = [0] * (cols * rows + 1)
+    for c, _ in keyed:
+        starts[c + 1] += 1
+    for c in range(cols * rows):
+        starts[c + 1] += starts[c]
+    return [item for _, item in keyed], starts
@@ -11,6 +11,13 @@ import random
 import hashlib
 import json
 
+from app.services.procgen import derive_seed
+
+try:
+    import numpy as np
+except ImportError:  # generate_batch needs numpy; the scalar API does not
+    np = None
+
 @dataclass
 class SyntheticClimate:
     temperature_range: Tuple[float, float]
@@ -61,10 +68,21 @@ class SyntheticBiome:
 
 class SyntheticBiomeGenerator:
     def __init__(self, seed: Optional[int] = None):
-        if seed is not None:
-            random.seed(seed)
+        # Each generator owns its stream; nothing touches the global `random`
+        # state, so instances can run side by side in threads or pool workers.
+        self.seed = seed
+        self.rng = random.Random(seed)
         self.setup_generator_components()
 
+    def spawn(self, key) -> "SyntheticBiomeGenerator":
+        """Independent child generator for `key` (a chunk number, worker index, ...).
+
+        Children of a seeded generator are reproducible: spawn(k) always
+        yields the same stream for the same parent seed and key.
+        """
+        base = self.seed if self.seed is not None else self.rng.getrandbits(63)
+        return SyntheticBiomeGenerator(derive_seed(base, "spawn", key))
+
     def setup_generator_components(self):
         self.base_archetypes = {
             "forest": 0.15,
@@ -170,21 +188,10 @@ class SyntheticBiomeGenerator:
             "Cursed", "Blessed", "Sacred", "Profane", "Timeless", "Endless"
         ]
 
-    def generate_biome_name(self) -> str:
-        name_type = random.choice(["simple", "compound", "descriptive", "mystical"])
-        if name_type == "simple":
-            return f"{random.choice(self.name_prefixes)}{random.choice(self.name_suffixes)}"
-        elif name_type == "compound":
-            return f"{random.choice(self.name_prefixes)}{random.choice(self.name_connectors)}{random.choice(self.name_descriptors)} {random.choice(self.name_suffixes)}"
-        elif name_type == "descriptive":
-            feature = random.choice(self.special_features_pool).replace('_', ' ').title()
-            return f"{feature} {random.choice(self.name_suffixes)}"
-        else:
-            elements = ["Fire", "Water", "Earth", "Air", "Light", "Shadow", "Time", "Space"]
-            return f"{random.choice(elements)}-Touched {random.choice(self.name_suffixes)}"
+        self.name_types = ["simple", "compound", "descriptive", "mystical"]
+        self.name_elements = ["Fire", "Water", "Earth", "Air", "Light", "Shadow", "Time", "Space"]
 
-    def generate_climate(self, base_type: str) -> SyntheticClimate:
-        climate_profiles = {
+        self.climate_profiles = {
             "forest": {"temp": "cool", "precip": "humid", "humidity": 0.8},
             "grassland": {"temp": "temperate", "precip": "moderate", "humidity": 0.6},
             "wetland": {"temp": "warm", "precip": "very_humid", "humidity": 0.9},
@@ -198,48 +205,79 @@ class SyntheticBiomeGenerator:
             "luminous": {"temp": "temperate", "precip": "moderate", "humidity": 0.6},
             "floating": {"temp": "cool", "precip": "moderate", "humidity": 0.5}
         }
-        profile = climate_profiles.get(base_type, climate_profiles["forest"])
-        temp_variation = random.choice(list(self.temperature_profiles.keys()))
-        precip_variation = random.choice(list(self.precipitation_levels.keys()))
-        temp_range = self._blend_ranges(self.temperature_profiles[profile["temp"]], self.temperature_profiles[temp_variation], random.random())
-        precip_range = self._blend_ranges(self.precipitation_levels[profile["precip"]], self.precipitation_levels[precip_variation], random.random())
-        humidity = max(0.1, min(0.95, profile["humidity"] + random.uniform(-0.3, 0.3)))
-        seasonality = random.uniform(0.1, 0.9)
-        storm_frequency = random.uniform(0.0, 1.0)
-        wind_patterns = random.sample(["gentle_breezes", "strong_gales", "whispering_winds", "cyclonic", "magnetic_pulses", "psychic_currents", "gravitational_flows"], random.randint(1, 3))
-        return SyntheticClimate(temperature_range=temp_range, precipitation_mm=precip_range, humidity_level=humidity, seasonality=seasonality, storm_frequency=storm_frequency, wind_patterns=wind_patterns)
 
-    def generate_soil(self, base_type: str) -> SyntheticSoil:
-        base_soil_profiles = {
+        self.wind_patterns = ["gentle_breezes", "strong_gales", "whispering_winds", "cyclonic", "magnetic_pulses", "psychic_currents", "gravitational_flows"]
+
+        self.soil_profiles = {
             "forest": {"fertility": 0.7, "drainage": 0.6, "ph": 0.3, "organic": 0.8},
             "desert": {"fertility": 0.2, "drainage": 0.9, "ph": 0.7, "organic": 0.1},
             "wetland": {"fertility": 0.8, "drainage": 0.1, "ph": 0.4, "organic": 0.9},
             "volcanic": {"fertility": 0.9, "drainage": 0.8, "ph": 0.5, "organic": 0.3},
             "crystalline": {"fertility": 0.3, "drainage": 0.7, "ph": 0.6, "organic": 0.1}
         }
-        profile = base_soil_profiles.get(base_type, base_soil_profiles["forest"])
-        minerals = random.sample(["silica_crystals", "magnetic_ores", "psychic_resonators", "bioluminescent_minerals", "memory_stones", "gravity_dust", "phase_crystals", "prismatic_shards", "echoing_rocks"], random.randint(2, 5))
-        return SyntheticSoil(fertility=max(0.0, min(1.0, profile["fertility"] + random.uniform(-0.2, 0.2))), drainage=max(0.0, min(1.0, profile["drainage"] + random.uniform(-0.2, 0.2))), ph_level=max(0.0, min(1.0, profile["ph"] + random.uniform(-0.3, 0.3))), organic_content=max(0.0, min(1.0, profile["organic"] + random.uniform(-0.2, 0.2))), mineral_composition=minerals)
+
+        self.minerals = ["silica_crystals", "magnetic_ores", "psychic_resonators", "bioluminescent_minerals", "memory_stones", "gravity_dust", "phase_crystals", "prismatic_shards", "echoing_rocks"]
+
+        self.exotic_base_types = ["crystalline", "luminous", "floating"]
+        self.exotic_canopies = ["crystalline", "bioluminescent", "floating", "energy-based"]
+        self.exotic_leaf_types = ["crystalline", "membranous", "light-emitting", "gas-processing"]
+        self.root_systems = ["deep_taproot", "fibrous_network", "aerial_roots", "crystalline_anchors", "magnetic_attachment"]
+        self.reproduction_methods = ["spores", "seeds", "budding", "fragmentation", "energy_dispersal", "psychic_propagation"]
+        self.dominant_forms = ["towering_trees", "glowing_fungi", "crystal_formations", "floating_spheres", "weeping_vines", "spiraling_towers", "pulsating_mounds", "geometric_structures"]
+
+        self.activity_patterns = ["diurnal", "nocturnal", "crepuscular", "seasonal", "tidal", "storm_chasers", "light_seekers", "shadow_dwellers"]
+        self.social_structures = ["solitary", "pack_hunters", "swarm_intelligence", "hive_mind", "symbiotic_colonies", "telepathic_network", "individualistic"]
+
+        self.feature_count_weights = [0.1, 0.3, 0.4, 0.15, 0.05]
+
+    def generate_biome_name(self) -> str:
+        name_type = self.rng.choice(self.name_types)
+        if name_type == "simple":
+            return f"{self.rng.choice(self.name_prefixes)}{self.rng.choice(self.name_suffixes)}"
+        elif name_type == "compound":
+            return f"{self.rng.choice(self.name_prefixes)}{self.rng.choice(self.name_connectors)}{self.rng.choice(self.name_descriptors)} {self.rng.choice(self.name_suffixes)}"
+        elif name_type == "descriptive":
+            feature = self.rng.choice(self.special_features_pool).replace('_', ' ').title()
+            return f"{feature} {self.rng.choice(self.name_suffixes)}"
+        else:
+            return f"{self.rng.choice(self.name_elements)}-Touched {self.rng.choice(self.name_suffixes)}"
+
+    def generate_climate(self, base_type: str) -> SyntheticClimate:
+        profile = self.climate_profiles.get(base_type, self.climate_profiles["forest"])
+        temp_variation = self.rng.choice(list(self.temperature_profiles.keys()))
+        precip_variation = self.rng.choice(list(self.precipitation_levels.keys()))
+        temp_range = self._blend_ranges(self.temperature_profiles[profile["temp"]], self.temperature_profiles[temp_variation], self.rng.random())
+        precip_range = self._blend_ranges(self.precipitation_levels[profile["precip"]], self.precipitation_levels[precip_variation], self.rng.random())
+        humidity = max(0.1, min(0.95, profile["humidity"] + self.rng.uniform(-0.3, 0.3)))
+        seasonality = self.rng.uniform(0.1, 0.9)
+        storm_frequency = self.rng.uniform(0.0, 1.0)
+        wind_patterns = self.rng.sample(self.wind_patterns, self.rng.randint(1, 3))
+        return SyntheticClimate(temperature_range=temp_range, precipitation_mm=precip_range, humidity_level=humidity, seasonality=seasonality, storm_frequency=storm_frequency, wind_patterns=wind_patterns)
+
+    def generate_soil(self, base_type: str) -> SyntheticSoil:
+        profile = self.soil_profiles.get(base_type, self.soil_profiles["forest"])
+        minerals = self.rng.sample(self.minerals, self.rng.randint(2, 5))
+        return SyntheticSoil(fertility=max(0.0, min(1.0, profile["fertility"] + self.rng.uniform(-0.2, 0.2))), drainage=max(0.0, min(1.0, profile["drainage"] + self.rng.uniform(-0.2, 0.2))), ph_level=max(0.0, min(1.0, profile["ph"] + self.rng.uniform(-0.3, 0.3))), organic_content=max(0.0, min(1.0, profile["organic"] + self.rng.uniform(-0.2, 0.2))), mineral_composition=minerals)
 
     def generate_vegetation(self, base_type: str) -> SyntheticVegetation:
-        if base_type in ["crystalline", "luminous", "floating"]:
-            canopy = random.choice(["crystalline", "bioluminescent", "floating", "energy-based"])
-            leaf_type = random.choice(["crystalline", "membranous", "light-emitting", "gas-processing"])
+        if base_type in self.exotic_base_types:
+            canopy = self.rng.choice(self.exotic_canopies)
+            leaf_type = self.rng.choice(self.exotic_leaf_types)
         else:
-            canopy = random.choice(self.canopy_structures)
-            leaf_type = random.choice(self.leaf_types)
-        growth_pattern = random.choice(self.growth_patterns)
-        root_system = random.choice(["deep_taproot", "fibrous_network", "aerial_roots", "crystalline_anchors", "magnetic_attachment"])
-        reproduction_method = random.choice(["spores", "seeds", "budding", "fragmentation", "energy_dispersal", "psychic_propagation"])
-        dominant_forms = random.sample(["towering_trees", "glowing_fungi", "crystal_formations", "floating_spheres", "weeping_vines", "spiraling_towers", "pulsating_mounds", "geometric_structures"], random.randint(2, 4))
+            canopy = self.rng.choice(self.canopy_structures)
+            leaf_type = self.rng.choice(self.leaf_types)
+        growth_pattern = self.rng.choice(self.growth_patterns)
+        root_system = self.rng.choice(self.root_systems)
+        reproduction_method = self.rng.choice(self.reproduction_methods)
+        dominant_forms = self.rng.sample(self.dominant_forms, self.rng.randint(2, 4))
         return SyntheticVegetation(canopy_structure=canopy, leaf_type=leaf_type, growth_pattern=growth_pattern, root_system=root_system, reproduction_method=reproduction_method, dominant_forms=dominant_forms)
 
     def generate_fauna(self, base_type: str) -> SyntheticFauna:
-        size_distribution = random.choice(self.size_distributions)
-        activity_patterns = random.sample(["diurnal", "nocturnal", "crepuscular", "seasonal", "tidal", "storm_chasers", "light_seekers", "shadow_dwellers"], random.randint(2, 4))
-        feeding_strategies = random.sample(self.feeding_strategies, random.randint(2, 3))
-        mobility_types = random.sample(self.mobility_types, random.randint(2, 3))
-        social_structures = random.sample(["solitary", "pack_hunters", "swarm_intelligence", "hive_mind", "symbiotic_colonies", "telepathic_network", "individualistic"], random.randint(1, 2))
+        size_distribution = self.rng.choice(self.size_distributions)
+        activity_patterns = self.rng.sample(self.activity_patterns, self.rng.randint(2, 4))
+        feeding_strategies = self.rng.sample(self.feeding_strategies, self.rng.randint(2, 3))
+        mobility_types = self.rng.sample(self.mobility_types, self.rng.randint(2, 3))
+        social_structures = self.rng.sample(self.social_structures, self.rng.randint(1, 2))
         return SyntheticFauna(size_distribution=size_distribution, activity_patterns=activity_patterns, feeding_strategies=feeding_strategies, mobility_types=mobility_types, social_structures=social_structures)
 
     def _blend_ranges(self, range1: Tuple[float, float], range2: Tuple[float, float], weight: float) -> Tuple[float, float]:
@@ -251,31 +289,45 @@ class SyntheticBiomeGenerator:
         content = f"{name}{json.dumps(characteristics, sort_keys=True)}"
         return hashlib.md5(content.encode()).hexdigest()[:12]
 
-    def calculate_biome_metrics(self, biome: SyntheticBiome) -> Tuple[float, float, float]:
-        temp_range = biome.climate.temperature_range[1] - biome.climate.temperature_range[0]
-        climate_rarity = abs(biome.climate.humidity_level - 0.5) * 0.3
-        climate_rarity += (1 - (temp_range / 100)) * 0.3
-        climate_rarity += len(biome.special_features) * 0.1
-        rarity = min(1.0, climate_rarity)
-        biodiversity = (1 - biome.climate.seasonality) * 0.4
-        biodiversity += biome.soil.fertility * 0.3
-        biodiversity += (1 - abs(biome.climate.humidity_level - 0.7)) * 0.3
-        biodiversity = min(1.0, biodiversity)
-        productivity = biome.soil.fertility * 0.4
-        productivity += biome.climate.humidity_level * 0.3
-        productivity += (biome.climate.temperature_range[1] / 50) * 0.3
-        productivity = min(1.0, productivity)
+    @staticmethod
+    def _metrics(humidity, temp_min, temp_max, seasonality, fertility, num_features, cap=min):
+        """Rarity/biodiversity/productivity formula shared by the scalar and batch paths.
+
+        Works on floats or NumPy arrays; the batch path passes an elementwise `cap`.
+        """
+        climate_rarity = abs(humidity - 0.5) * 0.3
+        climate_rarity += (1 - ((temp_max - temp_min) / 100)) * 0.3
+        climate_rarity += num_features * 0.1
+        rarity = cap(1.0, climate_rarity)
+        biodiversity = (1 - seasonality) * 0.4
+        biodiversity += fertility * 0.3
+        biodiversity += (1 - abs(humidity - 0.7)) * 0.3
+        biodiversity = cap(1.0, biodiversity)
+        productivity = fertility * 0.4
+        productivity += humidity * 0.3
+        productivity += (temp_max / 50) * 0.3
+        productivity = cap(1.0, productivity)
         return rarity, biodiversity, productivity
 
+    def calculate_biome_metrics(self, biome: SyntheticBiome) -> Tuple[float, float, float]:
+        return self._metrics(
+            biome.climate.humidity_level,
+            biome.climate.temperature_range[0],
+            biome.climate.temperature_range[1],
+            biome.climate.seasonality,
+            biome.soil.fertility,
+            len(biome.special_features),
+        )
+
     def generate_synthetic_biome(self, biome_id: Optional[int] = None) -> SyntheticBiome:
-        base_type = random.choices(list(self.base_archetypes.keys()), weights=list(self.base_archetypes.values()))[0]
+        base_type = self.rng.choices(list(self.base_archetypes.keys()), weights=list(self.base_archetypes.values()))[0]
         name = self.generate_biome_name()
         climate = self.generate_climate(base_type)
         soil = self.generate_soil(base_type)
         vegetation = self.generate_vegetation(base_type)
         fauna = self.generate_fauna(base_type)
-        num_features = random.choices([0, 1, 2, 3, 4], weights=[0.1, 0.3, 0.4, 0.15, 0.05])[0]
-        special_features = random.sample(self.special_features_pool, num_features)
+        num_features = self.rng.choices([0, 1, 2, 3, 4], weights=self.feature_count_weights)[0]
+        special_features = self.rng.sample(self.special_features_pool, num_features)
         temp_biome = SyntheticBiome(id="temp", name=name, base_type=base_type, climate=climate, soil=soil, vegetation=vegetation, fauna=fauna, special_features=special_features, rarity=0.0, biodiversity=0.0, productivity=0.0)
         rarity, biodiversity, productivity = self.calculate_biome_metrics(temp_biome)
         characteristics = {
@@ -290,8 +342,215 @@ class SyntheticBiomeGenerator:
         final_id = self._generate_biome_id(name, characteristics)
         return SyntheticBiome(id=final_id, name=name, base_type=base_type, climate=climate, soil=soil, vegetation=vegetation, fauna=fauna, special_features=special_features, rarity=rarity, biodiversity=biodiversity, productivity=productivity)
 
+    def generate_batch(self, n: int, seed: Optional[int] = None) -> "SyntheticBiomeBatch":
+        """Generate `n` biomes at once as NumPy columns.
+
+        Every random draw is a single vectorised call over all `n` rows, and the
+        metrics are computed with the same formula as calculate_biome_metrics.
+        Nothing is turned into strings, dicts or dataclasses until it is read
+        from the returned SyntheticBiomeBatch. The same (n, seed) always yields
+        the same batch; without a seed one is drawn from the instance stream.
+        IDs are 16 hex chars drawn from the stream rather than an MD5 of the
+        content.
+        """
+        if np is None:
+            raise RuntimeError("SyntheticBiomeGenerator.generate_batch requires numpy")
+
+        rng = np.random.default_rng(seed if seed is not None else self.rng.getrandbits(63))
+        types = list(self.base_archetypes)
+        weights = np.array([self.base_archetypes[t] for t in types])
+        base = rng.choice(len(types), size=n, p=weights / weights.sum())
+
+        def lookup(table, key, default="forest"):
+            return np.array([table.get(t, table[default])[key] for t in types])[base]
+
+        # climate: blend the archetype's profile with a random variation
+        temp_keys = list(self.temperature_profiles)
+        precip_keys = list(self.precipitation_levels)
+        temps = np.array([self.temperature_profiles[k] for k in temp_keys], dtype=float)
+        precips = np.array([self.precipitation_levels[k] for k in precip_keys], dtype=float)
+        temp_profile = temps[[temp_keys.index(self.climate_profiles.get(t, self.climate_profiles["forest"])["temp"]) for t in types]][base]
+        precip_profile = precips[[precip_keys.index(self.climate_profiles.get(t, self.climate_profiles["forest"])["precip"]) for t in types]][base]
+        temp_w = rng.random(n)[:, None]
+        precip_w = rng.random(n)[:, None]
+        temp_range = temp_profile * (1 - temp_w) + temps[rng.integers(0, len(temps), n)] * temp_w
+        precip_range = precip_profile * (1 - precip_w) + precips[rng.integers(0, len(precips), n)] * precip_w
+
+        exotic = np.isin(base, [types.index(t) for t in self.exotic_base_types])
+        num_features = rng.choice(5, size=n, p=self.feature_count_weights)
+
+        cols = {
+            "base": base,
+            "name_type": rng.integers(0, len(self.name_types), n),
+            "name_parts": rng.integers(0, 2**31, (n, 4)),
+            "temp_min": temp_range[:, 0],
+            "temp_max": temp_range[:, 1],
+            "precip_min": precip_range[:, 0],
+            "precip_max": precip_range[:, 1],
+            "humidity": np.clip(lookup(self.climate_profiles, "humidity") + rng.uniform(-0.3, 0.3, n), 0.1, 0.95),
+            "seasonality": rng.uniform(0.1, 0.9, n),
+            "storm_frequency": rng.uniform(0.0, 1.0, n),
+            "fertility": np.clip(lookup(self.soil_profiles, "fertility") + rng.uniform(-0.2, 0.2, n), 0.0, 1.0),
+            "drainage": np.clip(lookup(self.soil_profiles, "drainage") + rng.uniform(-0.2, 0.2, n), 0.0, 1.0),
+            "ph_level": np.clip(lookup(self.soil_profiles, "ph") + rng.uniform(-0.3, 0.3, n), 0.0, 1.0),
+            "organic_content": np.clip(lookup(self.soil_profiles, "organic") + rng.uniform(-0.2, 0.2, n), 0.0, 1.0),
+            "exotic": exotic,
+            "canopy": np.where(exotic, rng.integers(0, len(self.exotic_canopies), n), rng.integers(0, len(self.canopy_structures), n)),
+            "leaf": np.where(exotic, rng.integers(0, len(self.exotic_leaf_types), n), rng.integers(0, len(self.leaf_types), n)),
+            "growth": rng.integers(0, len(self.growth_patterns), n),
+            "root": rng.integers(0, len(self.root_systems), n),
+            "reproduction": rng.integers(0, len(self.reproduction_methods), n),
+            "size_distribution": rng.integers(0, len(self.size_distributions), n),
+            "num_features": num_features,
+            "id": rng.integers(0, 2**63, n, dtype=np.int64),
+        }
+
+        # sampling without replacement, vectorised: a random permutation per
+        # row (argsort of uniform keys) plus a per-row count of how many to keep
+        for key, pool, lo, hi in (
+            ("wind_patterns", self.wind_patterns, 1, 3),
+            ("minerals", self.minerals, 2, 5),
+            ("dominant_forms", self.dominant_forms, 2, 4),
+            ("activity_patterns", self.activity_patterns, 2, 4),
+            ("feeding_strategies", self.feeding_strategies, 2, 3),
+            ("mobility_types", self.mobility_types, 2, 3),
+            ("social_structures", self.social_structures, 1, 2),
+        ):
+            cols[key] = np.argsort(rng.random((n, len(pool)), dtype=np.float32), axis=1).astype(np.int8)
+            cols[key + "_count"] = rng.integers(lo, hi + 1, n)
+        cols["special_features"] = np.argsort(rng.random((n, len(self.special_features_pool)), dtype=np.float32), axis=1).astype(np.int8)
+
+        cols["rarity"], cols["biodiversity"], cols["productivity"] = self._metrics(
+            cols["humidity"], cols["temp_min"], cols["temp_max"],
+            cols["seasonality"], cols["fertility"], num_features, cap=np.minimum,
+        )
+        return SyntheticBiomeBatch(self, cols)
+
+
+class SyntheticBiomeBatch:
+    """Columnar result of SyntheticBiomeGenerator.generate_batch.
+
+    `columns` holds one NumPy array per attribute (categoricals as indices into
+    the generator's pools). Use records() for a structured array of the
+    numeric columns, or biome(i) / to_dict(i) / rows() to materialise
+    individual biomes only when they are actually needed.
+    """
 
-# Lightweight instance for quick use
+    def __init__(self, generator: SyntheticBiomeGenerator, columns: dict):
+        self.gen = generator
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns["base"])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.biome(i)
+
+    def records(self):
+        """Numeric/categorical columns as a NumPy structured array (one record per biome)."""
+        c = self.columns
+        fields = ["rarity", "biodiversity", "productivity", "humidity", "temp_min", "temp_max",
+                  "precip_min", "precip_max", "seasonality", "storm_frequency",
+                  "fertility", "drainage", "ph_level", "organic_content"]
+        out = np.empty(len(self), dtype=[("id", "U16"), ("base_type", "U16"), ("num_features", "i1")] + [(f, "f8") for f in fields])
+        out["id"] = np.char.mod("%016x", c["id"])
+        out["base_type"] = np.array(list(self.gen.base_archetypes))[c["base"]]
+        out["num_features"] = c["num_features"]
+        for f in fields:
+            out[f] = c[f]
+        return out
+
+    def _pick(self, key, pool, i, count=None):
+        n = self.columns[key + "_count"][i] if count is None else count
+        return [pool[j] for j in self.columns[key][i][:n]]
+
+    def _name(self, i) -> str:
+        g = self.gen
+        a, b, c, d = (int(v) for v in self.columns["name_parts"][i])
+        suffix = g.name_suffixes[d % len(g.name_suffixes)]
+        name_type = g.name_types[self.columns["name_type"][i]]
+        if name_type == "simple":
+            return f"{g.name_prefixes[a % len(g.name_prefixes)]}{suffix}"
+        elif name_type == "compound":
+            return f"{g.name_prefixes[a % len(g.name_prefixes)]}{g.name_connectors[b % len(g.name_connectors)]}{g.name_descriptors[c % len(g.name_descriptors)]} {suffix}"
+        elif name_type == "descriptive":
+            feature = g.special_features_pool[a % len(g.special_features_pool)].replace('_', ' ').title()
+            return f"{feature} {suffix}"
+        else:
+            return f"{g.name_elements[a % len(g.name_elements)]}-Touched {suffix}"
+
+    def biome(self, i) -> SyntheticBiome:
+        g, c = self.gen, self.columns
+        exotic = c["exotic"][i]
+        climate = SyntheticClimate(
+            temperature_range=(float(c["temp_min"][i]), float(c["temp_max"][i])),
+            precipitation_mm=(float(c["precip_min"][i]), float(c["precip_max"][i])),
+            humidity_level=float(c["humidity"][i]),
+            seasonality=float(c["seasonality"][i]),
+            storm_frequency=float(c["storm_frequency"][i]),
+            wind_patterns=self._pick("wind_patterns", g.wind_patterns, i),
+        )
+        soil = SyntheticSoil(
+            fertility=float(c["fertility"][i]),
+            drainage=float(c["drainage"][i]),
+            ph_level=float(c["ph_level"][i]),
+            organic_content=float(c["organic_content"][i]),
+            mineral_composition=self._pick("minerals", g.minerals, i),
+        )
+        vegetation = SyntheticVegetation(
+            canopy_structure=(g.exotic_canopies if exotic else g.canopy_structures)[c["canopy"][i]],
+            leaf_type=(g.exotic_leaf_types if exotic else g.leaf_types)[c["leaf"][i]],
+            growth_pattern=g.growth_patterns[c["growth"][i]],
+            root_system=g.root_systems[c["root"][i]],
+            reproduction_method=g.reproduction_methods[c["reproduction"][i]],
+            dominant_forms=self._pick("dominant_forms", g.dominant_forms, i),
+        )
+        fauna = SyntheticFauna(
+            size_distribution=g.size_distributions[c["size_distribution"][i]],
+            activity_patterns=self._pick("activity_patterns", g.activity_patterns, i),
+            feeding_strategies=self._pick("feeding_strategies", g.feeding_strategies, i),
+            mobility_types=self._pick("mobility_types", g.mobility_types, i),
+            social_structures=self._pick("social_structures", g.social_structures, i),
+        )
+        return SyntheticBiome(
+            id=f"{int(c['id'][i]):016x}",
+            name=self._name(i),
+            base_type=list(g.base_archetypes)[c["base"][i]],
+            climate=climate,
+            soil=soil,
+            vegetation=vegetation,
+            fauna=fauna,
+            special_features=self._pick("special_features", g.special_features_pool, i, int(c["num_features"][i])),
+            rarity=float(c["rarity"][i]),
+            biodiversity=float(c["biodiversity"][i]),
+            productivity=float(c["productivity"][i]),
+        )
+
+    def to_dict(self, i) -> dict:
+        """Row i shaped like the Biome model columns."""
+        b = self.biome(i)
+        return {
+            "id": b.id,
+            "name": b.name,
+            "base_type": b.base_type,
+            "rarity": b.rarity,
+            "biodiversity": b.biodiversity,
+            "productivity": b.productivity,
+            "climate": b.climate.__dict__,
+            "soil": b.soil.__dict__,
+            "vegetation": b.vegetation.__dict__,
+            "fauna": b.fauna.__dict__,
+            "special_features": b.special_features,
+        }
+
+    def rows(self):
+        for i in range(len(self)):
+            yield self.to_dict(i)
+
+
+# Lightweight instance for quick use. Single-threaded callers only: it owns one
+# stream, so concurrent code should build its own generator (or spawn() one).
 default_biome_generator = SyntheticBiomeGenerator()
 
 
@@ -312,9 +571,13 @@ from typing import Optional
 from app.services.synthetic_biome_data import default_biome_generator, SyntheticBiome
 
 
-def generate_synthetic_biome() -> SyntheticBiome:
-    """Return a generated SyntheticBiome dataclass (not persisted)."""
-    return default_biome_generator.generate_synthetic_biome()
+def generate_synthetic_biome(seed: Optional[int] = None) -> SyntheticBiome:
+    """Return a generated SyntheticBiome dataclass (not persisted).
+
+    Uses a fresh generator per call so concurrent requests never share RNG
+    state; the same seed always reproduces the same biome.
+    """
+    return SyntheticBiomeGenerator(seed).generate_synthetic_biome()
 
 
 def persist_biome(db_session, BiomeModel, biome: SyntheticBiome):
@@ -1,29 +1,177 @@
-import random
+"""
+On-demand materialisation of a galaxy's star systems, planets and biome links.
+
+Everything below a galaxy is derived from galaxy.seed, so it is only written
+when the galaxy is first opened. The write is idempotent under concurrency:
+on PostgreSQL the writer holds pg_advisory_xact_lock(SYSTEMS_LOCK, galaxy.id)
+and re-checks for systems after taking it, so a second request for the same
+galaxy waits for the first one's commit and then finds its rows. The whole
+galaxy is one HierarchyWriter flush, i.e. one transaction, so nobody ever sees
+half a galaxy. Elsewhere the unique (galaxy_id, ordinal) constraint makes the
+loser fail with an IntegrityError, which is rolled back and ignored.
+
+After a galaxy is opened, prefetch_neighbours() materialises the
+SYSTEM_PREFETCH_NEIGHBOURS nearest galaxies on a small background pool, so
+moving on to one of them is not a first visit any more. Set the config value
+to 0 to turn it off.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+from flask import current_app
+from sqlalchemy import or_, text
+from sqlalchemy.exc import IntegrityError
+
+from app.models.galaxy import Galaxy
 from app.models.system import StarSystem
 from app.extensions import db
+from app.services.procgen import system_trees
+from app.services.spatial import WORLD_HALF, morton_ranges
+from app.services.world_generator import (
+    HierarchyWriter, universe_config, load_biome_pool
+)
 
 STAR_TYPES = [
     "Red Dwarf", "Yellow Dwarf", "Blue Giant", "White Dwarf",
     "Red Giant", "Neutron Star", "Binary Stars", "Black Hole"
 ]
 
-def generate_star_systems_for_galaxy(galaxy, n=10):
-    """Generate N systems inside a galaxy (if not already generated)."""
-
-    if galaxy.systems and len(galaxy.systems) > 0:
-        return galaxy.systems  # Already exists
-
-    systems = []
-    for i in range(n):
-        s = StarSystem(
-            galaxy_id=galaxy.id,
-            name=f"System {galaxy.id}-{i+1}",
-            star_type=random.choice(STAR_TYPES),
-            position_x=random.randint(-2000, 2000),
-            position_y=random.randint(-2000, 2000)
-        )
-        db.session.add(s)
-        systems.append(s)
-
-    db.session.commit()
-    return systems
+# first key of the two-key advisory lock; the second is the galaxy id
+SYSTEMS_LOCK = 0x67_73_79_73  # "gsys"
+
+DEFAULT_PREFETCH_NEIGHBOURS = 4
+PREFETCH_THREADS = 2
+PREFETCH_MAX_PENDING = 32  # galaxies whose neighbours are queued; more are dropped
+
+
+def _systems(galaxy, options):
+    # universe_id lets a partitioned star_systems table prune to one partition
+    return (
+        StarSystem.query.options(*options)
+        .filter_by(universe_id=galaxy.universe_id, galaxy_id=galaxy.id)
+        .order_by(StarSystem.ordinal)
+        .all()
+    )
+
+
+def _has_systems(galaxy):
+    return db.session.execute(
+        db.select(StarSystem.id)
+        .where(StarSystem.universe_id == galaxy.universe_id, StarSystem.galaxy_id == galaxy.id)
+        .limit(1)
+    ).first() is not None
+
+
+def materialize_star_systems(galaxy, n=None) -> bool:
+    """Write the galaxy's systems and below unless they exist. True if this call wrote them."""
+    if db.engine.dialect.name == "postgresql":
+        db.session.execute(text("SELECT pg_advisory_xact_lock(:ns, :id)"),
+                           {"ns": SYSTEMS_LOCK, "id": galaxy.id})
+    if _has_systems(galaxy):
+        db.session.rollback()  # release the lock
+        return False
+
+    cfg = universe_config(galaxy.universe)
+    systems = system_trees(galaxy.seed, galaxy.ordinal or galaxy.id, cfg, load_biome_pool())
+    if n is not None:
+        systems = systems[:n]
+
+    # a single tree is a single flush: one transaction, which also ends the lock
+    writer = HierarchyWriter(galaxy.universe_id, cfg.get("batch_size", 500))
+    try:
+        writer.add({"row": {"id": galaxy.id}, "systems": systems})
+        writer.flush()
+    except IntegrityError:
+        # no advisory locks here: another request wrote the same ordinals first
+        db.session.rollback()
+        return False
+    return True
+
+
+def generate_star_systems_for_galaxy(galaxy, n=None, options=()):
+    """Materialise a galaxy's systems, planets and biome links (if not already generated).
+
+    Everything is derived from galaxy.seed, so the result is the same no matter
+    when the galaxy is first opened. `n` caps the number of systems.
+    `options` are loader options for the returned systems (see
+    app.services.loaders).
+    """
+
+    existing = _systems(galaxy, options)
+    if existing:
+        return existing  # Already exists
+
+    materialize_star_systems(galaxy, n)
+    return _systems(galaxy, options)
+
+
+def nearest_unmaterialized(galaxy, k):
+    """Ids of up to `k` galaxies nearest to `galaxy` that have no systems yet.
+
+    Searches a square expected to hold about 16 galaxies (from the
+    universe's galaxy count), doubling it until k are found.
+    """
+    count = max(universe_config(galaxy.universe).get("galaxies", 1), 1)
+    r = 4 * WORLD_HALF / count ** 0.5
+    dist2 = (Galaxy.x - galaxy.x) * (Galaxy.x - galaxy.x) + (Galaxy.y - galaxy.y) * (Galaxy.y - galaxy.y)
+    no_systems = ~db.select(StarSystem.id).where(
+        StarSystem.universe_id == Galaxy.universe_id, StarSystem.galaxy_id == Galaxy.id
+    ).exists()
+    while True:
+        x0, y0, x1, y1 = galaxy.x - r, galaxy.y - r, galaxy.x + r, galaxy.y + r
+        ids = db.session.execute(
+            db.select(Galaxy.id).where(
+                Galaxy.universe_id == galaxy.universe_id,
+                or_(*[Galaxy.morton.between(lo, hi) for lo, hi in morton_ranges(x0, y0, x1, y1)]),
+                Galaxy.x.between(x0, x1), Galaxy.y.between(y0, y1),
+                Galaxy.id != galaxy.id, no_systems,
+            ).order_by(dist2, Galaxy.id).limit(k)
+        ).scalars().all()
+        if len(ids) >= k or r >= 2 * WORLD_HALF:
+            return ids
+        r *= 2
+
+
+class NeighbourPrefetcher:
+    """Background pool materialising the galaxies around the ones being opened."""
+
+    def __init__(self, threads=PREFETCH_THREADS, max_pending=PREFETCH_MAX_PENDING):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="system-prefetch")
+        self._pending = set()  # galaxy ids whose neighbours are queued
+        self._lock = threading.Lock()
+
+    def submit(self, app, galaxy_id, k):
+        with self._lock:
+            if galaxy_id in self._pending or len(self._pending) >= self.max_pending:
+                return False
+            self._pending.add(galaxy_id)
+        self._executor.submit(self._run, app, galaxy_id, k)
+        return True
+
+    def _run(self, app, galaxy_id, k):
+        try:
+            with app.app_context():
+                try:
+                    galaxy = db.session.get(Galaxy, galaxy_id)
+                    for gid in nearest_unmaterialized(galaxy, k):
+                        materialize_star_systems(db.session.get(Galaxy, gid))
+                finally:
+                    db.session.remove()
+        except Exception as e:
+            print(f"💥 System prefetch around galaxy {galaxy_id} failed: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(galaxy_id)
+
+
+# one pool per web process
+prefetcher = NeighbourPrefetcher()
+
+
+def prefetch_neighbours(galaxy):
+    """Queue the nearest unopened galaxies around `galaxy` for materialisation."""
+    k = current_app.config.get("SYSTEM_PREFETCH_NEIGHBOURS", DEFAULT_PREFETCH_NEIGHBOURS)
+    if k <= 0 or galaxy.x is None or galaxy.y is None:
+        return False
+    return prefetcher.submit(current_app._get_current_object(), galaxy.id, k)
@@ -0,0 +1,131 @@
+"""
+Binary galaxy map tiles.
+
+Tile (z, x, y) is the level-z quadtree cell of the Morton grid (see
+app.services.spatial), so its galaxies are one contiguous key range of
+ix_galaxies_universe_morton. A tile holds the galaxies themselves, or, when
+there are more than TILE_MAX_POINTS of them, one aggregate per sub-cell
+CLUSTER_LEVELS levels further down.
+
+Tiles use the columnar encoding (app.services.columnar) with "kind"
+("galaxies" or "clusters") and "origin" (grid units) in the header:
+
+    galaxies: id:u32  name:str  cluster:cat  dx:u16  dy:u16   (+ "grid", see spatial.grid_index)
+    clusters: count:u32  dx:u16  dy:u16
+
+dx/dy are grid units from the tile's min corner. Tiles are cached under
+instance/tiles/<universe>/v<cache key>/, where the key combines TILE_FORMAT
+with universe.meta "tiles_version", which invalidate_tiles bumps whenever
+galaxies change.
+"""
+import os
+import shutil
+
+from flask import current_app
+from sqlalchemy import func, literal_column
+
+from app.extensions import db
+from app.models import Galaxy
+from app.services import columnar
+from app.services.spatial import BITS, WORLD_HALF, cell_range, cell_shift, cell_size, grid_index, to_grid
+
+# part of the cache key, so a format change never serves stale cached bytes
+TILE_FORMAT = 3
+
+MAX_TILE_ZOOM = 12
+TILE_MAX_POINTS = 4096
+CLUSTER_LEVELS = 6  # a clustered tile is a 64x64 grid of aggregates
+PICK_GRID_CELLS = 16  # galaxies tiles ship a 16x16 picking grid
+
+
+def encode_points(rows, ox, oy, size) -> bytes:
+    """rows of (id, name, type, x, y) -> galaxies tile with origin (ox, oy) in grid units.
+
+    Rows are reordered by picking-grid cell; the grid goes into the header.
+    """
+    x0, y0 = ox - WORLD_HALF, oy - WORLD_HALF
+    cell = size / PICK_GRID_CELLS
+    rows, starts = grid_index(rows, lambda r: (r[3], r[4]), x0, y0, cell, PICK_GRID_CELLS, PICK_GRID_CELLS)
+    grid = {"x0": x0, "y0": y0, "cell": cell, "cols": PICK_GRID_CELLS, "rows": PICK_GRID_CELLS, "starts": starts}
+    return columnar.encode([
+        ("id", "u32", [r[0] for r in rows]),
+        ("name", "str", [r[1] for r in rows]),
+        ("cluster", "cat", [r[2] for r in rows]),
+        ("dx", "u16", [to_grid(r[3]) - ox for r in rows]),
+        ("dy", "u16", [to_grid(r[4]) - oy for r in rows]),
+    ], kind="galaxies", origin=[ox, oy], grid=grid)
+
+
+def encode_clusters(rows, ox, oy) -> bytes:
+    """rows of (count, avg_x, avg_y) -> clusters tile with origin (ox, oy)."""
+    return columnar.encode([
+        ("count", "u32", [r[0] for r in rows]),
+        ("dx", "u16", [to_grid(round(float(r[1]))) - ox for r in rows]),
+        ("dy", "u16", [to_grid(round(float(r[2]))) - oy for r in rows]),
+    ], kind="clusters", origin=[ox, oy])
+
+
+def tile_exists(z, x, y) -> bool:
+    return 0 <= z <= MAX_TILE_ZOOM and 0 <= x < (1 << z) and 0 <= y < (1 << z)
+
+
+def render_tile(universe_id, z, x, y) -> bytes:
+    size = cell_size(z)
+    ox, oy = x * size, y * size
+    # the tile is one quadtree cell, i.e. one contiguous Morton range
+    lo, hi = cell_range(z, x, y)
+    where = [Galaxy.universe_id == universe_id, Galaxy.morton.between(lo, hi)]
+
+    rows = db.session.execute(
+        db.select(Galaxy.id, Galaxy.name, Galaxy.type, Galaxy.x, Galaxy.y)
+        .where(*where)
+        .order_by(Galaxy.morton)
+        .limit(TILE_MAX_POINTS + 1)
+    ).all()
+    if len(rows) <= TILE_MAX_POINTS:
+        return encode_points(rows, ox, oy, size)
+
+    cell = Galaxy.morton.op(">>")(literal_column(str(cell_shift(min(BITS, z + CLUSTER_LEVELS)))))
+    clusters = db.session.execute(
+        db.select(func.count(), func.avg(Galaxy.x), func.avg(Galaxy.y))
+        .where(*where)
+        .group_by(cell)
+        .order_by(cell)
+    ).all()
+    return encode_clusters(clusters, ox, oy)
+
+
+def tiles_version(universe) -> int:
+    return (universe.meta or {}).get("tiles_version", 0)
+
+
+def tiles_cache_key(universe) -> str:
+    """Tile URLs carry this as ?v=; changes with the data or the tile format."""
+    return f"{TILE_FORMAT}.{tiles_version(universe)}"
+
+
+def _universe_dir(universe_id):
+    return os.path.join(current_app.instance_path, "tiles", str(universe_id))
+
+
+def tile_path(universe, z, x, y):
+    """Path of the cached tile, rendering it first if needed."""
+    path = os.path.join(_universe_dir(universe.id), f"v{tiles_cache_key(universe)}",
+                        str(z), str(x), f"{y}.bin")
+    if not os.path.exists(path):
+        data = render_tile(universe.id, z, x, y)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)  # concurrent renders of one tile just race to the same bytes
+    return path
+
+
+def invalidate_tiles(universe):
+    """Bump the universe's tile version and drop its cached tiles.
+
+    Only sets universe.meta; the caller commits.
+    """
+    universe.meta = {**(universe.meta or {}), "tiles_version": tiles_version(universe) + 1}
+    shutil.rmtree(_universe_dir(universe.id), ignore_errors=True)
@@ -0,0 +1,201 @@
+"""
+Deleting universes and collecting orphaned generated data.
+
+Runs as the "universe_gc" job (see app.services.worker). A universe's world
+rows are deleted children first, table by table, in keyset batches of
+GC_BATCH_ROWS: `DELETE ... WHERE id IN (SELECT id ... WHERE universe_id = ?
+AND id > <last deleted> ORDER BY id LIMIT n)`, each batch its own short
+transaction served by the (universe_id, id) indexes. Ids come from global
+sequences, so a universe's ids can be spread thinly over a huge range; the
+batches only ever visit its own rows. Between batches the job sleeps
+GC_PAUSE seconds so autovacuum and
+concurrent writers keep up, and a batch that waits more than
+GC_LOCK_TIMEOUT for a lock backs off and retries instead of queueing behind
+(and in front of) everyone else. On partitioned tables (app.services.
+partitions) the universe's partitions are simply dropped first.
+
+Orphans are universes whose generation failed (meta "failed", set by
+generate_universe) or that were marked "deleting" by a job that never
+finished, eager universes never marked "generated" whose generation job
+died with its worker (no queued or running job links to them, see
+link_job_universe), pool universes (app.services.universe_pool) that were
+never made ready, plus world rows whose parent link is NULL. Those are
+collected by the same job, GC_UNIVERSE_BATCH universes per run, which idle
+workers also queue every GC_INTERVAL (see schedule_garbage_collection).
+"""
+from datetime import datetime, timedelta
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.extensions import db
+from app.models import Galaxy, JobQueue, Planet, PlanetBiome, SaveGame, StarSystem, Universe
+from app.services.job_queue import SYSTEM_USER_ID, enqueue_universe_gc_job
+from app.services.partitions import drop_universe_partitions
+from app.services.tiles import invalidate_tiles
+from app.services.universe_pool import POOL_STALE_AFTER
+
+GC_BATCH_ROWS = 5000
+GC_UNIVERSE_BATCH = 100
+GC_PAUSE = 0.05
+GC_LOCK_TIMEOUT = "2s"
+GC_LOCK_BACKOFF = 5
+
+# how often idle workers queue a collection of abandoned universes and orphans
+GC_INTERVAL = timedelta(hours=6)
+# pg_advisory_xact_lock key serialising schedule_garbage_collection across workers
+GC_SCHEDULE_LOCK = 0x6761_6763  # "gagc"
+
+# children first, so no batch ever deletes a row another table still points at
+WORLD_MODELS = (PlanetBiome, Planet, StarSystem, Galaxy)
+
+# world rows whose parent link is NULL can never be reached again
+ORPHAN_FILTERS = (
+    (PlanetBiome, PlanetBiome.planet_id.is_(None)),
+    (Planet, Planet.system_id.is_(None)),
+    (StarSystem, StarSystem.galaxy_id.is_(None)),
+)
+
+
+def _is_lock_timeout(error):
+    orig = error.orig
+    return (getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)) == "55P03"
+
+
+def _delete_batch(model, where, after, batch):
+    """Delete the next `batch` matching rows with id > `after`, in their own transaction.
+
+    Retried after a back-off on lock timeouts. Returns the deleted ids.
+    """
+    table = model.__table__
+    while True:
+        try:
+            if db.engine.dialect.name == "postgresql":
+                db.session.execute(text(f"SET LOCAL lock_timeout = '{GC_LOCK_TIMEOUT}'"))
+            # ids first, then delete by primary key: as one DELETE ... IN
+            # (subquery) the planner trusts the stats of a freshly written
+            # universe ("1 row") and can pick a quadratic semi-join
+            ids = db.session.execute(
+                db.select(table.c.id).where(where, table.c.id > after).order_by(table.c.id).limit(batch)
+            ).scalars().all()
+            if ids:
+                # `where` again lets a partitioned table prune
+                db.session.execute(table.delete().where(where, table.c.id.in_(ids)))
+            db.session.commit()
+            return ids
+        except OperationalError as e:
+            db.session.rollback()
+            if not _is_lock_timeout(e):
+                raise
+            time.sleep(GC_LOCK_BACKOFF)
+
+
+def delete_in_batches(targets, progress=None, batch=GC_BATCH_ROWS, pause=GC_PAUSE):
+    """Delete the rows matching each (model, where) in keyset batches.
+
+    `progress(fraction)` is called after every batch, as a share of the rows
+    counted up front. Returns rows deleted.
+    """
+    counts = [db.session.execute(db.select(db.func.count()).select_from(model).where(where)).scalar()
+              for model, where in targets]
+    db.session.commit()
+    total = sum(counts) or 1
+    deleted = 0
+    for (model, where), count in zip(targets, counts):
+        last = 0
+        while count:
+            ids = _delete_batch(model, where, last, batch)
+            if not ids:
+                break
+            deleted += len(ids)
+            last = max(ids)
+            if progress:
+                progress(min(deleted / total, 1.0))
+            if len(ids) < batch:
+                break
+            time.sleep(pause)
+    if progress:
+        progress(1.0)
+    return deleted
+
+
+def delete_universe(universe_id, progress=None):
+    """Delete a universe with its whole generated hierarchy and its saves."""
+    universe = db.session.get(Universe, universe_id)
+    if universe is None:
+        return 0
+    universe.meta = {**(universe.meta or {}), "deleting": True}
+    invalidate_tiles(universe)
+    db.session.commit()
+
+    drop_universe_partitions(universe_id)
+    # partitioned: only stray rows in the default partitions are left to delete
+    deleted = delete_in_batches(
+        [(model, model.universe_id == universe_id) for model in WORLD_MODELS], progress)
+
+    db.session.execute(SaveGame.__table__.delete().where(SaveGame.universe_id == universe_id))
+    db.session.execute(Universe.__table__.delete().where(Universe.id == universe_id))
+    db.session.commit()
+    if progress:
+        progress(1.0)
+    return deleted
+
+
+def _flag(name):
+    return Universe.meta[name].as_boolean().is_(True)
+
+
+def abandoned_universe_ids(limit=GC_UNIVERSE_BATCH):
+    """Up to `limit` universes whose generation failed or died, or whose deletion never finished."""
+    stale_before = datetime.utcnow() - POOL_STALE_AFTER
+    generating = db.select(JobQueue.id).where(
+        JobQueue.job_type == "universe_generation",
+        JobQueue.status.in_(("queued", "running")),
+        JobQueue.meta["universe_id"].as_integer() == Universe.id,
+    ).exists()
+    return db.session.execute(
+        db.select(Universe.id).where(db.or_(
+            _flag("failed"),
+            _flag("deleting"),
+            # eager generation that never finished: its job failed or was
+            # re-queued (and started over on a new universe)
+            db.and_(~_flag("lazy"), ~_flag("generated"), Universe.user_id.is_not(None),
+                    Universe.created_at < stale_before, ~generating),
+            # a pool universe that never became ready: its pool job died
+            db.and_(Universe.user_id.is_(None), ~_flag("pool_ready"),
+                    Universe.created_at < stale_before),
+        )).order_by(Universe.id).limit(limit)
+    ).scalars().all()
+
+
+def collect_garbage(universe_id=None, progress=None):
+    """Delete `universe_id` (if given), abandoned universes and orphaned rows.
+
+    Returns the number of world rows deleted.
+    """
+    universe_ids = [universe_id] if universe_id is not None else []
+    universe_ids += [uid for uid in abandoned_universe_ids() if uid != universe_id]
+    steps = len(universe_ids) + 1
+
+    def step(i):
+        return (lambda fraction: progress((i + fraction) / steps)) if progress else None
+
+    deleted = 0
+    for i, uid in enumerate(universe_ids):
+        deleted += delete_universe(uid, step(i))
+    deleted += delete_in_batches(ORPHAN_FILTERS, step(len(universe_ids)))
+    return deleted
+
+
+def schedule_garbage_collection():
+    """Queue a universe_gc job if none ran in the last GC_INTERVAL. Returns its id or None."""
+    if db.engine.dialect.name == "postgresql":
+        db.session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": GC_SCHEDULE_LOCK})
+    last = db.session.execute(
+        db.select(db.func.max(JobQueue.created_at)).where(JobQueue.job_type == "universe_gc")
+    ).scalar()
+    if last is not None and last > datetime.utcnow() - GC_INTERVAL:
+        db.session.rollback()
+        return None
+    return enqueue_universe_gc_job(SYSTEM_USER_ID)
@@ -0,0 +1,108 @@
+"""
+Warm pool of pre-generated universes.
+
+Workers keep "pool_size" (config/universe.json) unowned universes ready:
+Universe.user_id is NULL and meta "pool_ready" is set once everything the
+universe needs up front has been written (the galaxy rows of a lazy
+universe, the whole hierarchy of an eager one). "Generate New Universe"
+then claims one with SELECT ... FOR UPDATE SKIP LOCKED and hands it to the
+player in the same request (see enqueue_generate_universe_job); only when
+the pool is empty does it fall back to a universe_generation job.
+
+An idle worker calls top_up_pool(), which queues one "universe_pool" job
+per missing universe. The count and the enqueue run under an advisory
+lock, so several idle workers never overfill the pool. A pool universe
+whose job died before it became ready is collected by the universe_gc job
+after POOL_STALE_AFTER.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from app.extensions import db
+from app.models import JobQueue, Universe
+from app.services.job_queue import SYSTEM_USER_ID, notify_job
+from app.services.world_generator import generate_universe, load_universe_config, materialize_galaxies
+
+POOL_JOB_TYPE = "universe_pool"
+
+POOL_STALE_AFTER = timedelta(hours=1)
+
+# pg_advisory_xact_lock key serialising top_up_pool across workers
+POOL_LOCK_KEY = 0x6761_706F  # "gapo"
+
+
+def pool_size() -> int:
+    return int(load_universe_config().get("pool_size", 0))
+
+
+def _ready():
+    return db.and_(Universe.user_id.is_(None), Universe.meta["pool_ready"].as_boolean().is_(True))
+
+
+def claim_pooled_universe(user_id: int):
+    """Hand a ready pool universe to `user_id`; None when the pool is empty.
+
+    SKIP LOCKED lets concurrent claims each take a different universe
+    instead of queueing on the same row. Commits.
+    """
+    universe = db.session.execute(
+        db.select(Universe).where(_ready()).order_by(Universe.id).limit(1)
+        .with_for_update(skip_locked=True)
+    ).scalar_one_or_none()
+    if universe is None:
+        db.session.rollback()  # release the snapshot
+        return None
+
+    now = datetime.utcnow()
+    universe.user_id = user_id
+    universe.name = f"Universe {now.strftime('%Y-%m-%d %H:%M:%S')}"
+    universe.created_at = now
+    universe.meta = {k: v for k, v in universe.meta.items() if k != "pool_ready"}
+    db.session.commit()
+    return universe
+
+
+def pregenerate_universe():
+    """Generate one unowned universe and mark it ready to be claimed."""
+    universe_id = generate_universe(None)
+    universe = db.session.get(Universe, universe_id)
+    try:
+        materialize_galaxies(universe)
+    except Exception:
+        db.session.rollback()
+        universe.meta = {**universe.meta, "failed": True}
+        db.session.commit()
+        raise
+    universe.meta = {**universe.meta, "pool_ready": True}
+    db.session.commit()
+    return universe_id
+
+
+def top_up_pool() -> int:
+    """Queue pool jobs for the universes missing from the pool. Returns how many."""
+    size = pool_size()
+    if size <= 0:
+        return 0
+    if db.engine.dialect.name == "postgresql":
+        db.session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": POOL_LOCK_KEY})
+
+    ready = db.session.execute(db.select(db.func.count()).where(_ready())).scalar()
+    pending = db.session.execute(
+        db.select(db.func.count()).where(
+            JobQueue.job_type == POOL_JOB_TYPE, JobQueue.status.in_(("queued", "running")))
+    ).scalar()
+    missing = size - ready - pending
+    if missing <= 0:
+        db.session.rollback()
+        return 0
+
+    now = datetime.utcnow()
+    jobs = [JobQueue(job_type=POOL_JOB_TYPE, user_id=SYSTEM_USER_ID, status="queued", progress=0.0,
+                     meta={"message": "Waiting to start"}, created_at=now)
+            for _ in range(missing)]
+    db.session.add_all(jobs)
+    db.session.flush()
+    notify_job(jobs[0].id)
+    db.session.commit()
+    return missing
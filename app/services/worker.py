@@ -1,55 +1,196 @@
+import argparse
+import os
+import signal
+import socket
+import threading
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 from app import create_app
 from app.extensions import db
 from app.models import JobQueue
+from app.services.universe_gc import collect_garbage, schedule_garbage_collection
+from app.services.universe_pool import POOL_JOB_TYPE, pregenerate_universe, top_up_pool
 from app.services.world_generator import generate_universe
+from app.services.job_queue import (
+    claim_next_job, heartbeat_jobs, requeue_expired_jobs, JobListener,
+    ProgressReporter, update_job_progress, update_job_status,
+)
 
-# How often the worker checks for jobs (seconds)
-POLL_INTERVAL = 2
+# Longest the worker sleeps without a notification before re-checking the
+# queue (safety net for a missed NOTIFY; normally it wakes immediately)
+POLL_INTERVAL = 30
 
+# Leases: a running job's lease is renewed every HEARTBEAT_INTERVAL seconds;
+# if it is not renewed for LEASE_SECONDS the job is assumed orphaned.
+HEARTBEAT_INTERVAL = 30
+LEASE_SECONDS = 300
 
-def run_worker():
-    from app import create_app
+
+def _generate_universe_job(job):
+    generate_universe(job.user_id, job)
+
+
+def _universe_gc_job(job):
+    with ProgressReporter(job.id) as reporter:
+        deleted = collect_garbage((job.meta or {}).get("universe_id"),
+                                  lambda fraction: reporter.report(fraction, "Deleting generated data..."))
+        reporter.report(1.0, f"Done, {deleted} rows deleted", force=True)
+
+
+def _universe_pool_job(job):
+    universe_id = pregenerate_universe()
+    update_job_progress(job.id, 1.0, f"Universe #{universe_id} added to the pool")
+
+
+# job_type -> callable(job); only these types are claimed
+JOB_HANDLERS = {
+    "universe_generation": _generate_universe_job,
+    "universe_gc": _universe_gc_job,
+    POOL_JOB_TYPE: _universe_pool_job,
+}
+
+# per-type concurrency caps applied unless --limit overrides them; one GC at
+# a time keeps bulk deletes from competing for the same locks and I/O, and
+# one pool job at a time leaves the other slots to players' own jobs
+DEFAULT_LIMITS = {"universe_gc": 1, POOL_JOB_TYPE: 1}
+
+
+def run_job(app, job_id):
+    """Run one claimed job in its own app context, i.e. its own DB session."""
+    with app.app_context():
+        job = db.session.get(JobQueue, job_id)
+        print(f"🚀 Starting Job #{job.id} ({job.job_type}) for user {job.user_id}")
+        try:
+            JOB_HANDLERS[job.job_type](job)
+            update_job_status(job.id, "done", progress=1.0)
+        except Exception as e:
+            db.session.rollback()
+            update_job_status(job.id, "error", str(e))
+            print(f"❌ Job {job.id} failed: {e}")
+            traceback.print_exc()
+
+
+# Process mode: each pool process builds its own app (and engine) once
+_process_app = None
+
+
+def _init_process():
+    global _process_app
+    _process_app = create_app()
+
+
+def _run_job_in_process(job_id):
+    run_job(_process_app, job_id)
+
+
+def _claimable_types(running, limits, concurrency):
+    """Job types that are still under their per-type concurrency limit."""
+    counts = {}
+    for _, job_type in running.values():
+        counts[job_type] = counts.get(job_type, 0) + 1
+    return [t for t in JOB_HANDLERS if counts.get(t, 0) < limits.get(t, concurrency)]
+
+
+def run_worker(concurrency=1, mode="thread", limits=None):
+    """Run up to `concurrency` jobs at once on a thread or process pool.
+
+    `limits` caps concurrent jobs per JobQueue.job_type. SIGTERM/SIGINT stop
+    claiming new work and drain the running jobs before exiting. Leases of
+    running jobs are renewed by heartbeat, and jobs left behind by dead
+    workers are re-queued. Whenever nothing is running the worker tops up
+    the warm pool of universes (app.services.universe_pool) and queues the
+    periodic universe_gc job.
+    """
     app = create_app()
+    limits = {**DEFAULT_LIMITS, **(limits or {})}
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    stopping = threading.Event()
+
+    def _stop(signum, frame):
+        print("🛑 Draining running jobs before exit...")
+        stopping.set()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    if mode == "process":
+        executor = ProcessPoolExecutor(max_workers=concurrency, initializer=_init_process)
+        submit = lambda job_id: executor.submit(_run_job_in_process, job_id)
+    else:
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        submit = lambda job_id: executor.submit(run_job, app, job_id)
+
+    running = {}  # future -> (job_id, job_type)
 
     with app.app_context():
-        print("🛰  Universe Worker Started")
+        print(f"🛰  Universe Worker {worker_id} started ({concurrency} x {mode})")
+        listener = JobListener()
+        last_beat = 0.0
 
-        while True:
+        while not stopping.is_set() or running:
             try:
-                job = JobQueue.query.filter_by(status="queued").order_by(JobQueue.id.asc()).first()
+                for f in [f for f in running if f.done()]:
+                    running.pop(f)
+
+                if time.monotonic() - last_beat >= HEARTBEAT_INTERVAL:
+                    heartbeat_jobs([job_id for job_id, _ in running.values()], worker_id, LEASE_SECONDS)
+                    requeued = requeue_expired_jobs()
+                    if requeued:
+                        print(f"♻️  Re-queued {requeued} abandoned job(s)")
+                    last_beat = time.monotonic()
 
-                if not job:
-                    print("🌀 Waiting for jobs...")
-                    time.sleep(2)
+                if stopping.is_set():
+                    wait(list(running), timeout=1)
                     continue
 
-                print(f"🚀 Starting Job #{job.id} for user {job.user_id}")
-
-                job.status = "running"
-                db.session.commit()
-
-                # ----- Actual universe generation -----
-                try:
-                    generate_universe(job.user_id, job)
-                    job.status = "done"
-                    job.progress = 100
-                    job.message = "Universe generation complete"
-                    db.session.commit()
-                except Exception as e:
-                    db.session.rollback()
-                    job.status = "error"
-                    job.message = str(e)
-                    db.session.commit()
-                    print(f"❌ Job {job.id} failed: {e}")
-                # --------------------------------------
+                claimed = False
+                while len(running) < concurrency:
+                    types = _claimable_types(running, limits, concurrency)
+                    job = claim_next_job(types, worker_id, LEASE_SECONDS) if types else None
+                    if not job:
+                        break
+                    running[submit(job.id)] = (job.id, job.job_type)
+                    claimed = True
+
+                if claimed:
+                    continue
+                if len(running) >= concurrency:
+                    wait(list(running), timeout=1, return_when=FIRST_COMPLETED)
+                elif running:
+                    listener.wait(1)
+                else:
+                    # idle: spend it refilling the warm pool of universes and
+                    # collecting abandoned data
+                    if top_up_pool() or schedule_garbage_collection():
+                        continue
+                    listener.wait(POLL_INTERVAL)
 
             except Exception as e:
-                print(f"💥 Worker crashed: {e}")
+                print(f"💥 Worker loop error: {e}")
                 db.session.rollback()
                 time.sleep(2)
 
+        listener.close()
+
+    executor.shutdown(wait=True)
+    print("👋 Worker stopped")
+
+
+def _parse_limits(values):
+    limits = {}
+    for v in values or []:
+        job_type, _, n = v.partition("=")
+        limits[job_type] = int(n)
+    return limits
+
 
 if __name__ == "__main__":
-    run_worker()
+    parser = argparse.ArgumentParser(description="Gallactization job worker")
+    parser.add_argument("--concurrency", type=int, default=1, help="jobs to run at once")
+    parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+    parser.add_argument("--limit", action="append", metavar="JOB_TYPE=N",
+                        help="max concurrent jobs of one type (repeatable)")
+    args = parser.parse_args()
+    run_worker(args.concurrency, args.mode, _parse_limits(args.limit))
@@ -1,52 +1,220 @@
 from app.extensions import db
 from app.models.universe import Universe
 from app.models.galaxy import Galaxy
+from app.models.system import StarSystem
+from app.models.planet import Planet
+from app.models.planet_biome import PlanetBiome
+from app.models.biome import Biome
+from app.services.bulk_writer import reserve_ids, bulk_insert
+from app.services.job_queue import ProgressReporter, link_job_universe
+from app.services.partitions import create_universe_partitions
+from app.services.procgen import galaxy_spec, derive_galaxy_trees
+from app.services.tiles import invalidate_tiles
 from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+import json
+import os
 import random
 
-def generate_universe(user_id, job=None):
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "..", "config", "universe.json")
+if not os.path.exists(CONFIG_PATH):
+    # allow relative path fallback
+    CONFIG_PATH = os.path.join(os.getcwd(), "config", "universe.json")
+
+# Planet biomes link to existing catalogue rows; cap how many ids we pull in
+BIOME_POOL_SIZE = 1000
+
+
+def load_universe_config():
+    try:
+        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def universe_config(universe):
+    """The config snapshot a universe was generated with (falls back to the current file)."""
+    return (universe.meta or {}).get("config") or load_universe_config()
+
+
+def load_biome_pool():
+    return db.session.execute(
+        db.select(Biome.id).order_by(Biome.id).limit(BIOME_POOL_SIZE)
+    ).scalars().all()
+
+
+class HierarchyWriter:
+    """Buffers generated galaxy trees and writes them level by level in bulk.
+
+    Each flush reserves ids for every level up front (one query per table),
+    wires parent ids into the child rows in memory and then issues one
+    executemany per table, so a batch costs a fixed number of round trips no
+    matter how many rows it holds.
+
+    A tree whose galaxy row already carries an `id` is an existing galaxy:
+    only its systems and below are written.
+    """
+
+    def __init__(self, universe_id, batch_size=500):
+        self.universe_id = universe_id
+        self.batch_size = batch_size
+        self.pending = []
+        self.pending_rows = 0
+        self.rows_written = 0
+
+    def add(self, tree):
+        self.pending.append(tree)
+        self.pending_rows += 1 + sum(
+            1 + sum(1 + len(p["biomes"]) for p in s["planets"]) for s in tree["systems"]
+        )
+        if self.pending_rows >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+
+        now = datetime.utcnow()
+        new_galaxies = [t["row"] for t in self.pending if "id" not in t["row"]]
+        for gid, row in zip(reserve_ids(Galaxy.__table__, len(new_galaxies)), new_galaxies):
+            row.update(id=gid, universe_id=self.universe_id, created_at=now)
+
+        systems, planets, links = [], [], []
+        for tree in self.pending:
+            for s in tree["systems"]:
+                s["row"].update(galaxy_id=tree["row"]["id"], universe_id=self.universe_id)
+                systems.append(s)
+
+        for sid, s in zip(reserve_ids(StarSystem.__table__, len(systems)), systems):
+            s["row"].update(id=sid, created_at=now)
+            for p in s["planets"]:
+                p["row"].update(system_id=sid, universe_id=self.universe_id)
+                planets.append(p)
+
+        for pid, p in zip(reserve_ids(Planet.__table__, len(planets)), planets):
+            p["row"].update(id=pid, created_at=now)
+            for link in p["biomes"]:
+                link.update(planet_id=pid, universe_id=self.universe_id, created_at=now)
+                links.append(link)
+
+        # PlanetBiome ids are never referenced by children; let the DB assign them
+        bulk_insert(Galaxy.__table__, new_galaxies, self.batch_size)
+        bulk_insert(StarSystem.__table__, [s["row"] for s in systems], self.batch_size)
+        bulk_insert(Planet.__table__, [p["row"] for p in planets], self.batch_size)
+        bulk_insert(PlanetBiome.__table__, links, self.batch_size)
+        db.session.commit()
+
+        self.rows_written += self.pending_rows
+        self.pending = []
+        self.pending_rows = 0
+
+
+def _report(reporter, progress_callback, fraction, message, force=False):
+    if reporter:
+        reporter.report(fraction, message, force=force)
+    if progress_callback:
+        progress_callback(message, fraction)
+
+
+def materialize_galaxies(universe):
+    """Write the galaxy rows of a lazily generated universe on first touch.
+
+    Only the galaxy level is written here (one batch for the whole universe);
+    systems and below wait until a galaxy is opened, see
+    generate_star_systems_for_galaxy. Safe to call on every request.
+    """
+    meta = universe.meta or {}
+    if not meta.get("lazy") or meta.get("galaxies_materialized"):
+        return
+
+    cfg = universe_config(universe)
+    existing = set(db.session.execute(
+        db.select(Galaxy.ordinal).where(Galaxy.universe_id == universe.id)
+    ).scalars())
+
+    writer = HierarchyWriter(universe.id, cfg.get("batch_size", 500))
+    try:
+        for n in range(1, cfg.get("galaxies", 5) + 1):
+            if n not in existing:
+                writer.add({"row": galaxy_spec(universe.seed, n, cfg), "systems": []})
+        writer.flush()
+    except IntegrityError:
+        # another request materialised the same ordinals first
+        db.session.rollback()
+
+    invalidate_tiles(universe)
+    universe.meta = {**universe.meta, "galaxies_materialized": True}
+    db.session.commit()
+
+
+def galaxies_complete(universe) -> bool:
+    """True once every galaxy row of the universe has been written.
+
+    From then on the galaxy level is fixed by the seed and never changes.
+    """
+    meta = universe.meta or {}
+    return bool(meta.get("galaxies_materialized") if meta.get("lazy") else meta.get("generated"))
+
+
+def generate_universe(user_id, job=None, progress_callback=None):
+    """Create a Universe from config/universe.json.
+
+    With "lazy": true only the Universe row is written and everything below it
+    is derived from universe.seed on demand. Otherwise the full hierarchy is
+    derived up front — sharded by galaxy over a shared pool of "workers"
+    processes (0 = one per core) — and bulk-written by this process as
+    results stream back.
+    """
+    cfg = load_universe_config()
+    lazy = cfg.get("lazy", False)
+    reporter = ProgressReporter(job.id) if job else None
+
     # 1) Create Universe first
     universe = Universe(
         user_id=user_id,
         name=f"Universe {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}",
-        seed=random.randint(1, 999999999)
+        seed=random.randint(1, 999999999),
+        meta={"lazy": lazy, "config": cfg},
     )
     db.session.add(universe)
+    db.session.flush()
+    if job:
+        # same transaction: universe_gc never sees the universe without its job
+        link_job_universe(job.id, universe.id)
     db.session.commit()  # <— we MUST commit so universe.id exists
+    create_universe_partitions(universe.id)
 
-    # (optional) update job status
-    if job:
-        job.message = "Universe created. Generating galaxies..."
-        job.progress = 5
-        db.session.commit()
+    if lazy:
+        _report(reporter, progress_callback, 1.0, "Universe created", force=True)
+    else:
+        _report(reporter, progress_callback, 0.05, "Universe created. Generating galaxies...")
 
-    # 2) Generate galaxies
-    galaxy_count = 5  # later configurable
-
-    for i in range(1, galaxy_count + 1):
-        g = Galaxy(
-            universe_id=universe.id,    # <— THE MISSING PIECE
-            name=f"Galaxy {i}",
-            seed=random.randint(1, 999999999),
-            num_stars=random.randint(10_000, 200_000),  # safe number range
-            type=random.choice(["spiral", "elliptical", "irregular"]),
-            meta={"origin": "auto"}
-        )
-        db.session.add(g)
+        # 2) Derive galaxies (across cfg["workers"] processes), flushing every batch_size rows
+        try:
+            biome_pool = load_biome_pool()
+            galaxy_count = cfg.get("galaxies", 5)
+            writer = HierarchyWriter(universe.id, cfg.get("batch_size", 500))
+            trees = derive_galaxy_trees(universe.seed, cfg, biome_pool, cfg.get("workers", 1))
 
-        # optional job progress
-        if job:
-            job.progress = int(5 + (i / galaxy_count) * 90)
-            job.message = f"Generating galaxy {i} of {galaxy_count}..."
-            db.session.commit()
-
-    db.session.commit()
+            for i, tree in enumerate(trees, start=1):
+                writer.add(tree)
+                # the reporter coalesces these; only a few actually hit the DB
+                _report(reporter, progress_callback, 0.05 + (i / galaxy_count) * 0.9,
+                        f"Generated galaxy {i} of {galaxy_count}...")
 
-    # final update
-    if job:
-        job.progress = 100
-        job.status = "done"
-        job.message = "Universe generation complete"
+            writer.flush()
+        except Exception:
+            # the batches already written stay behind; the universe_gc job collects them
+            db.session.rollback()
+            universe.meta = {**universe.meta, "failed": True}
+            db.session.commit()
+            raise
+        # tiles rendered while galaxies were still being written are partial
+        invalidate_tiles(universe)
+        universe.meta = {**universe.meta, "generated": True}
         db.session.commit()
+        _report(reporter, progress_callback, 1.0, "Universe generation complete", force=True)
 
+    # the job's terminal status is written by the worker (run_job)
     return universe.id
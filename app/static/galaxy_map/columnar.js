@@ -0,0 +1,59 @@
+/********************************************************************
+ * GALACTIZATION – COLUMNAR PAYLOAD DECODER
+ * Reads the format written by app/services/columnar.py: numeric columns
+ * come back as TypedArrays over the response buffer (no parsing), string
+ * and category columns as {length, get(i)} accessors.
+ ********************************************************************/
+
+const COLUMNAR_MIME = "application/vnd.gallactization.columnar";
+
+const COLUMNAR_ARRAYS = {
+    u8: Uint8Array, u16: Uint16Array, u32: Uint32Array,
+    i32: Int32Array, f32: Float32Array, f64: Float64Array
+};
+
+const columnarUtf8 = new TextDecoder();
+
+function decodeColumnar(buf) {
+    const view = new DataView(buf);
+    const magic = String.fromCharCode(...new Uint8Array(buf, 0, 4));
+    if (magic !== "GXC1") throw new Error("not a columnar payload");
+
+    const headerLen = view.getUint32(4, true);
+    const header = JSON.parse(columnarUtf8.decode(new Uint8Array(buf, 8, headerLen)));
+    const n = header.n;
+    // every block starts at a multiple of its element size (TypedArrays need it)
+    const align = (o, size = 4) => o + ((size - o % size) % size);
+
+    let offset = 8 + headerLen;
+    const columns = {};
+
+    for (const col of header.columns) {
+        offset = align(offset, col.type === "f64" ? 8 : 4);
+        if (col.type === "str") {
+            const offsets = new Uint32Array(buf, offset, n + 1);
+            const bytes = new Uint8Array(buf, offset + 4 * (n + 1), offsets[n]);
+            columns[col.name] = {
+                length: n,
+                get: i => columnarUtf8.decode(bytes.subarray(offsets[i], offsets[i + 1]))
+            };
+            offset += 4 * (n + 1) + offsets[n];
+        } else if (col.type === "cat") {
+            const codes = new Uint8Array(buf, offset, n);
+            columns[col.name] = { length: n, codes, get: i => col.categories[codes[i]] };
+            offset += n;
+        } else {
+            const Arr = COLUMNAR_ARRAYS[col.type];
+            columns[col.name] = new Arr(buf, offset, n);
+            offset += Arr.BYTES_PER_ELEMENT * n;
+        }
+    }
+    return { header, n, columns };
+}
+
+// fetch() a URL asking for the columnar format, decoded
+function fetchColumnar(url) {
+    return fetch(url, { headers: { Accept: COLUMNAR_MIME } })
+        .then(r => r.arrayBuffer())
+        .then(decodeColumnar);
+}
@@ -24,25 +24,142 @@ let targetZoom = 1;
 let mouseX = 0;
 let mouseY = 0;
 
-// Galaxy data (to be loaded from backend)
-let galaxies = [];
+// Galaxy data for the current viewport (loaded from backend), kept in the
+// columnar form it arrives in: one layer per tile / response with
+// {n, ids, x, y} TypedArrays, {get(i)} accessors for name and cluster and
+// the picking grid the server ordered the rows by
+let galaxyLayers = [];
+// Zoomed out: per-cell aggregates, layers of {n, x, y, count}
+let clusterLayers = [];
 
 /********************************************************************
- * 1. FETCH REAL GALAXY DATA
+ * 1. FETCH REAL GALAXY DATA (viewport only, columnar – see columnar.js)
  ********************************************************************/
-fetch("/api/galaxies")
-    .then(r => r.json())
-    .then(data => {
-        galaxies = data.map(g => ({
-            id: g.id,
-            name: g.name,
-            x: g.x,
-            y: g.y,
-            size: Math.random() * 2 + 1,
-            brightness: Math.random(),
-            cluster: g.cluster
-        }));
+// ?universe=<id> on the map page scopes the map to one universe
+const universeId = new URLSearchParams(window.location.search).get("universe");
+
+// Stable per-galaxy look, so refetching a viewport doesn't reshuffle it
+function galaxyHash(id) {
+    return (Math.imul(id, 2654435761) >>> 0) / 4294967296;
+}
+
+// World-space rectangle on screen at the target zoom, padded so short pans
+// don't need a new request
+function viewBBox(pad = 0.25) {
+    const hw = canvas.width / 2 / targetZoom * (1 + pad);
+    const hh = canvas.height / 2 / targetZoom * (1 + pad);
+    return [camX - hw, camY - hh, camX + hw, camY + hh];
+}
+
+const GRID = 65536;          // Morton grid size in world units
+const GRID_HALF = GRID / 2;
+
+// World coordinates of a tile column: origin (grid units) + u16 offsets
+function worldCoords(offsets, origin) {
+    const out = new Int32Array(offsets.length);
+    for (let i = 0; i < offsets.length; i++) out[i] = origin + offsets[i] - GRID_HALF;
+    return out;
+}
+
+// Decoded columnar table -> layer; tiles carry dx/dy from their origin
+function toLayer({ header, n, columns: c }) {
+    const [ox, oy] = header.origin || [0, 0];
+    const x = c.x || worldCoords(c.dx, ox);
+    const y = c.y || worldCoords(c.dy, oy);
+    if (header.kind === "clusters") return { kind: "clusters", n, x, y, count: c.count };
+    return { kind: "galaxies", n, ids: c.id, x, y, name: c.name, cluster: c.cluster, grid: header.grid };
+}
+
+function setLayers(layers) {
+    galaxyLayers = layers.filter(l => l.kind === "galaxies");
+    clusterLayers = layers.filter(l => l.kind === "clusters");
+}
+
+/********************************************************************
+ * 1a. BINARY TILES (per universe, see app/services/tiles.py)
+ ********************************************************************/
+const TILE_PX = 256;         // aim for tiles about this big on screen
+const MAX_CACHED_TILES = 300;
+
+let tileInfo = null;         // {version, max_zoom}
+const tileCache = new Map(); // "z/x/y" -> layer (or pending Promise), least recently used first
+
+function visibleTiles() {
+    const z = Math.max(0, Math.min(tileInfo.max_zoom,
+        Math.round(Math.log2(targetZoom * GRID / TILE_PX))));
+    const size = GRID >> z;
+    const last = (1 << z) - 1;
+    const [x0, y0, x1, y1] = viewBBox(0.1);
+    const clamp = v => Math.max(0, Math.min(last, Math.floor((v + GRID_HALF) / size)));
+    const keys = [];
+    for (let ty = clamp(y0); ty <= clamp(y1); ty++) {
+        for (let tx = clamp(x0); tx <= clamp(x1); tx++) keys.push(`${z}/${tx}/${ty}`);
+    }
+    return keys;
+}
+
+function fetchTile(key) {
+    let entry = tileCache.get(key);
+    if (entry !== undefined) {
+        tileCache.delete(key);   // re-insert as most recently used
+    } else {
+        const pending = fetchColumnar(`/viewer/tiles/${universeId}/${key}.bin?v=${tileInfo.version}`)
+            .then(table => {
+                const layer = toLayer(table);
+                if (tileCache.get(key) === pending) tileCache.set(key, layer);
+                return layer;
+            })
+            .catch(err => {
+                // forget the failure so the tile is fetched again next time
+                if (tileCache.get(key) === pending) tileCache.delete(key);
+                throw err;
+            });
+        entry = pending;
+    }
+    tileCache.set(key, entry);
+    while (tileCache.size > MAX_CACHED_TILES) {
+        tileCache.delete(tileCache.keys().next().value);
+    }
+    return Promise.resolve(entry);
+}
+
+function loadTiles() {
+    const keys = visibleTiles();
+    const query = keys.join(",");
+    if (query === lastQuery) return;
+    lastQuery = query;
+
+    Promise.all(keys.map(fetchTile)).then(layers => {
+        if (query === lastQuery) setLayers(layers);
+    }).catch(() => {
+        if (query === lastQuery) lastQuery = "";  // retry on the next move
     });
+}
+
+let lastQuery = "";
+let fetchTimer = null;
+
+// The map always draws one universe, from its tiles (/viewer/galaxy-map
+// redirects to the player's newest universe when none is given)
+function loadViewport() {
+    if (tileInfo) loadTiles();
+}
+
+// Refetch once the camera settles
+function scheduleViewportLoad() {
+    clearTimeout(fetchTimer);
+    fetchTimer = setTimeout(loadViewport, 150);
+}
+
+if (universeId) {
+    fetch(`/viewer/tiles/${universeId}.json`)
+        .then(r => r.json())
+        .then(info => {
+            tileInfo = info;
+            loadViewport();
+        });
+}
+window.addEventListener("resize", scheduleViewportLoad);
 
 /********************************************************************
  * 2. INPUT HANDLING (PAN + ZOOM)
@@ -50,7 +167,8 @@ fetch("/api/galaxies")
 canvas.addEventListener("wheel", e => {
     e.preventDefault();
     targetZoom *= e.deltaY < 0 ? 1.1 : 0.9;
-    targetZoom = Math.max(0.1, Math.min(5, targetZoom));
+    targetZoom = Math.max(0.01, Math.min(5, targetZoom));
+    scheduleViewportLoad();
 });
 
 let dragging = false;
@@ -74,6 +192,7 @@ canvas.addEventListener("mousemove", e => {
         camY -= (e.clientY - lastY) / zoom;
         lastX = e.clientX;
         lastY = e.clientY;
+        scheduleViewportLoad();
     }
 });
 
@@ -88,28 +207,13 @@ document.addEventListener("DOMContentLoaded", () => {
 });
 
 canvas.addEventListener("click", (e) => {
-
-    if (!galaxies || galaxies.length === 0) return;
-
     const rect = canvas.getBoundingClientRect();
-    const clickX = e.clientX - rect.left;
-    const clickY = e.clientY - rect.top;
-
-    for (let g of galaxies) {
-        // compute actual screen position (same as render())
-        const sx = (g.x - camX) * zoom + canvas.width / 2;
-        const sy = (g.y - camY) * zoom + canvas.height / 2;
-
-        const dx = clickX - sx;
-        const dy = clickY - sy;
-        const dist = Math.sqrt(dx * dx + dy * dy);
-
-        if (dist < 12) {   // good selection radius
-            console.log("Galaxy clicked:", g.id);
-            window.location.href = `/viewer/galaxy/${g.id}`;
-            return;
-        }
-    }
+    const hit = pickGalaxy(e.clientX - rect.left, e.clientY - rect.top, 12);  // good selection radius
+    if (!hit) return;
+
+    const id = hit.layer.ids[hit.i];
+    console.log("Galaxy clicked:", id);
+    window.location.href = `/viewer/galaxy/${id}`;
 });
 
 /********************************************************************
@@ -123,18 +227,40 @@ function render() {
 
     ctx.clearRect(0, 0, canvas.width, canvas.height);
 
-    galaxies.forEach(g => {
-        const sx = (g.x - camX) * zoom + canvas.width / 2;
-        const sy = (g.y - camY) * zoom + canvas.height / 2;
+    const now = Date.now();
+    const w = canvas.width;
+    const h = canvas.height;
 
-        // Twinkle animation
-        const twinkle = 0.5 + Math.sin(Date.now() * 0.002 + g.brightness * 20) * 0.3;
+    for (const L of galaxyLayers) {
+        for (let i = 0; i < L.n; i++) {
+            const sx = (L.x[i] - camX) * zoom + w / 2;
+            const sy = (L.y[i] - camY) * zoom + h / 2;
+            if (sx < -10 || sy < -10 || sx > w + 10 || sy > h + 10) continue;
 
-        ctx.beginPath();
-        ctx.fillStyle = `rgba(180,220,255, ${twinkle})`;
-        ctx.arc(sx, sy, g.size * zoom, 0, Math.PI * 2);
-        ctx.fill();
-    });
+            // Twinkle animation
+            const id = L.ids[i];
+            const twinkle = 0.5 + Math.sin(now * 0.002 + galaxyHash(id + 1) * 20) * 0.3;
+
+            ctx.beginPath();
+            ctx.fillStyle = `rgba(180,220,255, ${twinkle})`;
+            ctx.arc(sx, sy, (galaxyHash(id) * 2 + 1) * zoom, 0, Math.PI * 2);
+            ctx.fill();
+        }
+    }
+
+    // Zoomed out: one glow per cell, sized by how many galaxies it holds
+    ctx.fillStyle = "rgba(180,220,255,0.6)";
+    for (const L of clusterLayers) {
+        for (let i = 0; i < L.n; i++) {
+            const sx = (L.x[i] - camX) * zoom + w / 2;
+            const sy = (L.y[i] - camY) * zoom + h / 2;
+            if (sx < -20 || sy < -20 || sx > w + 20 || sy > h + 20) continue;
+
+            ctx.beginPath();
+            ctx.arc(sx, sy, 2 + Math.log2(L.count[i] + 1) * 1.5, 0, Math.PI * 2);
+            ctx.fill();
+        }
+    }
 
     drawHoverTooltip();
 }
@@ -143,41 +269,52 @@ render();
 /********************************************************************
  * 4. HOVER TOOLTIP
  ********************************************************************/
- function onClickGalaxy(event) {
-    const rect = canvas.getBoundingClientRect();
-    const mouseX = event.clientX - rect.left;
-    const mouseY = event.clientY - rect.top;
+// Nearest loaded galaxy within `radius` screen pixels of (px, py): {layer, i}.
+// Each layer's rows are bucketed by the server's grid (x0, y0, cell,
+// cols, rows, starts – see spatial.grid_index), so only the few cells under
+// the pick circle are scanned instead of every loaded galaxy.
+function pickGalaxy(px, py, radius) {
+    const wx = (px - canvas.width / 2) / zoom + camX;
+    const wy = (py - canvas.height / 2) / zoom + camY;
+    const wr = radius / zoom;
 
-    for (let g of galaxies) {
-        const dx = mouseX - g.screenX;
-        const dy = mouseY - g.screenY;
-        const dist = Math.sqrt(dx*dx + dy*dy);
+    let nearest = null;
+    let nearestDist = wr * wr;
+
+    const test = (L, i) => {
+        const dx = L.x[i] - wx;
+        const dy = L.y[i] - wy;
+        const d = dx * dx + dy * dy;
+        if (d < nearestDist) {
+            nearest = { layer: L, i };
+            nearestDist = d;
+        }
+    };
 
-        if (dist < 6) {    // click radius threshold
-            window.location.href = `/viewer/galaxy/${g.id}`;
-            return;
+    for (const L of galaxyLayers) {
+        const g = L.grid;
+        if (!g) {
+            for (let i = 0; i < L.n; i++) test(L, i);
+            continue;
+        }
+        const col = v => Math.max(0, Math.min(g.cols - 1, Math.floor((v - g.x0) / g.cell)));
+        const row = v => Math.max(0, Math.min(g.rows - 1, Math.floor((v - g.y0) / g.cell)));
+        if (wx + wr < g.x0 || wy + wr < g.y0 ||
+            wx - wr > g.x0 + g.cols * g.cell || wy - wr > g.y0 + g.rows * g.cell) continue;
+
+        for (let cy = row(wy - wr); cy <= row(wy + wr); cy++) {
+            for (let cx = col(wx - wr); cx <= col(wx + wr); cx++) {
+                const c = cy * g.cols + cx;
+                for (let i = g.starts[c]; i < g.starts[c + 1]; i++) test(L, i);
+            }
         }
     }
+    return nearest;
 }
-function drawHoverTooltip() {
-    let nearest = null;
-    let nearestDist = 20;
-
-    galaxies.forEach(g => {
-        const sx = (g.x - camX) * zoom + canvas.width / 2;
-        const sy = (g.y - camY) * zoom + canvas.height / 2;
 
-        const dx = mouseX - sx;
-        const dy = mouseY - sy;
-        const dist = Math.sqrt(dx * dx + dy * dy);
-
-        if (dist < nearestDist) {
-            nearest = g;
-            nearestDist = dist;
-        }
-    });
-
-    if (!nearest) return;
+function drawHoverTooltip() {
+    const hit = pickGalaxy(mouseX, mouseY, 20);
+    if (!hit) return;
 
     // Tooltip UI
     ctx.fillStyle = "rgba(0, 0, 0, 0.7)";
@@ -188,11 +325,8 @@ function drawHoverTooltip() {
 
     ctx.fillStyle = "#ffffff";
     ctx.font = "14px Arial";
-    ctx.fillText(nearest.name, mouseX + 18, mouseY + 30);
-    ctx.fillText("Cluster: " + nearest.cluster, mouseX + 18, mouseY + 50);
+    ctx.fillText(hit.layer.name.get(hit.i), mouseX + 18, mouseY + 30);
+    ctx.fillText("Cluster: " + hit.layer.cluster.get(hit.i), mouseX + 18, mouseY + 50);
 
     canvas.style.cursor = "pointer";
-
-    // Click → open galaxy viewer
-
 }
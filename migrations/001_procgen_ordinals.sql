@@ -0,0 +1,13 @@
+-- Procgen path keys for galaxies and star systems (seed-addressable generation)
+ALTER TABLE galaxies ADD COLUMN IF NOT EXISTS ordinal INTEGER;
+ALTER TABLE star_systems ADD COLUMN IF NOT EXISTS ordinal INTEGER;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_galaxies_universe_ordinal') THEN
+        ALTER TABLE galaxies ADD CONSTRAINT uq_galaxies_universe_ordinal UNIQUE (universe_id, ordinal);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_star_systems_galaxy_ordinal') THEN
+        ALTER TABLE star_systems ADD CONSTRAINT uq_star_systems_galaxy_ordinal UNIQUE (galaxy_id, ordinal);
+    END IF;
+END $$;
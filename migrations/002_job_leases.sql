@@ -0,0 +1,5 @@
+-- Worker leases / heartbeats for the concurrent job worker
+ALTER TABLE job_queue ADD COLUMN IF NOT EXISTS worker_id VARCHAR(120);
+ALTER TABLE job_queue ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP;
+ALTER TABLE job_queue ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMP;
+ALTER TABLE job_queue ADD COLUMN IF NOT EXISTS attempts INTEGER DEFAULT 0;
@@ -0,0 +1,27 @@
+-- Persisted galaxy map coordinates with a Morton (Z-order) key for viewport queries
+ALTER TABLE galaxies ADD COLUMN IF NOT EXISTS x INTEGER;
+ALTER TABLE galaxies ADD COLUMN IF NOT EXISTS y INTEGER;
+ALTER TABLE galaxies ADD COLUMN IF NOT EXISTS morton BIGINT;
+
+-- Same key as app.services.spatial.morton: 16-bit grid, x in the even bits
+CREATE OR REPLACE FUNCTION morton2d(x INTEGER, y INTEGER) RETURNS BIGINT AS $$
+DECLARE
+    gx BIGINT := LEAST(65535, GREATEST(0, x + 32768));
+    gy BIGINT := LEAST(65535, GREATEST(0, y + 32768));
+    m BIGINT := 0;
+BEGIN
+    FOR i IN 0..15 LOOP
+        m := m | (((gx >> i) & 1) << (2 * i)) | (((gy >> i) & 1) << (2 * i + 1));
+    END LOOP;
+    RETURN m;
+END $$ LANGUAGE plpgsql IMMUTABLE;
+
+-- Existing galaxies keep the position the map used to derive from their id
+UPDATE galaxies
+SET x = ((id::BIGINT * 7919) % 50000) - 25000,
+    y = ((id::BIGINT * 15401) % 50000) - 25000
+WHERE x IS NULL OR y IS NULL;
+
+UPDATE galaxies SET morton = morton2d(x, y) WHERE morton IS NULL;
+
+CREATE INDEX IF NOT EXISTS ix_galaxies_universe_morton ON galaxies (universe_id, morton) INCLUDE (x, y);
@@ -0,0 +1,2 @@
+-- Keyset pagination of /api/biomes (ORDER BY name, id)
+CREATE INDEX IF NOT EXISTS ix_biomes_name_id ON biomes (name, id);
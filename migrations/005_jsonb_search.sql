@@ -0,0 +1,23 @@
+-- Indexed biome / lifeform search (/api/biomes/search, /api/lifeforms/search)
+
+-- hot numeric climate fields extracted from the JSONB
+ALTER TABLE biomes ADD COLUMN IF NOT EXISTS humidity DOUBLE PRECISION
+    GENERATED ALWAYS AS ((climate->>'humidity_level')::double precision) STORED;
+ALTER TABLE biomes ADD COLUMN IF NOT EXISTS temperature_min DOUBLE PRECISION
+    GENERATED ALWAYS AS ((climate->'temperature_range'->>0)::double precision) STORED;
+ALTER TABLE biomes ADD COLUMN IF NOT EXISTS temperature_max DOUBLE PRECISION
+    GENERATED ALWAYS AS ((climate->'temperature_range'->>1)::double precision) STORED;
+
+CREATE INDEX IF NOT EXISTS ix_biomes_humidity ON biomes (humidity);
+CREATE INDEX IF NOT EXISTS ix_biomes_temperature_min ON biomes (temperature_min);
+CREATE INDEX IF NOT EXISTS ix_biomes_temperature_max ON biomes (temperature_max);
+
+-- containment (@>) filters on nested attributes
+CREATE INDEX IF NOT EXISTS ix_biomes_soil_gin ON biomes USING gin (soil jsonb_path_ops);
+CREATE INDEX IF NOT EXISTS ix_biomes_fauna_gin ON biomes USING gin (fauna jsonb_path_ops);
+CREATE INDEX IF NOT EXISTS ix_biomes_special_features_gin ON biomes USING gin (special_features jsonb_path_ops);
+
+CREATE INDEX IF NOT EXISTS ix_lifeforms_name_id ON lifeforms (name, id);
+CREATE INDEX IF NOT EXISTS ix_lifeforms_trophic_level ON lifeforms (trophic_level);
+CREATE INDEX IF NOT EXISTS ix_lifeforms_ecology_gin ON lifeforms USING gin (ecology jsonb_path_ops);
+CREATE INDEX IF NOT EXISTS ix_lifeforms_special_abilities_gin ON lifeforms USING gin (special_abilities jsonb_path_ops);
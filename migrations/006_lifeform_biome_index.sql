@@ -0,0 +1,2 @@
+-- Keyset pagination of /api/biomes/<id>/lifeforms (WHERE biome_id = ? ORDER BY name, id)
+CREATE INDEX IF NOT EXISTS ix_lifeforms_biome_name_id ON lifeforms (biome_id, name, id);
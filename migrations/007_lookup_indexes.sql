@@ -0,0 +1,9 @@
+-- Indexes for the per-user / per-universe / per-parent lookups.
+-- galaxies (universe_id, ordinal) and star_systems (galaxy_id, ordinal)
+-- are already covered by their unique constraints.
+CREATE INDEX IF NOT EXISTS ix_universes_user_created ON universes (user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS ix_save_games_universe_user_created ON save_games (universe_id, user_id, created_at);
+CREATE INDEX IF NOT EXISTS ix_save_games_user_id ON save_games (user_id);
+CREATE INDEX IF NOT EXISTS ix_planets_system_position ON planets (system_id, position);
+CREATE INDEX IF NOT EXISTS ix_planet_biomes_planet_id ON planet_biomes (planet_id);
+CREATE INDEX IF NOT EXISTS ix_planet_biomes_biome_id ON planet_biomes (biome_id);
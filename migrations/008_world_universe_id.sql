@@ -0,0 +1,19 @@
+-- universe_id on every generated-world table: per-universe scans and deletes
+-- without joining up the hierarchy, and the partition key for
+-- scripts/partition_world_tables.py
+ALTER TABLE star_systems ADD COLUMN IF NOT EXISTS universe_id INTEGER REFERENCES universes (id);
+ALTER TABLE planets ADD COLUMN IF NOT EXISTS universe_id INTEGER REFERENCES universes (id);
+ALTER TABLE planet_biomes ADD COLUMN IF NOT EXISTS universe_id INTEGER REFERENCES universes (id);
+
+UPDATE star_systems s SET universe_id = g.universe_id
+FROM galaxies g WHERE g.id = s.galaxy_id AND s.universe_id IS NULL;
+
+UPDATE planets p SET universe_id = s.universe_id
+FROM star_systems s WHERE s.id = p.system_id AND p.universe_id IS NULL;
+
+UPDATE planet_biomes pb SET universe_id = p.universe_id
+FROM planets p WHERE p.id = pb.planet_id AND pb.universe_id IS NULL;
+
+CREATE INDEX IF NOT EXISTS ix_star_systems_universe_id ON star_systems (universe_id, id);
+CREATE INDEX IF NOT EXISTS ix_planets_universe_id ON planets (universe_id, id);
+CREATE INDEX IF NOT EXISTS ix_planet_biomes_universe_id ON planet_biomes (universe_id, id);
@@ -0,0 +1,4 @@
+-- Warm pool of pre-generated universes (app.services.universe_pool): a
+-- pooled universe has no owner until a player claims it
+ALTER TABLE universes ALTER COLUMN user_id DROP NOT NULL;
+CREATE INDEX IF NOT EXISTS ix_universes_pool ON universes (id) WHERE user_id IS NULL;
@@ -0,0 +1,9 @@
+-- Eager universes written before generate_universe set meta "generated" are
+-- complete: mark them so their tiles are cached again (unfinished ones are
+-- rendered fresh on every request). Run with the workers stopped.
+UPDATE universes
+SET meta = (coalesce(meta::jsonb, '{}'::jsonb) || '{"generated": true}'::jsonb)::json
+WHERE coalesce(meta::jsonb ->> 'lazy', 'false') <> 'true'
+  AND meta::jsonb ->> 'generated' IS NULL
+  AND meta::jsonb ->> 'failed' IS NULL
+  AND meta::jsonb ->> 'deleting' IS NULL;
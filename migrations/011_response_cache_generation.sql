@@ -0,0 +1,3 @@
+-- Advanced on every write that invalidates cached API bodies, so every web
+-- process drops its in-process copies (app.services.response_cache)
+CREATE SEQUENCE IF NOT EXISTS response_cache_generation;
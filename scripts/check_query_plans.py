@@ -0,0 +1,100 @@
+"""Query-plan regression check for the hot lookups.
+Usage:
+    python scripts/check_query_plans.py
+
+EXPLAINs each query below with sequential scans and explicit sorts
+disabled. The planner then only falls back to a Seq Scan (or a Sort) when
+no index can serve the query (or its ORDER BY), so the check does not
+depend on how much data the database holds. Exits 1 listing every query
+whose plan regressed, e.g. after an index was dropped or a query changed
+shape. tests/test_query_plans.py runs the same checks under pytest.
+"""
+import os
+import sys
+
+from sqlalchemy import text, tuple_
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app import create_app
+from app.extensions import db
+from app.services.pagination import explain_plan
+from app.models import (
+    Galaxy, Lifeform, Planet, PlanetBiome, SaveGame, StarSystem, Universe,
+)
+
+def checks():
+    """(name, select, whether an index must also provide the ORDER BY)."""
+    return [
+        ("dashboard universes",
+         db.select(Universe.id).where(Universe.user_id == 1).order_by(Universe.created_at.desc()), True),
+        ("saves of a player in a universe",
+         db.select(SaveGame.id).where(SaveGame.universe_id == 1, SaveGame.user_id == 1)
+         .order_by(SaveGame.created_at.desc()), True),
+        ("universe galaxies page",
+         db.select(Galaxy.id).where(Galaxy.universe_id == 1, Galaxy.ordinal > 100)
+         .order_by(Galaxy.ordinal).limit(100), True),
+        ("viewport morton range",
+         db.select(Galaxy.x, Galaxy.y).where(Galaxy.universe_id == 1, Galaxy.morton.between(0, 1 << 20)), False),
+        ("galaxy systems",
+         db.select(StarSystem.id).where(StarSystem.universe_id == 1, StarSystem.galaxy_id == 1)
+         .order_by(StarSystem.ordinal), True),
+        ("planets of systems",
+         db.select(Planet.id).where(Planet.universe_id == 1, Planet.system_id.in_([1, 2, 3])), False),
+        ("biome links of planets",
+         db.select(PlanetBiome.id).where(PlanetBiome.planet_id.in_([1, 2, 3])), False),
+        ("planets carrying a biome",
+         db.select(PlanetBiome.planet_id).where(PlanetBiome.biome_id == "b0"), False),
+        ("universe GC batch",
+         db.select(Planet.id).where(Planet.universe_id == 1, Planet.id > 100).order_by(Planet.id).limit(5000), True),
+        ("warm pool universes",
+         db.select(Universe.id).where(Universe.user_id.is_(None)).order_by(Universe.id).limit(1), True),
+        ("biome lifeforms page",
+         db.select(Lifeform.id).where(Lifeform.biome_id == "b0", tuple_(Lifeform.name, Lifeform.id) > ("a", "a"))
+         .order_by(Lifeform.name, Lifeform.id).limit(20), True),
+    ]
+
+
+def _nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _nodes(child)
+
+
+def plan_node_types(query):
+    """Node types of `query`'s plan with seq scans and sorts disabled.
+
+    Leaves the settings on the session's transaction; the caller rolls back.
+    """
+    db.session.execute(text("SET LOCAL enable_seqscan = off"))
+    db.session.execute(text("SET LOCAL enable_sort = off"))
+    return [n["Node Type"] for n in _nodes(explain_plan(query))]
+
+
+def regressions(node_types, ordered):
+    """The plan nodes that mean no index served the query (or its ORDER BY)."""
+    return [t for t in node_types if t == "Seq Scan" or (ordered and t in ("Sort", "Incremental Sort"))]
+
+
+def main():
+    app = create_app()
+    failures = []
+    with app.app_context():
+        try:
+            for name, query, ordered in checks():
+                node_types = plan_node_types(query)
+                bad = regressions(node_types, ordered)
+                status = "FAIL" if bad else "ok"
+                print(f"{status:4}  {name}: {' > '.join(node_types)}")
+                if bad:
+                    failures.append(name)
+        finally:
+            db.session.rollback()
+
+    if failures:
+        print(f"{len(failures)} query plan(s) regressed: {', '.join(failures)}")
+        sys.exit(1)
+    print("All query plans use an index")
+
+
+if __name__ == '__main__':
+    main()
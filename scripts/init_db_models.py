@@ -5,6 +5,8 @@ Usage:
         python scripts/init_db_models.py
 """
 import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from app import create_app
 from app.extensions import db
 from app.models import Biome, Lifeform, PlanetBiome
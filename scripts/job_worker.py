@@ -1,22 +1,13 @@
-import time
-from app import create_app
-from app.extensions import db
-from app.models import JobQueue
-from app.services.world_generator_async import generate_universe_async
+"""Legacy entry point, kept for existing deployments: runs app.services.worker.
 
-app = create_app()
-
-def run_job_queue_worker():
-    with app.app_context():
-        while True:
-            job = JobQueue.query.filter_by(status="queued").order_by(JobQueue.created_at.asc()).first()
-            if job:
-                print(f"[WORKER] Running job {job.id} for user {job.user_id}")
-                try:
-                    generate_universe_async(job.id, job.user_id)
-                except Exception as ex:
-                    print(f"[WORKER] Job failed: {ex}")
-            time.sleep(2)   # poll interval
+The old loop here claimed universe_generation jobs but never renewed their
+lease, so a long generation was re-queued while it was still running.
+run_worker heartbeats its jobs and handles every job type.
+"""
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app.services.worker import run_worker
 
 if __name__ == "__main__":
-    run_job_queue_worker()
+    run_worker()
@@ -0,0 +1,42 @@
+"""Apply the SQL files in migrations/ that have not run yet.
+Usage:
+    python scripts/migrate.py
+
+Fresh databases get the current schema from db.create_all() (init_db.py);
+these files bring existing databases up to date. Each file is applied once
+and recorded in the schema_migrations table.
+"""
+import os
+import sys
+from sqlalchemy import text
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app import create_app
+from app.extensions import db
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "migrations")
+
+def main():
+    app = create_app()
+    with app.app_context():
+        db.session.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            " name VARCHAR(200) PRIMARY KEY,"
+            " applied_at TIMESTAMP NOT NULL DEFAULT now())"
+        ))
+        applied = set(db.session.execute(text("SELECT name FROM schema_migrations")).scalars())
+
+        for name in sorted(os.listdir(MIGRATIONS_DIR)):
+            if not name.endswith(".sql") or name in applied:
+                continue
+            print(f"Applying {name}...")
+            with open(os.path.join(MIGRATIONS_DIR, name), "r", encoding="utf-8") as f:
+                # plain DBAPI execute without parameters, so '%' in the SQL is literal
+                cursor = db.session.connection().connection.cursor()
+                cursor.execute(f.read())
+                cursor.close()
+            db.session.execute(text("INSERT INTO schema_migrations (name) VALUES (:n)"), {"n": name})
+            db.session.commit()
+        print("Migrations up to date")
+
+if __name__ == '__main__':
+    main()
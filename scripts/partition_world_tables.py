@@ -0,0 +1,136 @@
+"""Convert the generated-world tables to per-universe LIST partitions (opt-in).
+Usage:
+    python scripts/migrate.py                     # needs 008_world_universe_id.sql
+    python scripts/partition_world_tables.py [--dry-run]
+
+Rebuilds galaxies, star_systems, planets and planet_biomes as tables
+partitioned by universe_id with one partition per existing universe plus a
+default partition, copies every row over and drops the old tables, all in
+one transaction. It takes an exclusive lock on the four tables for the whole
+copy: stop the web processes and workers first, and restart them afterwards
+(app.services.partitions caches whether partitioning is on).
+
+Partitioned tables need the partition key in every primary key and unique
+constraint, so primary keys become (id, universe_id), the system ordinal
+constraint becomes (universe_id, galaxy_id, ordinal) and the parent foreign
+keys carry universe_id. Ids still come from the same sequences.
+"""
+import os
+import sys
+
+from sqlalchemy import text
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from app import create_app
+from app.extensions import db
+from app.services.partitions import WORLD_TABLES, partition_name, partitioning_enabled
+
+# constraints and indexes of the partitioned tables, in WORLD_TABLES order
+LAYOUT = {
+    "galaxies": [
+        "ALTER TABLE galaxies ADD CONSTRAINT galaxies_pkey PRIMARY KEY (id, universe_id)",
+        "ALTER TABLE galaxies ADD CONSTRAINT uq_galaxies_universe_ordinal UNIQUE (universe_id, ordinal)",
+        "ALTER TABLE galaxies ADD CONSTRAINT galaxies_universe_id_fkey "
+        "FOREIGN KEY (universe_id) REFERENCES universes (id)",
+        "CREATE INDEX ix_galaxies_universe_morton ON galaxies (universe_id, morton) INCLUDE (x, y)",
+    ],
+    "star_systems": [
+        "ALTER TABLE star_systems ADD CONSTRAINT star_systems_pkey PRIMARY KEY (id, universe_id)",
+        "ALTER TABLE star_systems ADD CONSTRAINT uq_star_systems_galaxy_ordinal "
+        "UNIQUE (universe_id, galaxy_id, ordinal)",
+        "ALTER TABLE star_systems ADD CONSTRAINT star_systems_galaxy_id_fkey "
+        "FOREIGN KEY (galaxy_id, universe_id) REFERENCES galaxies (id, universe_id)",
+        "ALTER TABLE star_systems ADD CONSTRAINT star_systems_universe_id_fkey "
+        "FOREIGN KEY (universe_id) REFERENCES universes (id)",
+    ],
+    "planets": [
+        "ALTER TABLE planets ADD CONSTRAINT planets_pkey PRIMARY KEY (id, universe_id)",
+        "ALTER TABLE planets ADD CONSTRAINT planets_system_id_fkey "
+        "FOREIGN KEY (system_id, universe_id) REFERENCES star_systems (id, universe_id)",
+        "ALTER TABLE planets ADD CONSTRAINT planets_universe_id_fkey "
+        "FOREIGN KEY (universe_id) REFERENCES universes (id)",
+        "CREATE INDEX ix_planets_system_position ON planets (system_id, position)",
+    ],
+    "planet_biomes": [
+        "ALTER TABLE planet_biomes ADD CONSTRAINT planet_biomes_pkey PRIMARY KEY (id, universe_id)",
+        "ALTER TABLE planet_biomes ADD CONSTRAINT planet_biomes_planet_id_fkey "
+        "FOREIGN KEY (planet_id, universe_id) REFERENCES planets (id, universe_id)",
+        "ALTER TABLE planet_biomes ADD CONSTRAINT planet_biomes_biome_id_fkey "
+        "FOREIGN KEY (biome_id) REFERENCES biomes (id)",
+        "ALTER TABLE planet_biomes ADD CONSTRAINT planet_biomes_universe_id_fkey "
+        "FOREIGN KEY (universe_id) REFERENCES universes (id)",
+        "CREATE INDEX ix_planet_biomes_planet_id ON planet_biomes (planet_id)",
+        "CREATE INDEX ix_planet_biomes_biome_id ON planet_biomes (biome_id)",
+    ],
+}
+
+
+def statements(conn):
+    """The whole conversion as a list of SQL statements."""
+    universe_ids = conn.execute(text("SELECT id FROM universes ORDER BY id")).scalars().all()
+    sql = [f"LOCK TABLE {', '.join(WORLD_TABLES)} IN ACCESS EXCLUSIVE MODE"]
+
+    # move the old tables, and the names of their constraints and indexes, out of the way
+    for table in WORLD_TABLES:
+        old = f"{table}_old"
+        sql.append(f"ALTER TABLE {table} RENAME TO {old}")
+        constraints = conn.execute(text(
+            "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:t)"
+        ), {"t": table}).scalars().all()
+        sql += [f"ALTER TABLE {old} RENAME CONSTRAINT {c} TO {c}_old" for c in constraints]
+        indexes = conn.execute(text(
+            "SELECT indexname FROM pg_indexes WHERE tablename = :t AND indexname <> ALL(:skip)"
+        ), {"t": table, "skip": constraints}).scalars().all()
+        sql += [f"ALTER INDEX {i} RENAME TO {i}_old" for i in indexes]
+
+    for table in WORLD_TABLES:
+        old = f"{table}_old"
+        sequence = conn.execute(text("SELECT pg_get_serial_sequence(:t, 'id')"), {"t": table}).scalar()
+        sql += [
+            f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY LIST (universe_id)",
+            f"ALTER TABLE {table} ALTER COLUMN universe_id SET NOT NULL",
+            *LAYOUT[table],
+            # the sequence is owned by the old id column; dropping that table would drop it
+            f"ALTER SEQUENCE {sequence} OWNED BY {table}.id",
+            f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT",
+            *(f"CREATE TABLE {partition_name(table, uid)} PARTITION OF {table} FOR VALUES IN ({int(uid)})"
+              for uid in universe_ids),
+            f"INSERT INTO {table} SELECT * FROM {old}",
+        ]
+
+    sql.append("DROP TABLE " + ", ".join(f"{t}_old" for t in reversed(WORLD_TABLES)))
+    sql += [f"ANALYZE {table}" for table in WORLD_TABLES]
+    return sql
+
+
+def main():
+    dry_run = "--dry-run" in sys.argv
+    app = create_app()
+    with app.app_context():
+        if db.engine.dialect.name != "postgresql":
+            sys.exit("Partitioning needs PostgreSQL")
+        if partitioning_enabled():
+            print("World tables are already partitioned")
+            return
+
+        conn = db.session.connection()
+        for table in WORLD_TABLES:
+            missing = conn.execute(text(f"SELECT count(*) FROM {table} WHERE universe_id IS NULL")).scalar()
+            if missing:
+                sys.exit(f"{table} has {missing} rows without universe_id (orphans?); "
+                         "fix or delete them before partitioning")
+
+        sql = statements(conn)
+        for statement in sql:
+            print(statement + ";")
+            if not dry_run:
+                conn.exec_driver_sql(statement)
+        if dry_run:
+            db.session.rollback()
+            return
+        db.session.commit()
+        print(f"Partitioned {', '.join(WORLD_TABLES)}")
+
+
+if __name__ == '__main__':
+    main()
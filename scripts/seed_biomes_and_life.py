@@ -1,20 +1,23 @@
 # run with: python -m scripts.seed_biomes_and_life
+# (same as: flask --app run seed biomes --count 50 && flask --app run seed lifeforms)
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import click
 from app import create_app
-from app.extensions import db
-from app.services.biome_generator import generate_and_persist_biome
-from app.services.lifeform_generator import generate_and_persist_lifeform
+from app.cli import seed_cli
 
 app = create_app()
 app.app_context().push()
 
-# Example: generate 50 biomes and 200 lifeforms
-print("Generating biomes...")
-for i in range(50):
-    generate_and_persist_biome(seed=None, commit=True)
-print("Generating lifeforms (linked to random biome types)...")
-for i in range(200):
-    generate_and_persist_lifeform(biome_type="generic", seed=None, commit=True)
+# the seed commands themselves: resumable from their checkpoints under
+# instance/, and they clear the response cache afterwards
+try:
+    print("Generating biomes...")
+    seed_cli.main(["biomes", "--count", "50"], standalone_mode=False)
+    print("Generating lifeforms for every biome...")
+    seed_cli.main(["lifeforms"], standalone_mode=False)
+except click.ClickException as e:
+    e.show()
+    sys.exit(e.exit_code)
 print("Done.")
@@ -0,0 +1,26 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import create_app
+from app.extensions import db
+
+
+@pytest.fixture(scope="session")
+def app():
+    """The app against the configured PostgreSQL database (skipped if it is down)."""
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        try:
+            db.session.execute(text("SELECT 1"))
+        except OperationalError:
+            pytest.skip("PostgreSQL is not reachable")
+        finally:
+            db.session.rollback()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
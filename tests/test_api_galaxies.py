@@ -0,0 +1,32 @@
+import pytest
+
+from app.extensions import db
+from app.models import Universe
+
+
+@pytest.fixture
+def universe_id(app):
+    with app.app_context():
+        universe_id = db.session.execute(db.select(Universe.id).order_by(Universe.id).limit(1)).scalar()
+    if universe_id is None:
+        pytest.skip("no universe generated")
+    return universe_id
+
+
+@pytest.mark.parametrize("query", [
+    "bbox=nan,0,1,1",
+    "bbox=0,0,inf,1",
+    "bbox=0,0,1,-inf",
+    "bbox=0,0,1,1&zoom=nan",
+])
+def test_non_finite_viewport_is_rejected(client, universe_id, query):
+    assert client.get(f"/api/galaxies?universe={universe_id}&{query}").status_code == 400
+
+
+@pytest.mark.parametrize("query", ["x=nan&y=0", "x=0&y=inf", "x=0&y=0&r=nan"])
+def test_non_finite_nearest_point_is_rejected(client, universe_id, query):
+    assert client.get(f"/api/galaxies/nearest?universe={universe_id}&{query}").status_code == 400
+
+
+def test_nearest_radius_is_clamped(client, universe_id):
+    assert client.get(f"/api/galaxies/nearest?universe={universe_id}&x=0&y=0&r=inf").status_code == 200
@@ -0,0 +1,43 @@
+import pytest
+
+from app.services.pagination import encode_cursor
+
+
+@pytest.mark.parametrize("query", [
+    "mineral=iron",
+    "feeding=herbivore",
+    "feature=caves&feature=rivers",
+])
+def test_estimated_count_with_jsonb_filter(client, query):
+    response = client.get(f"/api/biomes/?count=estimated&{query}")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["total_is_estimate"] is True
+    assert isinstance(data["total"], int)
+
+
+@pytest.mark.parametrize("per_page", ["0", "-5"])
+def test_per_page_is_clamped(client, per_page):
+    response = client.get(f"/api/biomes/?per_page={per_page}")
+    assert response.status_code == 200
+    assert response.get_json()["per_page"] == 1
+
+
+def test_per_page_must_be_an_integer(client):
+    assert client.get("/api/biomes/?per_page=abc").status_code == 400
+
+
+@pytest.mark.parametrize("cursor", [
+    encode_cursor(1, "x"),        # int where the name belongs
+    encode_cursor("x", None),     # null id
+    encode_cursor("x", True),     # bool is not a string
+    "not-a-cursor",
+])
+def test_forged_cursor_is_rejected(client, cursor):
+    assert client.get(f"/api/biomes/?cursor={cursor}").status_code == 400
+    assert client.get(f"/api/biomes/some-biome/lifeforms?cursor={cursor}").status_code == 400
+
+
+@pytest.mark.parametrize("cursor", [encode_cursor("abc"), encode_cursor(1.5), encode_cursor(True)])
+def test_forged_galaxy_cursor_is_rejected(client, cursor):
+    assert client.get(f"/api/universes/1/galaxies?cursor={cursor}").status_code == 400
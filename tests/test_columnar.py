@@ -0,0 +1,49 @@
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from app.services import columnar
+
+COLUMNAR_JS = os.path.join(os.path.dirname(__file__), "..", "app", "static", "galaxy_map", "columnar.js")
+
+# the f64 column follows 6 bytes of u16s, and `extra` shifts the header
+# length, so each alignment case comes up
+COLUMNS = [
+    ("id", "u16", [1, 2, 3]),
+    ("mass", "f64", [0.5, -1.25, 1e300]),
+    ("name", "str", ["Andromeda", "", "Ωmega"]),
+    ("type", "cat", ["spiral", "elliptical", "spiral"]),
+    ("glow", "f64", [1.0, 2.0, 3.0]),
+]
+
+
+@pytest.mark.parametrize("extra", ["", "x", "xy", "xyz", "xyzw"])
+def test_round_trip_aligns_f64(extra):
+    payload = columnar.encode(COLUMNS, pad=extra)
+    header, columns = columnar.decode(payload)
+    assert header["pad"] == extra
+    assert columns == {name: values for name, _, values in COLUMNS}
+    assert len(payload) % 4 == 0
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+@pytest.mark.parametrize("extra", ["", "x", "xy", "xyz"])
+def test_browser_decoder_reads_f64_after_u16(extra):
+    script = """
+        const fs = require("fs");
+        eval(fs.readFileSync(process.argv[1], "utf8"));
+        const payload = fs.readFileSync(0);
+        const buf = payload.buffer.slice(payload.byteOffset, payload.byteOffset + payload.length);
+        const { columns } = decodeColumnar(buf);
+        const out = {};
+        for (const [name, col] of Object.entries(columns)) {
+            out[name] = col.get ? Array.from({ length: col.length }, (_, i) => col.get(i)) : Array.from(col);
+        }
+        console.log(JSON.stringify(out));
+    """
+    result = subprocess.run(["node", "-e", script, COLUMNAR_JS],
+                            input=columnar.encode(COLUMNS, pad=extra), capture_output=True, check=True)
+    assert json.loads(result.stdout) == {name: values for name, _, values in COLUMNS}
@@ -0,0 +1,55 @@
+import pytest
+
+from app.extensions import db
+from app.models import Biome, Galaxy, StarSystem
+from app.services.loaders import systems_with_planets
+from app.services.query_budget import QueryBudgetExceeded
+from app.services.response_cache import cache as response_cache
+from app.services.system_generator import generate_star_systems_for_galaxy
+
+
+@pytest.fixture
+def fresh_galaxy_id(app, monkeypatch):
+    """A galaxy whose systems are not written yet (its first visit writes them)."""
+    monkeypatch.setitem(app.config, "SYSTEM_PREFETCH_NEIGHBOURS", 0)
+    with app.app_context():
+        galaxy_id = db.session.execute(
+            db.select(Galaxy.id)
+            .where(~db.select(StarSystem.id).where(StarSystem.galaxy_id == Galaxy.id).exists())
+            .order_by(Galaxy.id).limit(1)
+        ).scalar()
+    if galaxy_id is None:
+        pytest.skip("no unopened galaxy")
+    return galaxy_id
+
+
+def test_galaxy_detail_within_budget(client, fresh_galaxy_id):
+    # first visit (writes the systems), then a revisit; over budget raises
+    assert client.get(f"/viewer/galaxy/{fresh_galaxy_id}").status_code == 200
+    response = client.get(f"/viewer/galaxy/{fresh_galaxy_id}")
+    assert response.status_code == 200
+    assert int(response.headers["X-Query-Count"]) <= 4
+
+
+def test_biome_detail_within_budget(app, client):
+    with app.app_context():
+        biome_id = db.session.execute(db.select(Biome.id).order_by(Biome.id).limit(1)).scalar()
+        response_cache.clear()  # make the view build the body
+    if biome_id is None:
+        pytest.skip("no biomes seeded")
+    assert client.get(f"/api/biomes/{biome_id}").status_code == 200
+
+
+def test_over_budget_raises(app, client, fresh_galaxy_id, monkeypatch):
+    monkeypatch.setattr(app.view_functions["viewer.galaxy_detail"], "query_budget", 1)
+    with pytest.raises(QueryBudgetExceeded):
+        client.get(f"/viewer/galaxy/{fresh_galaxy_id}")
+
+
+def test_planets_in_orbit_order(app, fresh_galaxy_id):
+    with app.app_context():
+        galaxy = db.session.get(Galaxy, fresh_galaxy_id)
+        systems = generate_star_systems_for_galaxy(galaxy, options=systems_with_planets(galaxy.universe_id))
+        for system in systems:
+            positions = [p.position for p in system.planets]
+            assert positions == sorted(positions)
@@ -0,0 +1,16 @@
+import pytest
+
+from app.extensions import db
+from scripts.check_query_plans import checks, plan_node_types, regressions
+
+CHECKS = checks()
+
+
+@pytest.mark.parametrize("name, query, ordered", CHECKS, ids=[c[0] for c in CHECKS])
+def test_query_uses_an_index(app, name, query, ordered):
+    with app.app_context():
+        try:
+            node_types = plan_node_types(query)
+        finally:
+            db.session.rollback()
+    assert not regressions(node_types, ordered), f"{name}: {' > '.join(node_types)}"
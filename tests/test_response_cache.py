@@ -0,0 +1,35 @@
+import pytest
+
+from app.extensions import db
+from app.models import Biome
+
+
+def _rename(app, biome_id, name):
+    with app.app_context():
+        db.session.get(Biome, biome_id).name = name
+        db.session.commit()
+
+
+@pytest.fixture
+def biome(app):
+    # no app context may stay pushed: requests would share its session
+    with app.app_context():
+        row = db.session.execute(db.select(Biome.id, Biome.name).order_by(Biome.id).limit(1)).first()
+    if row is None:
+        pytest.skip("no biomes seeded")
+    yield row
+    _rename(app, row.id, row.name)
+
+
+def test_write_then_conditional_get_is_fresh(app, client, biome):
+    url = f"/api/biomes/{biome.id}"
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    _rename(app, biome.id, biome.name + " (renamed)")
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json()["name"] == biome.name + " (renamed)"
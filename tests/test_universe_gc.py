@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.extensions import db
+from app.models import JobQueue, Universe, User
+from app.services.universe_gc import abandoned_universe_ids
+from app.services.universe_pool import POOL_STALE_AFTER
+
+
+@pytest.fixture
+def make_universe(app):
+    """Insert universes (and their generation jobs) for one test, removed afterwards."""
+    ctx = app.app_context()
+    ctx.push()
+    user_id = db.session.execute(db.select(User.id).limit(1)).scalar()
+    if user_id is None:
+        ctx.pop()
+        pytest.skip("no users")
+    rows = []
+
+    def make(meta, job_status=None, age=POOL_STALE_AFTER * 2, user=True):
+        created = datetime.utcnow() - age
+        universe = Universe(user_id=user_id if user else None, name="gc test", seed=1,
+                            meta=meta, created_at=created)
+        db.session.add(universe)
+        db.session.flush()
+        rows.append(universe)
+        if job_status:
+            job = JobQueue(job_type="universe_generation", user_id=user_id, status=job_status,
+                           meta={"universe_id": universe.id}, created_at=created)
+            db.session.add(job)
+            rows.append(job)
+        db.session.commit()
+        return universe.id
+
+    yield make
+    db.session.rollback()
+    for row in reversed(rows):
+        db.session.delete(row)
+    db.session.commit()
+    ctx.pop()
+
+
+def test_abandoned_universes(make_universe):
+    failed = make_universe({"failed": True})
+    deleting = make_universe({"deleting": True})
+    died = make_universe({"lazy": False}, job_status="error")
+    requeued = make_universe({"lazy": False})  # its job started over on another universe
+    running = make_universe({"lazy": False}, job_status="running")
+    fresh = make_universe({"lazy": False}, age=timedelta(0))
+    generated = make_universe({"lazy": False, "generated": True})
+    lazy = make_universe({"lazy": True})
+    stale_pool = make_universe({}, user=False)
+    ready_pool = make_universe({"pool_ready": True}, user=False)
+
+    ids = set(abandoned_universe_ids(limit=10000))
+    assert {failed, deleting, died, requeued, stale_pool} <= ids
+    assert not {running, fresh, generated, lazy, ready_pool} & ids
+
+
+def test_abandoned_universes_limit(make_universe):
+    for _ in range(3):
+        make_universe({"failed": True})
+    assert len(abandoned_universe_ids(limit=2)) == 2